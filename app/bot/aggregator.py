@@ -0,0 +1,206 @@
+"""
+Модуль інкрементальної аналітики оголошень.
+
+OfferAggregator накопичує статистику оголошень культури і видає результат
+у форматі analyze_offers, не переглядаючи всі оголошення заново. Коли до
+знімка додаються нові оголошення (фонове оновлення зі сховищем), агрегатор
+поглинає лише їх: суми та екстремуми оновлюються за O(1), медіана - двома
+купами за O(log n), а вікна "сьогодні / 3 дні / 7 днів" та динаміка по днях
+рахуються з денних кошиків, тож за зміни дати старі дні просто випадають
+з вікон.
+
+Результат збігається з analytics.analyze_offers для тих самих оголошень.
+"""
+import heapq
+import math
+from datetime import date
+from app.bot.analytics import average, format_day, price_change, year_bounds
+from app.bot.records import OfferRow, OFFER_TYPES
+
+WINDOW_DAYS = 7
+"""Найдовше вікно аналітики (динаміка по днях), днів."""
+
+
+class TypeStats:
+    """
+    Статистика оголошень одного типу з інкрементальним оновленням.
+
+    Оголошення додаються порціями через prepend(): порція стоїть у порядку
+    лістингу перед уже врахованими оголошеннями (нові оголошення йдуть
+    першими), від цього порядку залежить зміна ціни за період.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.first_day: int | None = None
+        self.last_day: int | None = None
+        # Оголошення з додатною ціною: точні цілі суми для середнього та відхилення
+        self.n = 0
+        self.total = 0
+        self.squares = 0
+        self.max_price: tuple[int, int] | None = None  # (ціна, найраніший день з нею)
+        self.min_price: tuple[int, int] | None = None
+        # Перша ціна найранішого дня та остання ціна найпізнішого дня (в порядку аналізу)
+        self.first_price: tuple[int, int] | None = None  # (день, ціна)
+        self.last_price: tuple[int, int] | None = None
+        # Медіана: максимальна купа нижньої половини (з мінусом) та мінімальна верхньої
+        self._low: list[int] = []
+        self._high: list[int] = []
+        # Денні кошики вікна: {день: [оголошень, з ціною, сума додатних цін, сума всіх цін]}
+        self.days: dict[int, list[int]] = {}
+        self.expired_before = 0  # дні, старші за цей, у кошиках уже не потрібні
+
+    def prepend(self, batch: list[tuple[int, int]]):
+        """Додає порцію (день, ціна) у порядку лістингу, що стоїть перед урахованими оголошеннями."""
+        if not batch:
+            return
+        positive = [(d, p) for d, p in batch if p > 0]
+        self.count += len(batch)
+        batch_first = min(d for d, _ in batch)
+        batch_last = max(d for d, _ in batch)
+        self.first_day = batch_first if self.first_day is None else min(self.first_day, batch_first)
+        self.last_day = batch_last if self.last_day is None else max(self.last_day, batch_last)
+
+        for d, p in batch:
+            if d >= self.expired_before:
+                bucket = self.days.get(d)
+                if bucket is None:
+                    bucket = self.days[d] = [0, 0, 0, 0]
+                bucket[0] += 1
+                bucket[3] += p
+                if p > 0:
+                    bucket[1] += 1
+                    bucket[2] += p
+
+        if not positive:
+            return
+        self.n += len(positive)
+        self.total += sum(p for _, p in positive)
+        self.squares += sum(p * p for _, p in positive)
+
+        for d, p in positive:
+            if self.max_price is None or p > self.max_price[0] or (p == self.max_price[0] and d < self.max_price[1]):
+                self.max_price = (p, d)
+            if self.min_price is None or p < self.min_price[0] or (p == self.min_price[0] and d < self.min_price[1]):
+                self.min_price = (p, d)
+
+        # Аналіз сортує оголошення за датою стабільно, тому перша ціна - перша
+        # в порядку лістингу серед найранішого дня, а порція стоїть перед урахованими
+        first = min(d for d, _ in positive)
+        if self.first_price is None or first <= self.first_price[0]:
+            self.first_price = next((d, p) for d, p in positive if d == first)
+        last = max(d for d, _ in positive)
+        if self.last_price is None or last > self.last_price[0]:
+            self.last_price = next((d, p) for d, p in reversed(positive) if d == last)
+
+        if len(positive) > len(self._low) + len(self._high):
+            # Велика порція (зокрема перша): дешевше перебудувати купи з відсортованих цін
+            prices = sorted([-p for p in self._low] + self._high + [p for _, p in positive])
+            half = (len(prices) + 1) // 2
+            self._low = [-p for p in prices[:half]]
+            heapq.heapify(self._low)
+            self._high = prices[half:]
+        else:
+            for _, p in positive:
+                self._push(p)
+
+    def _push(self, price: int):
+        if self._low and price > -self._low[0]:
+            heapq.heappush(self._high, price)
+        else:
+            heapq.heappush(self._low, -price)
+        # Нижня половина містить середній елемент (або на один елемент більше)
+        if len(self._low) > len(self._high) + 1:
+            heapq.heappush(self._high, -heapq.heappop(self._low))
+        elif len(self._high) > len(self._low):
+            heapq.heappush(self._low, -heapq.heappop(self._high))
+
+    def median(self) -> int:
+        if not self._low:
+            return 0
+        if len(self._low) > len(self._high):
+            return -self._low[0]
+        return int(round((-self._low[0] + self._high[0]) / 2))
+
+    def expire(self, today: int):
+        """Прибирає денні кошики, що вже не потрапляють у жодне вікно."""
+        horizon = today - WINDOW_DAYS
+        if horizon > self.expired_before:
+            self.expired_before = horizon
+            for d in [d for d in self.days if d < horizon]:
+                del self.days[d]
+
+    def result(self, today: int) -> dict | None:
+        """Розділ аналітики у форматі analyze_offers на день today (порядковий номер)."""
+        if not self.count:
+            return None
+        self.expire(today)
+
+        def window(since: int) -> tuple[int, int, int]:
+            buckets = [b for d, b in self.days.items() if d >= since]
+            return sum(b[0] for b in buckets), sum(b[1] for b in buckets), sum(b[2] for b in buckets)
+
+        count_today, n_today, sum_today, _ = self.days.get(today, (0, 0, 0, 0))
+        count_last_3, n_last_3, sum_last_3 = window(today - 3)
+        count_last_7, n_last_7, sum_last_7 = window(today - 7)
+
+        std_dev = 0
+        if self.n > 1:
+            std_dev = int(round(math.sqrt((self.n * self.squares - self.total * self.total) / (self.n * (self.n - 1)))))
+
+        price_change_percent = 0
+        trend = "немає змін"
+        if self.n >= 2:
+            price_change_percent, trend = price_change(self.first_price[1], self.last_price[1])
+
+        return {
+            "count_today": count_today,
+            "count_total": self.count,
+            "first_date": format_day(self.first_day),
+            "last_date": format_day(self.last_day),
+            "avg_price": average(self.total, self.n),
+            "median_price": self.median(),
+            "std_dev": std_dev,
+            "max_price": self.max_price[0] if self.n else 0,
+            "max_price_date": format_day(self.max_price[1]) if self.n else None,
+            "min_price": self.min_price[0] if self.n else 0,
+            "min_price_date": format_day(self.min_price[1]) if self.n else None,
+            "avg_price_today": average(sum_today, n_today),
+            "avg_price_last_3": average(sum_last_3, n_last_3),
+            "avg_price_last_7": average(sum_last_7, n_last_7),
+            "count_last_3": count_last_3,
+            "count_last_7": count_last_7,
+            "price_change_percent": price_change_percent,
+            "trend": trend,
+            "daily_avg": {format_day(d): average(b[3], b[0])
+                          for d, b in sorted(self.days.items()) if d >= today - 7},
+        }
+
+
+class OfferAggregator:
+    """
+    Інкрементальна аналітика оголошень культури (окремо для кожного типу).
+
+    Args:
+        year_filter: Опціональний рік; оголошення інших років не враховуються
+    """
+
+    def __init__(self, year_filter: int = None):
+        self.year_filter = year_filter
+        self.types = tuple(TypeStats() for _ in OFFER_TYPES)
+        self._bounds = year_bounds(year_filter)
+
+    def prepend(self, rows: list[OfferRow]):
+        """Враховує нові оголошення, що в лістингу стоять перед уже врахованими."""
+        first_day, end_day = self._bounds
+        batches = tuple([] for _ in OFFER_TYPES)
+        for r in rows:
+            if first_day <= r.day < end_day:
+                batches[r.kind].append((r.day, r.price))
+        for stats, batch in zip(self.types, batches):
+            stats.prepend(batch)
+
+    def result(self, today: int | None = None) -> dict:
+        """Аналітика у форматі analyze_offers ('куплю' / 'продам')."""
+        today = date.today().toordinal() if today is None else today
+        return {offer_type: stats.result(today) for offer_type, stats in zip(OFFER_TYPES, self.types)}
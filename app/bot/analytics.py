@@ -4,57 +4,57 @@
 Відповідає за обчислення статистики, трендів та динаміки цін
 на основі отриманих даних з парсера.
 """
-from datetime import datetime, date, timedelta
-import re
+from datetime import date
+from operator import itemgetter
 import statistics
-from app.config_loader import USD_RATE
+import time
+from app.config_loader import ANALYTICS_ENGINE
+from app.bot import metrics
+from app.bot.records import OfferRow, OFFER_TYPES
 
 
-def parse_price(price_value) -> int | None:
+def format_day(day: int) -> str:
+    """Дата з порядкового номера дня у форматі аналітики (ДД.ММ.РРРР)."""
+    return date.fromordinal(int(day)).strftime("%d.%m.%Y")
+
+
+def average(total: int, count: int) -> int:
+    """Округлене середнє (0, якщо значень немає)."""
+    return int(round(total / count)) if count else 0
+
+
+def price_change(first: int, last: int) -> tuple[float, str]:
     """
-    Парсить ціну з рядка або числа та переводить у USD за 1т.
-    
-    Args:
-        price_value: Ціна у вигляді рядка (з валютою) або числа
-        
+    Зміна ціни за період та її напрямок.
+
     Returns:
-        Ціна в USD за 1 тонну як ціле число, або None якщо парсинг не вдався
-        
-    Note:
-        Якщо в рядку вказано "грн", ціна автоматично конвертується
-        у долари за курсом USD_RATE.
+        (зміна у відсотках, тренд: зростає / падає / немає змін)
     """
-    if price_value is None:
-        return None
+    percent = round(((last - first) / first) * 100, 2) if first else 0
+    trend = "зростає ↑" if percent > 0 else ("падає ↓" if percent < 0 else "немає змін")
+    return percent, trend
 
-    # Якщо це вже число, просто конвертуємо в int
-    if isinstance(price_value, (float, int)):
-        return int(round(price_value))
 
-    # Якщо це рядок, парсимо його
-    price_str = str(price_value)
-    price_clean = re.sub(r"[^\d.,]", "", price_str).replace(",", ".")
-    
-    if not price_clean:
-        return None
-    
-    try:
-        price_value = float(price_clean)
-        # Конвертація в USD, якщо гривні
-        if "грн" in price_str.lower():
-            price_value /= USD_RATE
-        return int(round(price_value))
-    except (ValueError, TypeError):
-        return None
+def year_bounds(year_filter: int | None) -> tuple[int, int]:
+    """
+    Межі року в порядкових номерах днів: [початок, кінець).
+
+    Без фільтра межі охоплюють будь-який день.
+    """
+    if year_filter is None:
+        return 0, date.max.toordinal() + 1
+    return date(year_filter, 1, 1).toordinal(), date(year_filter + 1, 1, 1).toordinal()
 
 
-def analyze_offers(rows: list[dict], year_filter: int = None) -> dict:
+def analyze_offers(rows: list[OfferRow], year_filter: int = None, engine: str = ANALYTICS_ENGINE) -> dict:
     """
     Аналізує оголошення для однієї культури та обчислює статистику.
     
     Args:
-        rows: Список оголошень з полями: 'date', 'type', 'price'
+        rows: Записи OfferRow з уже розібраними днем, типом та ціною
         year_filter: Опціональний рік для фільтрації (наприклад, 2025)
+        engine: Рушій обчислень: 'python' або 'numpy' (векторизований,
+            див. analytics_numpy; результат однаковий)
         
     Returns:
         Словник з аналітикою для типу 'куплю' та 'продам'. Кожен розділ містить:
@@ -71,58 +71,50 @@ def analyze_offers(rows: list[dict], year_filter: int = None) -> dict:
         
     Note:
         Ціни очікуються в USD за 1 тонну. Фільтрація за роком
-        застосовується до дат оголошень.
+        застосовується до дат оголошень. Дати, типи та ціни вже розібрані
+        парсером, тому повторний аналіз тих самих рядків нічого не розбирає.
     """
-    analysis = {"куплю": {}, "продам": {}}
+    started = time.perf_counter()
+    if engine == "numpy":
+        from app.bot.analytics_numpy import analyze_offers_numpy
+        analysis = analyze_offers_numpy(rows, year_filter)
+    else:
+        analysis = _analyze_python(rows, year_filter)
+
+    metrics.analyze_seconds.observe(time.perf_counter() - started, engine=engine)
+    metrics.analyze_rows.observe(len(rows))
+    return analysis
 
-    for offer_type in ["куплю", "продам"]:
-        filtered = [r for r in rows if r.get('type') == offer_type]
-        if not filtered:
-            analysis[offer_type] = None
-            continue
 
-        valid_rows = []
-        for r in filtered:
-            # Дата
-            try:
-                date_part = str(r.get('date', '')).split()[0]
-                r_date = datetime.strptime(date_part, "%d.%m.%Y").date()
-                
-                # Фільтрація за роком, якщо вказано
-                if year_filter is not None and r_date.year != year_filter:
-                    continue
-            except (ValueError, TypeError):
-                continue
-
-            # Ціна у USD
-            price_value = parse_price(r.get("price", ""))
-            if price_value is None:
-                continue
-
-            valid_rows.append({
-                "date": r_date,
-                "price": price_value
-            })
+def _analyze_python(rows: list[OfferRow], year_filter: int = None) -> dict:
+    """Звичайний рушій analyze_offers (без залежностей)."""
+    analysis = {}
+    first_day, end_day = year_bounds(year_filter)
+    by_type = tuple([] for _ in OFFER_TYPES)  # (день, ціна) для кожного типу
+    for r in rows:
+        if first_day <= r.day < end_day:
+            by_type[r.kind].append((r.day, r.price))
 
+    for offer_type, valid_rows in zip(OFFER_TYPES, by_type):
         if not valid_rows:
             analysis[offer_type] = None
             continue
 
-        # Сортуємо за датою для правильного аналізу
-        valid_rows.sort(key=lambda x: x["date"])
-        
-        dates = [r["date"] for r in valid_rows]
-        prices = [r["price"] for r in valid_rows if r["price"] > 0]
-        prices_with_dates = [(r["date"], r["price"]) for r in valid_rows if r["price"] > 0]
+        # Сортуємо за датою (стабільно) для правильного аналізу
+        valid_rows.sort(key=itemgetter(0))
+
+        dates = [d for d, _ in valid_rows]
+        prices = [p for _, p in valid_rows if p > 0]
+        prices_with_dates = [(d, p) for d, p in valid_rows if p > 0]
 
-        today = date.today()
-        count_today = sum(1 for r in valid_rows if r["date"] == today)
+        today = date.today().toordinal()
+        count_today = sum(1 for d, _ in valid_rows if d == today)
         count_total = len(valid_rows)
         first_date = min(dates)
         last_date = max(dates)
         
         # Базова статистика цін (враховуємо всі оголошення)
-        avg_price = int(round(sum(prices) / len(prices))) if prices else 0
+        avg_price = average(sum(prices), len(prices))
         max_price = max(prices) if prices else 0
         min_price = min(prices) if prices else 0
         
@@ -134,49 +126,44 @@ def analyze_offers(rows: list[dict], year_filter: int = None) -> dict:
         max_price_date = None
         min_price_date = None
         if prices_with_dates:
-            max_price_date = max(prices_with_dates, key=lambda x: x[1])[0].strftime("%d.%m.%Y")
-            min_price_date = min(prices_with_dates, key=lambda x: x[1])[0].strftime("%d.%m.%Y")
+            max_price_date = format_day(max(prices_with_dates, key=lambda x: x[1])[0])
+            min_price_date = format_day(min(prices_with_dates, key=lambda x: x[1])[0])
         
         # Статистика за останні дні
-        last_3_days = today - timedelta(days=3)
-        last_7_days = today - timedelta(days=7)
+        last_3_days = today - 3
+        last_7_days = today - 7
         
-        prices_last_3 = [r["price"] for r in valid_rows if r["date"] >= last_3_days and r["price"] > 0]
-        prices_last_7 = [r["price"] for r in valid_rows if r["date"] >= last_7_days and r["price"] > 0]
+        prices_last_3 = [p for d, p in prices_with_dates if d >= last_3_days]
+        prices_last_7 = [p for d, p in prices_with_dates if d >= last_7_days]
         
-        avg_price_last_3 = int(round(sum(prices_last_3) / len(prices_last_3))) if prices_last_3 else 0
-        avg_price_last_7 = int(round(sum(prices_last_7) / len(prices_last_7))) if prices_last_7 else 0
-        count_last_3 = len([r for r in valid_rows if r["date"] >= last_3_days])
-        count_last_7 = len([r for r in valid_rows if r["date"] >= last_7_days])
+        avg_price_last_3 = average(sum(prices_last_3), len(prices_last_3))
+        avg_price_last_7 = average(sum(prices_last_7), len(prices_last_7))
+        count_last_3 = sum(1 for d, _ in valid_rows if d >= last_3_days)
+        count_last_7 = sum(1 for d, _ in valid_rows if d >= last_7_days)
         
         # Середня ціна сьогодні
-        prices_today = [r["price"] for r in valid_rows if r["date"] == today and r["price"] > 0]
-        avg_price_today = int(round(sum(prices_today) / len(prices_today))) if prices_today else 0
+        prices_today = [p for d, p in prices_with_dates if d == today]
+        avg_price_today = average(sum(prices_today), len(prices_today))
         
         # Зміна ціни та тренд
         price_change_percent = 0
         trend = "немає змін"
         if prices and len(prices) >= 2:
-            price_change_percent = round(((prices[-1] - prices[0]) / prices[0]) * 100, 2) if prices[0] else 0
-            trend = "зростає ↑" if price_change_percent > 0 else (
-                "падає ↓" if price_change_percent < 0 else "немає змін")
+            price_change_percent, trend = price_change(prices[0], prices[-1])
         
         # Динаміка за останні 7 днів (середня ціна по днях)
         daily_prices = {}
-        for r in valid_rows:
-            if r["date"] >= last_7_days:
-                day_str = r["date"].strftime("%d.%m.%Y")
-                if day_str not in daily_prices:
-                    daily_prices[day_str] = []
-                daily_prices[day_str].append(r["price"])
+        for d, p in valid_rows:
+            if d >= last_7_days:
+                daily_prices.setdefault(d, []).append(p)
         
-        daily_avg = {day: int(round(sum(p) / len(p))) for day, p in daily_prices.items() if p}
+        daily_avg = {format_day(day): average(sum(p), len(p)) for day, p in daily_prices.items() if p}
 
         analysis[offer_type] = {
             "count_today": count_today,
             "count_total": count_total,
-            "first_date": first_date.strftime("%d.%m.%Y"),
-            "last_date": last_date.strftime("%d.%m.%Y"),
+            "first_date": format_day(first_date),
+            "last_date": format_day(last_date),
             "avg_price": avg_price,
             "median_price": median_price,
             "std_dev": std_dev,
@@ -0,0 +1,162 @@
+"""
+Модуль кешу отриманих з сайту оголошень.
+
+Кеш обмежений за часом життя записів (TTL), кількістю записів та
+приблизним обсягом пам'яті (витісняються найдавніше використані - LRU).
+Після закінчення TTL запис ще STALE_TTL секунд віддається як застарілий,
+поки у фоні завантажуються свіжі дані (stale-while-revalidate).
+"""
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+from app.config_loader import CACHE_TTL, CACHE_STALE_TTL, CACHE_MAX_ENTRIES, CACHE_MAX_BYTES
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Приблизно оцінює обсяг пам'яті значення в байтах.
+
+    Рахує сам контейнер, вкладені словники/списки/кортежі, поля об'єктів
+    з __slots__ та їхні скалярні значення. Спільні об'єкти (наприклад, інтерновані рядки)
+    рахуються повторно, тому оцінка завищена, а не занижена.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += estimate_size(k) + estimate_size(v)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += estimate_size(item)
+    elif hasattr(value, "__slots__"):
+        for name in value.__slots__:
+            size += estimate_size(getattr(value, name, None))
+    return size
+
+
+@dataclass
+class CacheEntry:
+    """Запис кешу."""
+    value: Any
+    size: int
+    created_at: float
+
+    def age(self, now: float) -> float:
+        return now - self.created_at
+
+
+class OfferCache:
+    """
+    Кеш з TTL, LRU-витісненням та stale-while-revalidate.
+
+    Args:
+        ttl: Скільки секунд запис вважається свіжим
+        stale_ttl: Скільки секунд після TTL запис ще можна віддавати як застарілий
+        max_entries: Максимальна кількість записів
+        max_bytes: Максимальний приблизний обсяг усіх записів у байтах
+    """
+
+    def __init__(self, ttl: float = CACHE_TTL, stale_ttl: float = CACHE_STALE_TTL,
+                 max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> tuple[Any, bool] | None:
+        """
+        Повертає значення з кешу.
+
+        Returns:
+            Кортеж (значення, свіже) або None, якщо запису немає чи він
+            прострочений більше ніж на stale_ttl. Якщо свіже == False,
+            викликач має віддати значення та оновити його у фоні.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        age = entry.age(time.monotonic())
+        if age > self.ttl + self.stale_ttl:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        if age > self.ttl:
+            self.stale_hits += 1
+            return entry.value, False
+
+        self.hits += 1
+        return entry.value, True
+
+    def put(self, key: str, value: Any):
+        """Зберігає значення та витісняє найдавніше використані записи понад ліміти."""
+        if key in self._entries:
+            self._remove(key)
+
+        entry = CacheEntry(value, estimate_size(value), time.monotonic())
+        self._entries[key] = entry
+        self._bytes += entry.size
+
+        # Останній доданий запис не витісняємо, навіть якщо він сам більший за ліміт
+        while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def peek(self, key: str) -> Any:
+        """Значення запису без оновлення лічильників та порядку LRU (або None)."""
+        entry = self._entries.get(key)
+        return entry.value if entry else None
+
+    def keys(self) -> list[str]:
+        """Повертає ключі всіх записів (від найдавніше використаного)."""
+        return list(self._entries)
+
+    def invalidate(self, key: str | None = None) -> int:
+        """
+        Видаляє запис за ключем або весь кеш, якщо ключ не вказано.
+
+        Returns:
+            Кількість видалених записів
+        """
+        if key is None:
+            removed = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+            return removed
+
+        if key in self._entries:
+            self._remove(key)
+            return 1
+        return 0
+
+    def stats(self) -> dict:
+        """Лічильники звернень та поточне заповнення кешу."""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
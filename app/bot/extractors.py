@@ -0,0 +1,120 @@
+"""
+Модуль бекендів для вилучення рядків таблиці оголошень з HTML.
+
+Кожен бекенд приймає HTML однієї сторінки лістингу і повертає для
+кожного рядка tbody сирі тексти всіх комірок та текст типу оголошення
+(span у td[2]). Розбір цих значень виконує parser.
+
+Бекенди:
+- lxml: дерево на C та XPath, у рази швидше за html.parser
+- bs4: BeautifulSoup з html.parser, запасний варіант без залежностей
+"""
+from bs4 import BeautifulSoup
+from app.config_loader import PARSER_BACKEND
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # lxml не встановлено - працюємо лише з BeautifulSoup
+    lxml = None
+
+RawRow = tuple[tuple[str, ...], str]
+"""Сирий рядок: (тексти всіх комірок, текст типу оголошення)."""
+
+
+def extract_rows_bs4(text: str) -> list[RawRow] | None:
+    """
+    Вилучає рядки таблиці за допомогою BeautifulSoup (html.parser).
+
+    Returns:
+        Список сирих рядків або None, якщо на сторінці немає tbody
+    """
+    soup = BeautifulSoup(text, 'html.parser')
+
+    # Знаходимо таблицю з оголошеннями (шукаємо tbody з рядками)
+    tbody = soup.find('tbody')
+    if not tbody:
+        return None
+
+    rows = []
+    for r in tbody.find_all('tr'):
+        cells = r.find_all('td')
+        if len(cells) < 6:
+            continue
+
+        type_elem = cells[2].find('span')
+        rows.append((
+            tuple(cell.get_text(strip=True) for cell in cells),
+            type_elem.get_text(strip=True) if type_elem else '',
+        ))
+
+    return rows
+
+
+if lxml is not None:
+    # Як і get_text() у BeautifulSoup, пропускаємо вміст script та style
+    _visible_text = etree.XPath(".//text()[not(ancestor::script or ancestor::style)]")
+
+
+def _lxml_text(element) -> str:
+    """Аналог get_text(strip=True) з BeautifulSoup для елемента lxml."""
+    return "".join(part.strip() for part in _visible_text(element))
+
+
+def extract_rows_lxml(text: str) -> list[RawRow] | None:
+    """
+    Вилучає рядки таблиці за допомогою lxml та XPath.
+
+    Returns:
+        Список сирих рядків або None, якщо на сторінці немає tbody
+    """
+    try:
+        doc = lxml.html.document_fromstring(text)
+    except (etree.ParserError, ValueError):
+        # Порожній документ або нестандартний HTML - розбираємо повільним шляхом
+        return extract_rows_bs4(text)
+
+    tbody = doc.find('.//tbody')
+    if tbody is None:
+        return None
+
+    rows = []
+    for r in tbody.iterfind('.//tr'):
+        cells = r.findall('.//td')
+        if len(cells) < 6:
+            continue
+
+        type_elem = cells[2].find('.//span')
+        rows.append((
+            tuple(_lxml_text(cell) for cell in cells),
+            _lxml_text(type_elem) if type_elem is not None else '',
+        ))
+
+    return rows
+
+
+BACKENDS = {"bs4": extract_rows_bs4}
+"""Доступні бекенди вилучення за назвою."""
+if lxml is not None:
+    BACKENDS["lxml"] = extract_rows_lxml
+
+
+def get_extractor(name: str = PARSER_BACKEND):
+    """
+    Повертає функцію вилучення рядків за назвою бекенду.
+
+    Args:
+        name: 'lxml', 'bs4' або 'auto' (lxml, якщо він встановлений)
+
+    Raises:
+        ValueError: Якщо бекенд невідомий або його залежність не встановлена
+    """
+    if name == "auto":
+        return BACKENDS.get("lxml", extract_rows_bs4)
+    if name not in BACKENDS:
+        raise ValueError(f"Невідомий або недоступний бекенд парсингу: {name}")
+    return BACKENDS[name]
+
+
+extract_rows = get_extractor()
+"""Бекенд, обраний у конфігурації (PARSER_BACKEND)."""
@@ -1,56 +1,179 @@
-import html
-import asyncio
+import time
 from aiogram import Router, types
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
 from app.config_loader import ADMIN_USER_ID
-from app.bot.keyboards import build_culture_keyboard, CULTURE_URLS, build_add_key_keyboard
+from app.bot.keyboards import build_culture_keyboard, CULTURE_URLS, build_add_key_keyboard, culture_by_index
 from app.bot.crops_list import crops
-from app.bot.parser import fetch_table
-from app.bot.analytics import analyze_offers
-from app.utils.formatters import format_section, format_comparison, format_admin_message
+from app.bot import metrics, offers, outbound, selections, tracing
+from app.bot.periods import Period
+from app.bot.records import OFFER_TYPES
+from app.bot.reports import build_report, build_summary, build_market_overview
+from app.bot.progress import LoadingIndicator, format_summary_progress
+from app.utils.formatters import format_admin_message, format_cache_stats, format_send_stats, format_metrics_summary
 
 router = Router()
-cache = {}  # кеш для таблиці по культурі
-add_key_selections = {}  # зберігає вибрані культури для кожного користувача: {user_id: set(crops)}
 
 @router.message(Command("start"))
 async def cmd_start(message: types.Message):
-    await message.answer("Привіт!\n"
-                         "/monitor вивести аналітику культур за весь доступний період\n"
-                         "/monitor_2025 вивести аналітику культур за 2025 рік\n"
-                         "/add_category запропонувати нову категорію культур")
+    await outbound.answer(message, "Привіт!\n"
+                          "/monitor вивести аналітику культур за весь доступний період\n"
+                          "/monitor 2025 вивести аналітику культур за рік\n"
+                          "/monitor 01.03.2025-31.03.2025 вивести аналітику культур за проміжок дат\n"
+                          "/monitor_all зведення по всіх культурах одним повідомленням (також з роком чи датами)\n"
+                          "/market огляд ринку: імпульс, спреди та кореляції цін культур (/market куплю - за покупцями)\n"
+                          "/add_category запропонувати нову категорію культур")
 
 @router.message(Command("monitor"))
-async def cmd_monitor(message: types.Message):
-    keyboard = build_culture_keyboard()
-    await message.answer("Оберіть культуру:", reply_markup=keyboard)
+async def cmd_monitor(message: types.Message, command: CommandObject):
+    """Клавіатура культур за весь період, рік (/monitor 2025) або проміжок дат (/monitor 01.03.2025-31.03.2025)."""
+    try:
+        period = Period.parse(command.args) if command.args else None
+    except ValueError as e:
+        await outbound.answer(message, f"❌ {e}")
+        return
+    await _send_culture_keyboard(message, period)
 
 @router.message(Command("monitor_2025"))
 async def cmd_monitor_2025(message: types.Message):
-    keyboard = build_culture_keyboard(year_filter=2025)
-    await message.answer("Оберіть культуру (аналіз за 2025 рік):", reply_markup=keyboard)
+    """Попередня форма /monitor 2025 (залишена для тих, хто до неї звик)."""
+    await _send_culture_keyboard(message, Period.year(2025))
+
+async def _send_culture_keyboard(message: types.Message, period: Period | None):
+    keyboard = build_culture_keyboard(period)
+    text = f"Оберіть культуру (аналіз {period.title}):" if period else "Оберіть культуру:"
+    await outbound.answer(message, text, reply_markup=keyboard)
+
+@router.message(Command("monitor_all"))
+async def cmd_monitor_all(message: types.Message, command: CommandObject):
+    """Зведення по всіх культурах: /monitor_all [рік або проміжок дат]."""
+    try:
+        period = Period.parse(command.args) if command.args else None
+    except ValueError as e:
+        await outbound.answer(message, f"❌ {e}")
+        return
+
+    started = time.perf_counter()
+    trace = tracing.start("monitor_all" + (f" {period.encode()}" if period else ""))
+    try:
+        # Повідомлення-індикатор потім замінюється першою частиною зведення
+        status = await outbound.answer(message, format_summary_progress(0, len(CULTURE_URLS)))
+        indicator = LoadingIndicator(status, formatter=format_summary_progress)
+        try:
+            with tracing.span("summary"):
+                chunks = await build_summary(period, on_progress=indicator.update)
+        finally:
+            await indicator.close()
+
+        with tracing.span("telegram.first"):
+            await outbound.edit_text(status, chunks[0])
+        metrics.summary_seconds.observe(time.perf_counter() - started)
+        with tracing.span("telegram.rest", chunks=len(chunks) - 1):
+            for chunk in chunks[1:]:
+                await outbound.answer(message, chunk)
+    finally:
+        await _finish_trace(message, trace)
+
+@router.message(Command("market"))
+async def cmd_market(message: types.Message, command: CommandObject):
+    """Огляд ринку по всіх культурах: /market [куплю|продам]."""
+    offer_type = (command.args or "продам").strip().lower()
+    if offer_type not in OFFER_TYPES:
+        await outbound.answer(message, "❌ Вкажіть тип оголошень: куплю або продам")
+        return
+
+    trace = tracing.start(f"market {offer_type}")
+    try:
+        chunks = await build_market_overview(offer_type)
+        if chunks is None:
+            await outbound.answer(message, "⏳ Дані по культурах ще завантажуються, спробуйте трохи згодом")
+            return
+        for chunk in chunks:
+            await outbound.answer(message, chunk)
+    finally:
+        await _finish_trace(message, trace)
 
 @router.message(Command("add_category"))
 async def cmd_add_key(message: types.Message):
     """Показує клавіатуру для вибору культур."""
     user_id = message.from_user.id
     
-    # Ініціалізуємо порожній набір вибраних культур для користувача
-    if user_id not in add_key_selections:
-        add_key_selections[user_id] = set()
+    # Поточний вибір користувача (спільний для всіх процесів бота, якщо є сховище)
+    selected_crops = await selections.get(user_id)
     
-    keyboard = build_add_key_keyboard(add_key_selections[user_id])
-    await message.answer("Оберіть культури для додавання:", reply_markup=keyboard)
+    keyboard = build_add_key_keyboard(selected_crops)
+    await outbound.answer(message, "Оберіть культури для додавання:", reply_markup=keyboard)
+
+@router.message(Command("cache_stats"))
+async def cmd_cache_stats(message: types.Message):
+    """Показує адміністратору статистику кешу."""
+    if message.from_user.id != ADMIN_USER_ID:
+        return
+    await outbound.answer(message, format_cache_stats(offers.cache.stats()))
+
+@router.message(Command("cache_clear"))
+async def cmd_cache_clear(message: types.Message):
+    """Очищає кеш повністю або для однієї культури: /cache_clear [назва культури]."""
+    if message.from_user.id != ADMIN_USER_ID:
+        return
+
+    parts = message.text.split(maxsplit=1)
+    culture_name = parts[1].strip() if len(parts) > 1 else None
+    if culture_name is not None and culture_name not in CULTURE_URLS:
+        await outbound.answer(message, f"❌ Невідома культура: {culture_name}")
+        return
+    removed = await offers.invalidate(culture_name)
+    await outbound.answer(message, f"🗑 Видалено записів кешу: {removed}")
 
+@router.message(Command("send_stats"))
+async def cmd_send_stats(message: types.Message):
+    """Показує адміністратору стан черги вихідних повідомлень."""
+    if message.from_user.id != ADMIN_USER_ID:
+        return
+    await outbound.answer(message, format_send_stats(outbound.queue.stats()))
+
+@router.message(Command("metrics"))
+async def cmd_metrics(message: types.Message):
+    """Показує адміністратору зведення метрик: парсинг, кеш, аналітика, Telegram."""
+    if message.from_user.id != ADMIN_USER_ID:
+        return
+    await outbound.answer(message, format_metrics_summary(metrics.summary()))
+
+@router.message(Command("profile"))
+async def cmd_profile(message: types.Message):
+    """Вмикає cProfile для наступних N запитів аналізу: /profile [N]."""
+    if message.from_user.id != ADMIN_USER_ID:
+        return
+
+    parts = message.text.split(maxsplit=1)
+    count = int(parts[1]) if len(parts) > 1 and parts[1].strip().isdigit() else 5
+    tracing.profile_next(count)
+    await outbound.answer(message, f"📊 Профілюю наступні запити: {tracing.profiling_pending()}. "
+                                   f"Після завершення надішлю шлях до файлу профілю.")
+
+@router.callback_query(lambda c: c.data and c.data.startswith("report:"))
+async def report_selected(callback: types.CallbackQuery):
+    """Обробляє натискання на культуру: report:<індекс культури>[:<період>]."""
+    parts = callback.data.split(":")
+    culture_name = culture_by_index(int(parts[1])) if parts[1].isdigit() else None
+    try:
+        period = Period.decode(parts[2]) if len(parts) > 2 else None
+    except ValueError:
+        culture_name = None
+    if culture_name is None:
+        await callback.answer("❌ Помилка: невалідна кнопка, надішліть /monitor ще раз", show_alert=True)
+        return
+    await _process_culture_analysis(callback, culture_name, period)
+
+# Кнопки з назвою культури у callback_data - з повідомлень, надісланих до переходу на report:
 @router.callback_query(lambda c: c.data and c.data.startswith("culture:"))
 async def culture_selected(callback: types.CallbackQuery):
     culture_name = callback.data.split(":", 1)[1]
-    await _process_culture_analysis(callback, culture_name, year_filter=None)
+    await _process_culture_analysis(callback, culture_name)
 
 @router.callback_query(lambda c: c.data and c.data.startswith("culture_2025:"))
 async def culture_selected_2025(callback: types.CallbackQuery):
     culture_name = callback.data.split(":", 1)[1]
-    await _process_culture_analysis(callback, culture_name, year_filter=2025)
+    await _process_culture_analysis(callback, culture_name, Period.year(2025))
 
 @router.callback_query(lambda c: c.data and c.data.startswith("add_key_toggle:"))
 async def add_key_toggle(callback: types.CallbackQuery):
@@ -65,19 +188,12 @@ async def add_key_toggle(callback: types.CallbackQuery):
     
     crop_name = crops[crop_idx]
     
-    # Ініціалізуємо набір, якщо його немає
-    if user_id not in add_key_selections:
-        add_key_selections[user_id] = set()
-    
     # Додаємо або прибираємо культуру
-    if crop_name in add_key_selections[user_id]:
-        add_key_selections[user_id].remove(crop_name)
-    else:
-        add_key_selections[user_id].add(crop_name)
+    selected_crops = await selections.toggle(user_id, crop_name)
     
     # Оновлюємо клавіатуру
-    keyboard = build_add_key_keyboard(add_key_selections[user_id])
-    await callback.message.edit_reply_markup(reply_markup=keyboard)
+    keyboard = build_add_key_keyboard(selected_crops)
+    await outbound.edit_reply_markup(callback.message, reply_markup=keyboard)
     await callback.answer()
 
 @router.callback_query(lambda c: c.data == "add_key_done")
@@ -89,26 +205,22 @@ async def add_key_done(callback: types.CallbackQuery):
     last_name = callback.from_user.last_name or ""
     full_name = f"{first_name} {last_name}".strip() or username
     
-    # Отримуємо вибрані культури
-    selected_crops = add_key_selections.get(user_id, set())
+    # Отримуємо вибрані культури та очищаємо вибір користувача
+    selected_crops = await selections.pop(user_id)
     
     # Приховуємо клавіатуру
-    await callback.message.edit_reply_markup(reply_markup=None)
+    await outbound.edit_reply_markup(callback.message, reply_markup=None)
     await callback.answer()
     
     # Відправляємо повідомлення користувачу
-    await callback.message.answer("✅ Запит надіслано")
-    
-    # Очищаємо вибір користувача
-    if user_id in add_key_selections:
-        del add_key_selections[user_id]
+    await outbound.answer(callback.message, "✅ Запит надіслано")
     
     # Формуємо повідомлення для адміна
     admin_message = format_admin_message(full_name, username, user_id, selected_crops)
     
     # Надсилаємо повідомлення адміну
     try:
-        await callback.bot.send_message(ADMIN_USER_ID, admin_message)
+        await outbound.send_message(callback.bot, ADMIN_USER_ID, admin_message)
     except Exception as e:
         # Якщо не вдалося надіслати адміну, логуємо помилку
         print(f"Помилка надсилання повідомлення адміну: {e}")
@@ -119,145 +231,47 @@ async def cancel_operation(callback: types.CallbackQuery):
     user_id = callback.from_user.id
     
     # Очищаємо вибір користувача, якщо він був у процесі додавання категорій
-    if user_id in add_key_selections:
-        del add_key_selections[user_id]
+    await selections.pop(user_id)
     
     # Видаляємо клавіатуру
-    await callback.message.edit_reply_markup(reply_markup=None)
+    await outbound.edit_reply_markup(callback.message, reply_markup=None)
     await callback.answer()
     
     # Надсилаємо повідомлення про скасування
-    await callback.message.answer("❌ Операцію скасовано")
+    await outbound.answer(callback.message, "❌ Операцію скасовано")
 
-async def _process_culture_analysis(callback: types.CallbackQuery, culture_name: str, year_filter: int = None):
-    """Загальна функція для обробки аналізу культури з опціональною фільтрацією за роком."""
-    # Відповідь на callback, щоб прибрати "loading" на кнопці
-    await callback.answer()
-
-    # Замінюємо клавіатуру на проміжне повідомлення
-    base_text = f"АНАЛІЗУЮ"
-    
-    # Смайли для анімації
-    animation_emojis = ["⏳", "🔄", "📊", "🔍", "⚙️", "📈", "💫"]
-    animation_stop = False
-    
-    async def animate_loading():
-        """Анімація завантаження з прокручуванням смайлів по кожному символу тексту."""
-        emoji_index = 0
-        position = 0
-        forward = True
-        text_length = len(base_text)
-        
-        while not animation_stop:
-            emoji = animation_emojis[emoji_index % len(animation_emojis)]
-            
-            # Вставляємо смайл на позицію position (між символами)
-            if position == 0:
-                # Смайл на початку
-                animated_text = emoji + base_text
-            elif position >= text_length:
-                # Смайл в кінці
-                animated_text = base_text + emoji
-            else:
-                # Смайл між символами
-                animated_text = base_text[:position] + emoji + base_text[position:]
-            
-            # Змінюємо позицію
-            if forward:
-                position += 1
-                if position > text_length:
-                    # Досягли кінця - рухаємось назад
-                    forward = False
-                    position = text_length
-                    emoji_index = (emoji_index + 1) % len(animation_emojis)  # Змінюємо смайл
-            else:
-                position -= 1
-                if position < 0:
-                    # Досягли початку - рухаємось вперед
-                    forward = True
-                    position = 0
-                    emoji_index = (emoji_index + 1) % len(animation_emojis)  # Змінюємо смайл
-            
-            try:
-                await callback.message.edit_text(
-                    animated_text,
-                    reply_markup=None
-                )
-            except Exception:
-                # Якщо повідомлення вже видалено або змінено, зупиняємо анімацію
-                break
-            
-            await asyncio.sleep(0.1)
-    
-    # Запускаємо анімацію
-    animation_task = asyncio.create_task(animate_loading())
-    
+async def _process_culture_analysis(callback: types.CallbackQuery, culture_name: str, period: Period | None = None):
+    """Загальна функція для обробки аналізу культури з опціональним періодом (рік або проміжок дат)."""
+    started = time.perf_counter()
+    trace = tracing.start(f"culture:{culture_name}" + (f" {period.encode()}" if period else ""))
     try:
-        # Завантаження даних
-        url = CULTURE_URLS[culture_name]
-        cache_key = f"{culture_name}_{year_filter}" if year_filter else culture_name
-        if cache_key in cache:
-            rows = cache[cache_key]
-        else:
-            rows = await fetch_table(url)
-            cache[cache_key] = rows
+        # Відповідь на callback, щоб прибрати "loading" на кнопці
+        await callback.answer()
 
-        # Аналіз даних з фільтрацією за роком
-        analysis = analyze_offers(rows, year_filter=year_filter)
-    finally:
-        # Зупиняємо анімацію
-        animation_stop = True
-        animation_task.cancel()
+        # Індикатор прогресу з'являється лише тоді, коли дані завантажуються з сайту
+        indicator = LoadingIndicator(callback.message)
         try:
-            await animation_task
-        except asyncio.CancelledError:
-            pass
-    
-    # Отримуємо останнє повідомлення для подальшого редагування
-    wait_msg = callback.message
-    # Надсилаємо три окремі повідомлення
-    messages_sent = False
-    
-    # 1. Повідомлення про "Куплю"
-    buy_data = analysis.get("куплю")
-    if buy_data:
-        buy_text = format_section("куплю", buy_data, culture_name)
-        safe_buy_text = html.escape(buy_text)
-        buy_chunks = [safe_buy_text[i:i+4000] for i in range(0, len(safe_buy_text), 4000)]
-        if buy_chunks:
-            await wait_msg.edit_text(buy_chunks[0])
-            messages_sent = True
-            for chunk in buy_chunks[1:]:
-                await callback.message.answer(chunk)
-    
-    # 2. Повідомлення про "Продам"
-    sell_data = analysis.get("продам")
-    if sell_data:
-        sell_text = format_section("продам", sell_data, culture_name)
-        safe_sell_text = html.escape(sell_text)
-        sell_chunks = [safe_sell_text[i:i+4000] for i in range(0, len(safe_sell_text), 4000)]
-        if sell_chunks:
-            if not messages_sent:
-                await wait_msg.edit_text(sell_chunks[0])
-                messages_sent = True
-            else:
-                await callback.message.answer(sell_chunks[0])
-            for chunk in sell_chunks[1:]:
-                await callback.message.answer(chunk)
-    
-    # 3. Повідомлення про порівняльний аналіз
-    if buy_data and sell_data:
-        comparison_text = format_comparison(buy_data, sell_data, culture_name)
-        safe_comparison_text = html.escape(comparison_text)
-        comparison_chunks = [safe_comparison_text[i:i+4000] for i in range(0, len(safe_comparison_text), 4000)]
-        if comparison_chunks:
-            if not messages_sent:
-                await wait_msg.edit_text(comparison_chunks[0])
-            else:
-                await callback.message.answer(comparison_chunks[0])
-            for chunk in comparison_chunks[1:]:
-                await callback.message.answer(chunk)
-    
-    # Якщо немає даних взагалі
-    if not buy_data and not sell_data:
-        await wait_msg.edit_text("❌ На жаль, дані відсутні для обраної культури.")
+            # Завантаження даних, аналіз за період та форматування (з кешу, якщо є)
+            with tracing.span("report"):
+                chunks = await build_report(culture_name, period, on_progress=indicator.update,
+                                            on_preview=indicator.preview)
+        finally:
+            await indicator.close()
+
+        # Перша частина замінює повідомлення-індикатор, решта надсилаються окремо:
+        # "Куплю", "Продам" та порівняльний аналіз (або повідомлення про відсутність даних).
+        # Черга зберігає порядок частин у чаті та дотримується лімітів Telegram
+        with tracing.span("telegram.first"):
+            await outbound.edit_text(callback.message, chunks[0])
+        metrics.report_seconds.observe(time.perf_counter() - started)
+        with tracing.span("telegram.rest", chunks=len(chunks) - 1):
+            for chunk in chunks[1:]:
+                await outbound.answer(callback.message, chunk)
+    finally:
+        await _finish_trace(callback, trace)
+
+async def _finish_trace(event: types.Message | types.CallbackQuery, trace: tracing.Trace):
+    """Завершує трасу запиту; якщо нею завершилося профілювання, повідомляє адміністратора."""
+    profile_path = tracing.finish(trace)
+    if profile_path:
+        await outbound.send_message(event.bot, ADMIN_USER_ID, f"📊 Профіль збережено: {profile_path}")
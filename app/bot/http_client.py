@@ -0,0 +1,95 @@
+"""
+Модуль спільного HTTP клієнта для звернень до сторонніх сайтів.
+
+Одна сесія aiohttp з пулом з'єднань живе весь час роботи бота:
+вона створюється при старті в app.main та закривається разом
+із сесією бота. Парсери позичають її через get_session(), тож
+TCP/TLS рукостискання з одним хостом не повторюються на кожен запит.
+"""
+import aiohttp
+from app.config_loader import (
+    HTTP_LIMIT_PER_HOST, HTTP_TIMEOUT, HTTP_CONNECT_TIMEOUT, HTTP_KEEPALIVE, HTTP_DNS_TTL
+)
+from app.bot import metrics
+
+_session: aiohttp.ClientSession | None = None
+_stats = {
+    "requests": 0,
+}
+
+
+async def _on_request_start(session, ctx, params):
+    _stats["requests"] += 1
+
+
+async def _on_connection_create_end(session, ctx, params):
+    metrics.http_connections_opened.inc()
+
+
+async def _on_connection_reuseconn(session, ctx, params):
+    metrics.http_connections_reused.inc()
+
+
+def _build_session() -> aiohttp.ClientSession:
+    """Створює сесію з keep-alive, кешем DNS, лімітами та тайм-аутами."""
+    connector = aiohttp.TCPConnector(
+        limit_per_host=HTTP_LIMIT_PER_HOST,
+        keepalive_timeout=HTTP_KEEPALIVE,
+        ttl_dns_cache=HTTP_DNS_TTL,
+        use_dns_cache=True,
+    )
+    timeout = aiohttp.ClientTimeout(total=HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)
+    trace_config.on_connection_create_end.append(_on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(_on_connection_reuseconn)
+
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        trace_configs=[trace_config],
+    )
+
+
+async def start_session() -> aiohttp.ClientSession:
+    """Створює спільну сесію (якщо її ще немає). Викликається при старті бота."""
+    global _session
+    if _session is None or _session.closed:
+        _session = _build_session()
+    return _session
+
+
+async def close_session():
+    """Закриває спільну сесію. Викликається при зупинці бота."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+def get_session() -> aiohttp.ClientSession | None:
+    """Повертає спільну сесію або None, якщо вона не запущена."""
+    if _session is None or _session.closed:
+        return None
+    return _session
+
+
+def get_stats() -> dict:
+    """
+    Статистика використання з'єднань.
+
+    Returns:
+        Словник з кількістю запитів, нових та повторно використаних з'єднань
+        і часткою запитів, що обійшлися без нового рукостискання
+    """
+    stats = dict(_stats)
+    stats["connections_created"] = metrics.http_connections_opened.total()
+    stats["connections_reused"] = metrics.http_connections_reused.total()
+    total = stats["connections_created"] + stats["connections_reused"]
+    stats["reuse_ratio"] = round(stats["connections_reused"] / total, 3) if total else 0.0
+    return stats
+
+
+metrics.Gauge("graintrade_http_reuse_ratio", "Частка запитів без нового рукостискання",
+              lambda: get_stats()["reuse_ratio"])
@@ -1,5 +1,6 @@
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from app.bot.crops_list import crops
+from app.bot.periods import Period
 
 CULTURE_URLS = {
     "Кукурудза": "https://graintrade.com.ua/birzha/kuplyu-ta-prodam-kukurudzu-v-ukraini-f8",
@@ -22,19 +23,26 @@ CULTURE_URLS = {
 }
 
 
-def build_culture_keyboard(year_filter: int = None) -> InlineKeyboardMarkup:
+def culture_by_index(index: int) -> str | None:
+    """Назва культури за її індексом у CULTURE_URLS або None."""
+    names = list(CULTURE_URLS)
+    return names[index] if 0 <= index < len(names) else None
+
+
+def build_culture_keyboard(period: Period | None = None) -> InlineKeyboardMarkup:
     """
     Будує клавіатуру для вибору культури.
     
     Args:
-        year_filter: Якщо вказано (наприклад, 2025), callback_data буде містити префікс culture_2025:
+        period: Період аналізу. callback_data має вигляд report:<індекс культури>[:<період>],
+            де період закодовано Period.encode() (обмеження Telegram - 64 байти)
     """
     # будуємо список рядків (по 2 кнопки в рядок)
     keyboard_rows = []
     row = []
-    prefix = f"culture_{year_filter}:" if year_filter else "culture:"
+    suffix = f":{period.encode()}" if period else ""
     for i, name in enumerate(CULTURE_URLS):
-        btn = InlineKeyboardButton(text=name, callback_data=f"{prefix}{name}")
+        btn = InlineKeyboardButton(text=name, callback_data=f"report:{i}{suffix}")
         row.append(btn)
         if (i + 1) % 2 == 0:
             keyboard_rows.append(row)
@@ -0,0 +1,238 @@
+"""
+Модуль міжкультурної аналітики ринку.
+
+З оголошень усіх культур будується вирівняна матриця середніх денних цін:
+рядок на культуру, стовпець на кожен з останніх MARKET_DAYS днів, окремо
+для "куплю" та "продам". Оголошення беруться зі знімків у кеші, а для
+культур, яких там немає, - з локального сховища; сайт при цьому
+не обходиться. З матриці рахуються спреди між спорідненими культурами
+(наприклад, Пшениця 2 клас - Пшениця 3 клас), кореляція денних цін
+та відносний імпульс за 7 днів.
+
+Матриця будується один раз на набір версій даних культур та поточний день
+і спільна для всіх запитів огляду; одночасні побудови об'єднуються.
+"""
+import math
+import statistics
+import time
+from datetime import date
+from app.config_loader import MARKET_DAYS
+from app.bot import metrics, offers, tracing
+from app.bot.keyboards import CULTURE_URLS
+from app.bot.records import OfferRow, OfferType
+from app.bot.singleflight import SingleFlight
+
+MOMENTUM_DAYS = 7
+"""Довжина вікна імпульсу та спреду, днів."""
+
+MIN_COMMON_DAYS = 5
+"""Мінімум спільних днів з цінами обох культур для кореляції."""
+
+
+def _mean(values: list[float]) -> float | None:
+    return sum(values) / len(values) if values else None
+
+
+def related_pairs(cultures: list[str]) -> list[tuple[str, str]]:
+    """
+    Пари сусідніх споріднених культур для спредів.
+
+    Спорідненими вважаються культури з однаковим першим словом назви
+    (класи пшениці, різновиди ріпаку чи сої) у порядку CULTURE_URLS.
+    """
+    pairs = []
+    for a, b in zip(cultures, cultures[1:]):
+        if a.split()[0] == b.split()[0]:
+            pairs.append((a, b))
+    return pairs
+
+
+class MarketMatrix:
+    """
+    Вирівняна матриця середніх денних цін культур.
+
+    Args:
+        rows_by_culture: {культура: оголошення}
+        today: Останній день матриці (порядковий номер)
+        days: Кількість днів матриці
+
+    Attributes:
+        cultures: Назви культур (рядки матриці)
+        days: Дні матриці за зростанням (порядкові номери)
+        prices: {тип оголошень: [[середня ціна дня або None] для кожної культури]}
+    """
+
+    def __init__(self, rows_by_culture: dict[str, list[OfferRow]], today: int, days: int = MARKET_DAYS):
+        self.cultures = list(rows_by_culture)
+        first = today - days + 1
+        self.days = list(range(first, today + 1))
+        self._row = {name: i for i, name in enumerate(self.cultures)}
+        self._overviews: dict[str, dict] = {}
+
+        self.prices: dict[str, list[list[float | None]]] = {}
+        totals = [[[0] * days for _ in self.cultures] for _ in OfferType]
+        counts = [[[0] * days for _ in self.cultures] for _ in OfferType]
+        for i, rows in enumerate(rows_by_culture.values()):
+            for r in rows:
+                j = r.day - first
+                if 0 <= j < days and r.price > 0:
+                    totals[r.kind][i][j] += r.price
+                    counts[r.kind][i][j] += 1
+        for kind in OfferType:
+            self.prices[kind.label] = [
+                [total / count if count else None for total, count in zip(totals[kind][i], counts[kind][i])]
+                for i in range(len(self.cultures))
+            ]
+
+    def series(self, culture_name: str, offer_type: str) -> list[float | None]:
+        """Середні ціни культури по днях матриці (None - оголошень з ціною не було)."""
+        return self.prices[offer_type][self._row[culture_name]]
+
+    def momentum(self, offer_type: str) -> dict[str, tuple[float, float]]:
+        """
+        Імпульс культур за MOMENTUM_DAYS днів.
+
+        Returns:
+            {культура: (зміна середньої ціни останніх 7 днів проти попередніх 7, %;
+            та сама зміна відносно медіани ринку, п.п.)} - лише для культур
+            з цінами в обох тижнях
+        """
+        changes = {}
+        for name in self.cultures:
+            series = self.series(name, offer_type)
+            recent = _mean([p for p in series[-MOMENTUM_DAYS:] if p is not None])
+            previous = _mean([p for p in series[-2 * MOMENTUM_DAYS:-MOMENTUM_DAYS] if p is not None])
+            if recent is not None and previous:
+                changes[name] = (recent - previous) / previous * 100
+        if not changes:
+            return {}
+        market = statistics.median(changes.values())
+        return {name: (change, change - market) for name, change in changes.items()}
+
+    def spread(self, a: str, b: str, offer_type: str) -> tuple[float, float | None] | None:
+        """
+        Спред ціни a над b по днях, де є ціни обох культур.
+
+        Returns:
+            (середній спред за останні MOMENTUM_DAYS днів, такий самий спред
+            тижнем раніше або None) або None, якщо спільних днів цього тижня немає
+        """
+        diffs = [pa - pb if pa is not None and pb is not None else None
+                 for pa, pb in zip(self.series(a, offer_type), self.series(b, offer_type))]
+        recent = _mean([d for d in diffs[-MOMENTUM_DAYS:] if d is not None])
+        if recent is None:
+            return None
+        previous = _mean([d for d in diffs[-2 * MOMENTUM_DAYS:-MOMENTUM_DAYS] if d is not None])
+        return recent, previous
+
+    def correlation(self, a: str, b: str, offer_type: str) -> float | None:
+        """Кореляція Пірсона денних цін двох культур (None, якщо спільних днів менше MIN_COMMON_DAYS)."""
+        pairs = [(pa, pb) for pa, pb in zip(self.series(a, offer_type), self.series(b, offer_type))
+                 if pa is not None and pb is not None]
+        if len(pairs) < MIN_COMMON_DAYS:
+            return None
+        mean_a = sum(pa for pa, _ in pairs) / len(pairs)
+        mean_b = sum(pb for _, pb in pairs) / len(pairs)
+        cov = sum((pa - mean_a) * (pb - mean_b) for pa, pb in pairs)
+        var_a = sum((pa - mean_a) ** 2 for pa, _ in pairs)
+        var_b = sum((pb - mean_b) ** 2 for _, pb in pairs)
+        if not var_a or not var_b:
+            return None
+        return cov / math.sqrt(var_a * var_b)
+
+    def top_correlations(self, offer_type: str, limit: int = 5) -> list[tuple[str, str, float]]:
+        """Пари культур з найсильнішою кореляцією денних цін (за модулем)."""
+        result = []
+        for i, a in enumerate(self.cultures):
+            for b in self.cultures[i + 1:]:
+                r = self.correlation(a, b, offer_type)
+                if r is not None:
+                    result.append((a, b, r))
+        result.sort(key=lambda x: -abs(x[2]))
+        return result[:limit]
+
+    def overview(self, offer_type: str) -> dict:
+        """
+        Огляд ринку для одного типу оголошень (рахується один раз на матрицю).
+
+        Returns:
+            Словник: momentum - [(культура, зміна %, відносно ринку п.п.)] за спаданням,
+            spreads - [(a, b, спред, спред тижнем раніше, кореляція)] для споріднених пар,
+            correlations - top_correlations(), cultures - кількість культур з цінами
+        """
+        cached = self._overviews.get(offer_type)
+        if cached is not None:
+            return cached
+        momentum = self.momentum(offer_type)
+        spreads = []
+        for a, b in related_pairs(self.cultures):
+            spread = self.spread(a, b, offer_type)
+            if spread is not None:
+                spreads.append((a, b, spread[0], spread[1], self.correlation(a, b, offer_type)))
+        overview = self._overviews[offer_type] = {
+            "offer_type": offer_type,
+            "days": len(self.days),
+            "cultures": sum(any(p is not None for p in row) for row in self.prices[offer_type]),
+            "momentum": sorted(((name, change, relative) for name, (change, relative) in momentum.items()),
+                               key=lambda x: -x[2]),
+            "spreads": spreads,
+            "correlations": self.top_correlations(offer_type),
+        }
+        return overview
+
+
+_matrix: tuple[str, MarketMatrix] | None = None  # (ключ версій даних, матриця)
+builds = SingleFlight()  # спільні побудови матриці
+
+
+async def _sources() -> dict[str, tuple[str, list[OfferRow] | None]]:
+    """
+    Джерела даних культур, оголошення яких є в кеші чи сховищі.
+
+    Returns:
+        {культура: (версія даних, оголошення зі знімка в кеші або None - завантажити зі сховища)}
+    """
+    sources = {}
+    for name in CULTURE_URLS:
+        snapshot = offers.cache.peek(name)
+        if snapshot is not None:
+            sources[name] = (f"v{snapshot.version}", snapshot.rows)
+        elif offers.store is not None:
+            fetched_at = await offers.store.fetched_at(name)
+            if fetched_at:
+                sources[name] = (f"s{fetched_at}", None)
+    return sources
+
+
+async def _build(key: str, sources: dict[str, tuple[str, list[OfferRow] | None]]) -> MarketMatrix:
+    global _matrix
+    rows_by_culture = {}
+    with tracing.span("market.load", cultures=len(sources)):
+        for name, (_, rows) in sources.items():
+            rows_by_culture[name] = rows if rows is not None else await offers.store.load(name)
+
+    started = time.perf_counter()
+    rows = sum(len(r) for r in rows_by_culture.values())
+    with tracing.span("market.build", rows=rows):
+        matrix = MarketMatrix(rows_by_culture, date.today().toordinal())
+    metrics.analyze_seconds.observe(time.perf_counter() - started, engine="market")
+    metrics.analyze_rows.observe(rows)
+    _matrix = (key, matrix)
+    return matrix
+
+
+async def get_matrix() -> MarketMatrix | None:
+    """
+    Спільна матриця цін усіх культур (перебудовується, лише коли змінилися дані чи день).
+
+    Returns:
+        Матриця або None, якщо ні для однієї культури ще немає даних
+    """
+    await offers.sync_invalidations()
+    sources = await _sources()
+    if not sources:
+        return None
+    key = date.today().isoformat() + "|" + ",".join(f"{name}={v}" for name, (v, _) in sources.items())
+    if _matrix is not None and _matrix[0] == key:
+        return _matrix[1]
+    return await builds.do(key, lambda: _build(key, sources))
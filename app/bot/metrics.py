@@ -0,0 +1,202 @@
+"""
+Модуль метрик роботи бота.
+
+Лічильники та гістограми оновлюються в місцях вимірювання (парсер,
+аналітика, черга повідомлень, обробники), а значення, що вже є в інших
+модулях (статистика кешу, кількість обходів у роботі), читаються через
+функції в момент збору. Метрики віддаються у текстовому форматі Prometheus
+на локальному HTTP порту METRICS_PORT та коротким зведенням адміністратору.
+"""
+import math
+from typing import Callable
+from aiohttp import web
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+ROW_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000)
+
+_registry: list = []
+_runner: web.AppRunner | None = None
+
+
+def _labels_text(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Лічильник, що лише зростає (окремо для кожного набору міток)."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {} if labels else {(): 0}
+        _registry.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def total(self) -> float:
+        return sum(self._values.values())
+
+    def samples(self) -> list[str]:
+        return [f"{self.name}{_labels_text(self.labels, key)} {_number(v)}" for key, v in self._values.items()]
+
+
+class Histogram:
+    """Розподіл значень (тривалість, кількість рядків) за кошиками."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: tuple[float, ...] = LATENCY_BUCKETS,
+                 labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = tuple(buckets) + (math.inf,)
+        self._series: dict[tuple[str, ...], list] = {}  # {мітки: [лічильники кошиків, сума, кількість]}
+        _registry.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+        counts = series[0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        series[1] += value
+        series[2] += 1
+
+    def count(self) -> int:
+        return sum(s[2] for s in self._series.values())
+
+    def mean(self) -> float:
+        count = self.count()
+        return sum(s[1] for s in self._series.values()) / count if count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Наближений квантиль (верхня межа кошика) по всіх мітках."""
+        count = self.count()
+        if not count:
+            return 0.0
+        target = q * count
+        cumulative = 0
+        for i, bound in enumerate(self.buckets):
+            cumulative += sum(s[0][i] for s in self._series.values())
+            if cumulative >= target:
+                return bound if bound != math.inf else self.buckets[-2]
+        return self.buckets[-2]
+
+    def samples(self) -> list[str]:
+        lines = []
+        for key, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels_text(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels_text(self.labels, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels_text(self.labels, key)} {count}")
+        return lines
+
+
+class Gauge:
+    """Поточне значення, що обчислюється функцією в момент збору метрик."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, read: Callable[[], float]):
+        self.name = name
+        self.help = help_text
+        self.read = read
+        _registry.append(self)
+
+    def samples(self) -> list[str]:
+        return [f"{self.name} {_number(self.read())}"]
+
+
+page_fetch_seconds = Histogram("graintrade_page_fetch_seconds", "Завантаження сторінки лістингу", labels=("status",))
+page_parse_seconds = Histogram("graintrade_page_parse_seconds", "Розбір сторінки лістингу")
+analyze_seconds = Histogram("graintrade_analyze_seconds", "Тривалість аналізу оголошень", labels=("engine",))
+analyze_rows = Histogram("graintrade_analyze_rows", "Кількість оголошень, опрацьованих аналізом", ROW_BUCKETS)
+report_seconds = Histogram("graintrade_report_seconds", "Від натискання на культуру до готового звіту")
+summary_seconds = Histogram("graintrade_summary_seconds", "Від команди /monitor_all до готового зведення")
+telegram_send_seconds = Histogram("graintrade_telegram_send_seconds", "Від постановки в чергу до відповіді Bot API")
+telegram_retry_after = Counter("graintrade_telegram_retry_after_total", "Відповіді 429 від Bot API")
+telegram_failures = Counter("graintrade_telegram_failures_total", "Запити до Bot API, що завершилися помилкою")
+http_connections_opened = Counter("graintrade_http_connections_opened_total",
+                                  "Нові з'єднання HTTP клієнта парсера (з рукостисканням)")
+http_connections_reused = Counter("graintrade_http_connections_reused_total",
+                                  "Запити HTTP клієнта через уже відкрите з'єднання")
+
+
+def render() -> str:
+    """Усі метрики у текстовому форматі Prometheus."""
+    lines = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+def summary() -> dict:
+    """Коротке зведення для адміністратора."""
+    gauges = {m.name: m.read() for m in _registry if isinstance(m, Gauge)}
+    return {
+        "pages": page_fetch_seconds.count(),
+        "page_errors": sum(s[2] for key, s in page_fetch_seconds._series.items() if key != ("200",)),
+        "page_p95": page_fetch_seconds.quantile(0.95),
+        "parse_avg": page_parse_seconds.mean(),
+        "analyze_count": analyze_seconds.count(),
+        "analyze_avg": analyze_seconds.mean(),
+        "analyze_rows_avg": analyze_rows.mean(),
+        "report_count": report_seconds.count(),
+        "report_p50": report_seconds.quantile(0.5),
+        "report_p95": report_seconds.quantile(0.95),
+        "cache_hit_ratio": gauges.get("graintrade_cache_hit_ratio", 0.0),
+        "crawls_in_flight": gauges.get("graintrade_crawls_in_flight", 0),
+        "http_opened": http_connections_opened.total(),
+        "http_reused": http_connections_reused.total(),
+        "send_count": telegram_send_seconds.count(),
+        "send_p95": telegram_send_seconds.quantile(0.95),
+        "retry_after": telegram_retry_after.total(),
+        "queue_depth": gauges.get("graintrade_telegram_queue_depth", 0),
+    }
+
+
+async def _metrics(request: web.Request) -> web.Response:
+    return web.Response(text=render(), content_type="text/plain", charset="utf-8")
+
+
+async def start_server(host: str, port: int):
+    """Запускає HTTP сервер з /metrics (формат Prometheus)."""
+    global _runner
+    app = web.Application()
+    app.router.add_get("/metrics", _metrics)
+    _runner = web.AppRunner(app)
+    await _runner.setup()
+    await web.TCPSite(_runner, host, port).start()
+    print(f"📈 Метрики: http://{host}:{port}/metrics")
+
+
+async def stop_server():
+    """Зупиняє сервер метрик."""
+    global _runner
+    if _runner is not None:
+        await _runner.cleanup()
+        _runner = None
@@ -0,0 +1,305 @@
+"""
+Модуль доступу до оголошень культур.
+
+Об'єднує кеш, спільні (single-flight) завантаження з сайту, локальне
+сховище оголошень та фонове оновлення застарілих записів. Використовується
+обробниками команд та планувальником попереднього прогріву кешу.
+"""
+import asyncio
+import contextlib
+import itertools
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import AsyncIterator
+from app.config_loader import MAX_PAGES, CACHE_TTL, PREVIEW_PAGES
+from app.bot.keyboards import CULTURE_URLS
+from app.bot.parser import CrawlStats, iter_pages
+from app.bot.cache import OfferCache
+from app.bot.singleflight import SingleFlight
+from app.bot.scheduler import PrewarmScheduler
+from app.bot.store import OfferStore
+from app.bot.records import OfferRow
+from app.bot.progress import ProgressChannel, ProgressListener, PreviewListener
+from app.bot import metrics, tracing
+
+cache = OfferCache()  # знімки оголошень по культурі: {culture_name: Snapshot}
+crawls = SingleFlight()  # спільні завантаження культур: один обхід сайту на URL
+_refresh_tasks = {}  # фонові оновлення застарілих записів кешу: {culture_name: task}
+_versions = itertools.count(1)  # лічильник версій знімків
+_progress: dict[str, ProgressChannel] = {}  # прогрес спільних завантажень: {flight_key: channel}
+store: OfferStore | None = None  # локальне сховище; відкривається в app.main
+_epochs: dict[str, int] = {}  # епохи кешу культур, які цей процес уже врахував
+_epochs_checked = 0.0  # коли епохи востаннє звірялися зі сховищем (time.monotonic())
+
+_EPOCH_CHECK_INTERVAL = 1.0
+"""Як часто звіряти епохи кешу зі сховищем (скидання кешу іншими процесами), с."""
+
+metrics.Gauge("graintrade_cache_hit_ratio", "Частка влучань у кеш оголошень", lambda: cache.stats()["hit_ratio"])
+metrics.Gauge("graintrade_cache_entries", "Записів у кеші оголошень", lambda: cache.stats()["entries"])
+metrics.Gauge("graintrade_crawls_in_flight", "Обходи сайту, що виконуються зараз", crawls.in_flight)
+
+
+def open_store(path: str):
+    """Відкриває локальне сховище оголошень. Порожній шлях вимикає сховище."""
+    global store
+    if path:
+        store = OfferStore(path)
+
+
+def close_store():
+    """Закриває локальне сховище оголошень."""
+    global store
+    if store is not None:
+        store.close()
+        store = None
+
+
+@dataclass(slots=True)
+class Snapshot:
+    """
+    Знімок оголошень культури в кеші.
+
+    Поля оголошені через __slots__, щоб estimate_size рахував рядки знімка
+    і ліміт CACHE_MAX_BYTES працював.
+
+    Attributes:
+        rows: Оголошення в порядку лістингу
+        version: Номер версії даних (зростає з кожним завантаженням);
+            за ним кешуються похідні результати - аналітика та звіти
+        since: Нижня межа дат, якщо обхід був обмежений датами, інакше None
+        base: (версія попереднього знімка, кількість нових оголошень), якщо
+            знімок - це нові оголошення перед усіма оголошеннями попереднього
+            знімка (оновлення зі сховищем); дозволяє оновити аналітику
+            інкрементально
+    """
+    rows: list[OfferRow]
+    version: int
+    since: date | None = None
+    base: tuple[int, int] | None = None
+
+    def covers(self, date_from: date | None) -> bool:
+        """Чи містить знімок усі оголошення, починаючи з date_from."""
+        return self.since is None or (date_from is not None and self.since <= date_from)
+
+
+async def _collect(pages: AsyncIterator[list[OfferRow]], on_page: PreviewListener | None) -> list[OfferRow]:
+    """Збирає сторінки обходу, викликаючи on_page(оголошення_досі, сторінок) після кожної."""
+    rows = []
+    count = 0
+    async with contextlib.aclosing(pages):
+        async for page_rows in pages:
+            rows.extend(page_rows)
+            count += 1
+            if on_page is not None:
+                on_page(rows, count)
+    return rows
+
+
+async def _crawl(culture_name: str, date_from: date | None = None, progress: ProgressListener | None = None,
+                 on_page: PreviewListener | None = None) -> list[OfferRow]:
+    """
+    Обходить сайт для культури.
+
+    Зі сховищем обхід інкрементальний: завантажуються сторінки до першого
+    вже збереженого оголошення, нові оголошення додаються до сховища,
+    а повертається вся збережена історія культури. Без сховища обхід
+    зупиняється, щойно пройдено дату date_from.
+
+    Сторінки обробляються в міру надходження; on_page отримує оголошення
+    всіх розібраних сторінок лише для повного (не інкрементального) обходу,
+    бо нові сторінки інкрементального обходу - не вся історія культури.
+
+    Сховище може бути спільним для кількох процесів: культуру обходить
+    лише той, хто взяв блокування, а решта після очікування беруть
+    щойно збережені дані, якщо вони не старші за CACHE_TTL.
+
+    Якщо частину сторінок не вдалося завантажити (або інкрементальний обхід
+    дійшов до MAX_PAGES, не зустрівши відомого оголошення), в історії
+    лишається пропуск: час обходу тоді не оновлюється, а наступний обхід
+    буде повним, щоб завантажити пропущені сторінки.
+    """
+    url = CULTURE_URLS[culture_name]
+    if store is None:
+        with tracing.span("crawl", date_from=date_from):
+            return await _collect(iter_pages(url, date_from=date_from, progress=progress), on_page)
+
+    with tracing.span("store.locked") as span:
+        async with store.lock(f"crawl:{culture_name}"):
+            if time.time() - await store.fetched_at(culture_name) < CACHE_TTL:
+                span["shared"] = True  # Культуру щойно обійшов інший процес
+            else:
+                full = await store.needs_full_crawl(culture_name)
+                known_keys = None if full else await store.known_keys(culture_name)
+                stats = CrawlStats()
+                with tracing.span("crawl", incremental=bool(known_keys), full=full):
+                    rows = await _collect(iter_pages(url, known_keys=known_keys, progress=progress, stats=stats),
+                                          None if known_keys else on_page)
+                with tracing.span("store.ingest", rows=len(rows)):
+                    await store.ingest(culture_name, rows, reorder=not known_keys)
+                gap = bool(stats.failed) or (bool(known_keys) and stats.truncated)
+                if gap:
+                    print(f"Обхід {culture_name} неповний (пропущені сторінки: {stats.failed}), "
+                          f"наступний обхід буде повним")
+                else:
+                    await store.mark_fetched(culture_name)
+                if gap != full:
+                    await store.set_needs_full_crawl(culture_name, gap)
+    with tracing.span("store.load"):
+        return await store.load(culture_name)
+
+
+def _extends(rows: list[OfferRow], previous: Snapshot | None) -> tuple[int, int] | None:
+    """
+    Поле Snapshot.base для нових рядків відносно попереднього знімка.
+
+    Зі сховища оголошення зазвичай лише додаються перед уже збереженими,
+    тому нові рядки - це початок списку, а решта збігається з попереднім
+    знімком (перевіряються всі ключі: повний обхід після пропуску вставляє
+    оголошення всередину історії). Без сховища обхід обмежений MAX_PAGES
+    сторінками, і старі оголошення випадають з кінця - такий знімок
+    аналізується заново.
+    """
+    if store is None or previous is None or previous.since is not None:
+        return None
+    added = len(rows) - len(previous.rows)
+    if added < 0 or any(a.key != b.key for a, b in zip(rows[added:], previous.rows)):
+        return None
+    return previous.version, added
+
+
+async def _load(culture_name: str, date_from: date | None, flight_key: str) -> Snapshot:
+    """Завантажує знімок культури та публікує його в кеш."""
+    channel = _progress[flight_key]
+    channel.publish(0, MAX_PAGES)
+
+    def on_page(rows: list[OfferRow], pages: int):
+        # Попередній звіт має сенс, лише поки попереду ще є сторінки
+        if pages == PREVIEW_PAGES and pages < MAX_PAGES:
+            channel.publish_preview(rows[:], pages)
+
+    try:
+        rows = await _crawl(culture_name, date_from, channel.publish, on_page)
+    finally:
+        if _progress.get(flight_key) is channel:
+            del _progress[flight_key]
+
+    current = cache.peek(culture_name)
+    snapshot = Snapshot(rows, next(_versions), date_from, _extends(rows, current))
+    # Обмежений датами знімок не витісняє повний
+    if snapshot.since is None or current is None or not current.covers(None):
+        cache.put(culture_name, snapshot)
+    return snapshot
+
+
+async def fetch_snapshot(culture_name: str, date_from: date | None = None,
+                         on_progress: ProgressListener | None = None,
+                         on_preview: PreviewListener | None = None) -> Snapshot:
+    """
+    Завантажує оголошення культури з сайту та кешує їх.
+
+    Одночасні запити тієї самої культури (з тими самими межами) об'єднуються
+    в один обхід сайту, і кожен з них отримує прогрес обходу в on_progress
+    та оголошення перших PREVIEW_PAGES сторінок в on_preview.
+    Зі сховищем межі дат ігноруються - йому потрібна повна історія,
+    а інкрементальний обхід і так короткий.
+    """
+    if store is not None:
+        date_from = None
+    url = CULTURE_URLS[culture_name]
+    flight_key = url if date_from is None else f"{url}#{date_from}"
+
+    channel = _progress.get(flight_key)
+    if channel is None:
+        channel = _progress[flight_key] = ProgressChannel()
+    unsubscribe = None
+    if on_progress is not None or on_preview is not None:
+        unsubscribe = channel.subscribe(on_progress, on_preview)
+    try:
+        return await crawls.do(flight_key, lambda: _load(culture_name, date_from, flight_key))
+    finally:
+        if unsubscribe is not None:
+            unsubscribe()
+
+
+async def fetch_rows(culture_name: str) -> list[OfferRow]:
+    """Завантажує повні дані культури з сайту та кешує їх (для фонового прогріву)."""
+    return (await fetch_snapshot(culture_name)).rows
+
+
+async def _refresh(culture_name: str, date_from: date | None):
+    """Фоново перезавантажує застарілий запис кешу."""
+    try:
+        await fetch_snapshot(culture_name, date_from)
+    except Exception as e:
+        print(f"Помилка фонового оновлення кешу {culture_name}: {e}")
+    finally:
+        _refresh_tasks.pop(culture_name, None)
+
+
+async def invalidate(culture_name: str | None = None) -> int:
+    """
+    Скидає кеш культури (або всіх культур, якщо її не вказано).
+
+    У сховищі дані позначаються застарілими, тому наступний запит
+    обійде сайт, а не візьме їх зі спільної бази; решта процесів скидають
+    свої знімки за новою епохою кешу (sync_invalidations).
+
+    Returns:
+        Кількість видалених записів кешу
+    """
+    removed = cache.invalidate(culture_name)
+    if store is not None:
+        _epochs.update(await store.invalidate([culture_name] if culture_name else list(CULTURE_URLS)))
+    return removed
+
+
+async def sync_invalidations():
+    """
+    Скидає знімки культур, кеш яких скинув інший процес.
+
+    Епохи звіряються зі сховищем не частіше ніж раз на _EPOCH_CHECK_INTERVAL.
+    """
+    global _epochs_checked
+    now = time.monotonic()
+    if store is None or now - _epochs_checked < _EPOCH_CHECK_INTERVAL:
+        return
+    _epochs_checked = now
+    for name, epoch in (await store.epochs()).items():
+        if _epochs.get(name, 0) != epoch:
+            cache.invalidate(name)
+            _epochs[name] = epoch
+
+
+async def get_snapshot(culture_name: str, date_from: date | None = None,
+                       on_progress: ProgressListener | None = None,
+                       on_preview: PreviewListener | None = None,
+                       budget: asyncio.Semaphore | None = None) -> Snapshot:
+    """
+    Повертає знімок оголошень культури з кешу або з сайту.
+
+    Кеш зберігає один знімок на культуру: повні дані обслуговують і запити
+    за будь-який період. date_from (початок періоду запиту) лише дозволяє
+    скоротити обхід, якщо повних даних ще немає і сховище вимкнено.
+    Застарілий знімок віддається одразу, а його оновлення
+    запускається у фоні. on_progress та on_preview викликаються лише тоді,
+    коли користувач чекає на обхід сайту. budget обмежує кількість
+    одночасних обходів (відповідь з кешу його не витрачає).
+    """
+    await sync_invalidations()
+
+    cached = cache.get(culture_name)
+    scheduler.mark_requested(culture_name, stale=cached is not None and not cached[1])
+    if cached is not None and cached[0].covers(date_from):
+        snapshot, fresh = cached
+        # Запущений планувальник сам оновить застарілий знімок першим у черзі
+        if not fresh and not scheduler.active and culture_name not in _refresh_tasks:
+            _refresh_tasks[culture_name] = asyncio.create_task(_refresh(culture_name, snapshot.since))
+        return snapshot
+
+    async with budget if budget is not None else contextlib.nullcontext():
+        return await fetch_snapshot(culture_name, date_from, on_progress, on_preview)
+
+
+scheduler = PrewarmScheduler(fetch_rows, CULTURE_URLS)
+"""Фоновий прогрів кешу для всіх культур; запускається в app.main."""
@@ -0,0 +1,245 @@
+"""
+Модуль черги вихідних повідомлень Telegram.
+
+Усі надсилання та редагування повідомлень проходять через спільну чергу:
+- глобальний ліміт (TG_GLOBAL_RATE повідомлень/с на весь бот з невеликим
+  запасом TG_GLOBAL_BURST) та ліміт на чат (TG_CHAT_RATE повідомлень/с
+  з запасом TG_CHAT_BURST) - token bucket;
+- у межах одного чату порядок повідомлень зберігається, а різні чати
+  обслуговуються паралельно;
+- відповідь 429 (TelegramRetryAfter) призупиняє на retry_after секунд і чат,
+  і всі надсилання бота, після чого запит повторюється.
+"""
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+from aiogram import Bot, types
+from aiogram.exceptions import TelegramRetryAfter
+from app.config_loader import TG_GLOBAL_RATE, TG_GLOBAL_BURST, TG_CHAT_RATE, TG_CHAT_BURST, TG_MAX_RETRIES
+from app.bot import metrics
+
+
+class TokenBucket:
+    """
+    Обмежувач швидкості "відро з токенами".
+
+    Токени відновлюються зі швидкістю rate за секунду до capacity.
+    Кожен запит резервує токен наперед, тому одночасні викликачі
+    рівномірно розподіляються в часі.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Резервує токен і повертає, скільки секунд треба зачекати до його появи."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self):
+        """Чекає на вільний токен."""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def idle(self) -> bool:
+        """Чи відновилися всі токени (відро можна не зберігати)."""
+        return self._tokens + (time.monotonic() - self._updated) * self.rate >= self.capacity
+
+    def pause(self, seconds: float):
+        """Забирає токени так, щоб наступний запит пройшов не раніше ніж за seconds."""
+        self.reserve()
+        # Повертаємо щойно зарезервований токен і забираємо запас на seconds наперед
+        self._tokens = min(self._tokens + 1, 1.0) - seconds * self.rate
+
+
+@dataclass
+class _Job:
+    factory: Callable[[], Awaitable[Any]]
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class SendQueue:
+    """
+    Диспетчер вихідних запитів з лімітами та повторами після 429.
+
+    Args:
+        global_rate: Максимум запитів за секунду для всього бота
+        global_burst: Скільки запитів бот може надіслати поспіль без очікування
+            (невеликий запас, інакше за першу секунду піде до двох global_rate)
+        chat_rate: Максимум запитів за секунду для одного чату
+        chat_burst: Скільки запитів поспіль чат може надіслати без очікування
+        max_retries: Скільки разів повторювати запит після відповіді 429
+    """
+
+    def __init__(self, global_rate: float = TG_GLOBAL_RATE, chat_rate: float = TG_CHAT_RATE,
+                 chat_burst: float = TG_CHAT_BURST, max_retries: int = TG_MAX_RETRIES,
+                 global_burst: float = TG_GLOBAL_BURST):
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self._global = TokenBucket(global_rate, max(1.0, global_burst))
+        self._queues: dict[int, deque[_Job]] = {}
+        self._buckets: dict[int, TokenBucket] = {}
+        self._workers: dict[int, asyncio.Task] = {}
+        self.sent = 0
+        self.failed = 0
+        self.retries_429 = 0
+        self._latency_total = 0.0
+        self.latency_max = 0.0
+
+    def submit(self, chat_id: int, factory: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        """
+        Ставить запит у чергу чату.
+
+        Args:
+            chat_id: Чат, до якого належить запит (визначає порядок та ліміт)
+            factory: Функція, що створює корутину запиту до Bot API
+
+        Returns:
+            Future з результатом запиту
+        """
+        job = _Job(factory, asyncio.get_running_loop().create_future())
+        self._queues.setdefault(chat_id, deque()).append(job)
+        if chat_id not in self._workers:
+            self._workers[chat_id] = asyncio.create_task(self._run(chat_id))
+        return job.future
+
+    async def send(self, chat_id: int, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Ставить запит у чергу та чекає на його результат."""
+        return await self.submit(chat_id, factory)
+
+    def depth(self) -> int:
+        """Кількість запитів, що очікують у чергах."""
+        return sum(len(q) for q in self._queues.values())
+
+    def stats(self) -> dict:
+        """Глибина черги, кількість надісланих запитів, повторів та затримка."""
+        return {
+            "depth": self.depth(),
+            "active_chats": len(self._workers),
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries_429": self.retries_429,
+            "latency_avg": round(self._latency_total / self.sent, 3) if self.sent else 0.0,
+            "latency_max": round(self.latency_max, 3),
+        }
+
+    async def close(self):
+        """Зупиняє обробку черг; запити, що очікують, скасовуються."""
+        workers = list(self._workers.values())
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        for queue in self._queues.values():
+            for job in queue:
+                job.future.cancel()
+        self._queues.clear()
+        self._workers.clear()
+
+    async def _run(self, chat_id: int):
+        queue = self._queues[chat_id]
+        bucket = self._buckets.setdefault(chat_id, TokenBucket(self.chat_rate, self.chat_burst))
+        try:
+            while queue:
+                job = queue[0]
+                await self._execute(bucket, job)
+                queue.popleft()
+        finally:
+            del self._workers[chat_id]
+            if not queue:
+                del self._queues[chat_id]
+            if bucket.idle():
+                # Бюджет чату відновлено - стан відра більше не потрібен
+                self._buckets.pop(chat_id, None)
+
+    async def _execute(self, bucket: TokenBucket, job: _Job):
+        if job.future.cancelled():
+            return
+
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire()
+            await self._global.acquire()
+            try:
+                result = await job.factory()
+            except TelegramRetryAfter as e:
+                self.retries_429 += 1
+                metrics.telegram_retry_after.inc()
+                if attempt == self.max_retries:
+                    self._finish(job, exception=e)
+                    return
+                # 429 може означати і ліміт чату, і загальний ліміт бота
+                bucket.pause(e.retry_after)
+                self._global.pause(e.retry_after)
+                continue
+            except Exception as e:
+                self._finish(job, exception=e)
+                return
+            self._finish(job, result=result)
+            return
+
+    def _finish(self, job: _Job, result: Any = None, exception: BaseException | None = None):
+        latency = time.monotonic() - job.enqueued_at
+        if exception is None:
+            self.sent += 1
+            self._latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+            metrics.telegram_send_seconds.observe(latency)
+        else:
+            self.failed += 1
+            metrics.telegram_failures.inc()
+        if job.future.done():
+            return
+        if exception is None:
+            job.future.set_result(result)
+        else:
+            job.future.set_exception(exception)
+
+
+queue = SendQueue()
+"""Спільна черга вихідних повідомлень бота."""
+
+
+def share_limits(workers: int):
+    """
+    Ділить ліміти Telegram між workers процесами бота.
+
+    Кожен процес рахує ліміти сам, тому отримує 1/workers темпу та запасу
+    (але не менше одного запиту поспіль). Викликається при старті, до
+    першого надсилання.
+    """
+    global queue
+    queue = SendQueue(TG_GLOBAL_RATE / workers, TG_CHAT_RATE / workers, max(1.0, TG_CHAT_BURST / workers),
+                      global_burst=max(1.0, TG_GLOBAL_BURST / workers))
+
+metrics.Gauge("graintrade_telegram_queue_depth", "Запити, що очікують у черзі повідомлень",
+              lambda: queue.depth())
+
+
+async def answer(message: types.Message, text: str, **kwargs) -> types.Message:
+    """message.answer через чергу."""
+    return await queue.send(message.chat.id, lambda: message.answer(text, **kwargs))
+
+
+async def edit_text(message: types.Message, text: str, **kwargs):
+    """message.edit_text через чергу."""
+    return await queue.send(message.chat.id, lambda: message.edit_text(text, **kwargs))
+
+
+async def edit_reply_markup(message: types.Message, **kwargs):
+    """message.edit_reply_markup через чергу."""
+    return await queue.send(message.chat.id, lambda: message.edit_reply_markup(**kwargs))
+
+
+async def send_message(bot: Bot, chat_id: int, text: str, **kwargs) -> types.Message:
+    """bot.send_message через чергу."""
+    return await queue.send(chat_id, lambda: bot.send_message(chat_id, text, **kwargs))
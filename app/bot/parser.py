@@ -4,95 +4,287 @@
 Відповідає за отримання та обробку оголошень про купівлю/продаж
 зернових культур з веб-сайту.
 """
+import asyncio
+import contextlib
+import hashlib
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import AsyncIterator, Callable
 import aiohttp
-from bs4 import BeautifulSoup
 import re
-from app.config_loader import USD_RATE, MAX_PAGES
+from app.config_loader import USD_RATE, MAX_PAGES, CRAWL_CONCURRENCY, PAGE_RETRIES, PAGE_RETRY_DELAY
+from app.bot import http_client, metrics, tracing
+from app.bot.extractors import extract_rows
+from app.bot.records import OfferRow, OfferType, parse_day
 
 
-async def fetch_table(url: str) -> list[dict]:
+class PageError(Exception):
+    """Сторінку лістингу не вдалося завантажити чи розібрати (після всіх повторів)."""
+
+
+@dataclass
+class CrawlStats:
+    """
+    Підсумок обходу лістингу.
+
+    Attributes:
+        pages: Скільки сторінок оброблено
+        failed: Номери сторінок, які не вдалося завантажити; їх оголошення пропущені
+        truncated: Обхід зупинився на MAX_PAGES, а не на кінці лістингу,
+            відомому оголошенні чи межі дат
+    """
+    pages: int = 0
+    failed: list[int] = field(default_factory=list)
+    truncated: bool = False
+
+
+def _page_url(url: str, page: int) -> str:
+    """Формує URL конкретної сторінки лістингу."""
+    # Визначаємо, чи в URL вже є параметри
+    separator = "&" if "?" in url else "?"
+    return f"{url}{separator}Ad_page={page}"
+
+
+def _parse_price(price_text: str) -> int | None:
+    """
+    Перетворює текст ціни з таблиці у USD за 1 тонну.
+
+    Returns:
+        Ціна як додатне ціле число або None, якщо ціну не вдалося розібрати
+    """
+    # Парсимо ціну: прибираємо все, крім цифр, крапки або коми
+    price_clean = re.sub(r"[^\d.,]", "", price_text).replace(",", ".")
+    if not price_clean:
+        return None
+
+    try:
+        price_value = float(price_clean)
+        if price_value <= 0:
+            return None
+
+        # Конвертація в USD, якщо гривні
+        if "грн" in price_text.lower():
+            price_value = price_value / USD_RATE
+
+        price = int(round(price_value))
+    except (ValueError, TypeError):
+        return None
+
+    return price if price > 0 else None
+
+
+def _page_before(rows: list[OfferRow], date_from: date) -> bool:
+    """Чи всі оголошення сторінки старші за date_from."""
+    return bool(rows) and max(r.day for r in rows) < date_from.toordinal()
+
+
+def _row_key(row_text: str) -> str:
+    """Ідентифікатор оголошення - хеш тексту всіх комірок рядка."""
+    return hashlib.blake2b(row_text.encode(), digest_size=8).hexdigest()
+
+
+def _parse_page(text: str) -> list[OfferRow] | None:
+    """
+    Витягує оголошення з HTML однієї сторінки лістингу.
+
+    Returns:
+        Список оголошень сторінки або None, якщо на сторінці немає
+        таблиці (tbody) - тобто лістинг закінчився. Рядки з нерозпізнаною
+        датою, типом чи ціною відкидаються
+    """
+    raw_rows = extract_rows(text)
+    if raw_rows is None:
+        return None
+
+    offers = []
+    for cells, type_offer in raw_rows:
+        kind = OfferType.from_label(type_offer)
+        day = parse_day(cells[0])
+        price = _parse_price(cells[5])
+        if kind is None or day is None or price is None:
+            continue
+
+        offers.append(OfferRow(
+            day=day,
+            kind=kind,
+            price=price,
+            key=_row_key("|".join(cells)),
+            date=cells[0],
+            cells=cells,
+        ))
+
+    return offers
+
+
+async def _download(session: aiohttp.ClientSession, url: str, page: int) -> str:
+    """
+    Завантажує HTML сторінки лістингу, повторюючи запит до PAGE_RETRIES разів.
+
+    Сторінка помилки (5xx, 429) не має таблиці, тому відповідь не 200
+    вважається збоєм, а не кінцем лістингу.
+
+    Raises:
+        PageError: Якщо сторінку не вдалося отримати з відповіддю 200
+    """
+    for attempt in range(PAGE_RETRIES + 1):
+        if attempt:
+            await asyncio.sleep(PAGE_RETRY_DELAY * 2 ** (attempt - 1))
+        started = time.perf_counter()
+        with tracing.span("page.fetch", page=page) as span:
+            try:
+                async with session.get(_page_url(url, page)) as resp:
+                    text = await resp.text()
+                    span["status"] = status = resp.status
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                span["status"] = status = "error"
+        metrics.page_fetch_seconds.observe(time.perf_counter() - started, status=status)
+        if status == 200:
+            return text
+    raise PageError(f"сторінка {page}: {status}")
+
+
+async def _fetch_page(session: aiohttp.ClientSession, url: str, page: int) -> list[OfferRow] | None:
+    """
+    Завантажує та парсить одну сторінку лістингу.
+
+    Returns:
+        Результат _parse_page (None - лістинг закінчився)
+
+    Raises:
+        PageError: Якщо сторінку не вдалося завантажити чи розібрати
+    """
+    text = await _download(session, url, page)
+    started = time.perf_counter()
+    with tracing.span("page.parse", page=page):
+        try:
+            return _parse_page(text)
+        except Exception as e:
+            raise PageError(f"сторінка {page}: {e}") from e
+        finally:
+            metrics.page_parse_seconds.observe(time.perf_counter() - started)
+
+
+async def fetch_table(url: str, known_keys: set[str] | None = None, date_from: date | None = None,
+                      progress: Callable[[int, int], None] | None = None,
+                      stats: CrawlStats | None = None) -> list[OfferRow]:
     """
     Парсить таблицю оголошень з сайту Graintrade.com.ua.
-    
+
     Args:
         url: URL сторінки з оголошеннями для парсингу
-        
+        known_keys: Ідентифікатори вже збережених оголошень. Якщо вказано,
+            обхід зупиняється на першій сторінці, що містить відоме оголошення
+            (інкрементальний режим: завантажуються лише нові сторінки)
+        date_from: Нижня межа дат запиту. Лістинг впорядкований від нових
+            оголошень до старих, тому обхід зупиняється на першій сторінці,
+            всі оголошення якої старші за date_from
+        progress: Функція progress(оброблено_сторінок, максимум_сторінок),
+            що викликається після кожної обробленої сторінки
+        stats: Якщо вказано, заповнюється підсумком обходу (пропущені
+            сторінки, обрізання на MAX_PAGES)
+
     Returns:
-        Список словників з даними оголошень. Кожен словник містить:
-        - date: Дата оголошення (рядок)
-        - type: Тип оголошення ('куплю' або 'продам')
+        Список записів OfferRow. Кожен запис містить:
+        - day: Дата оголошення (порядковий номер дня, date.toordinal())
+        - kind: Тип оголошення (OfferType.BUY / OfferType.SELL)
         - price: Ціна в USD за 1 тонну (ціле число)
-        
+        - key: Ідентифікатор оголошення (хеш тексту рядка)
+        - date: Сирий текст дати ('дд.мм.рррр гг:хх')
+        - cells: Сирий текст усіх комірок рядка; інші колонки (обсяг,
+          регіон тощо) розбираються за запитом через OfferRow.column()
+
     Note:
-        Функція парсить до MAX_PAGES сторінок. Ціни автоматично
-        конвертуються з гривень у долари за курсом USD_RATE.
+        Функція збирає в один список сторінки, які віддає iter_pages;
+        правила обходу описані там.
     """
     offers = []
-    async with aiohttp.ClientSession() as session:
+    async with contextlib.aclosing(iter_pages(url, known_keys, date_from, progress, stats)) as pages:
+        async for rows in pages:
+            offers.extend(rows)
+    return offers
+
+
+async def iter_pages(url: str, known_keys: set[str] | None = None, date_from: date | None = None,
+                     progress: Callable[[int, int], None] | None = None,
+                     stats: CrawlStats | None = None) -> AsyncIterator[list[OfferRow]]:
+    """
+    Обходить лістинг і віддає оголошення посторінково, щойно сторінка розібрана.
+
+    Аргументи ті самі, що й у fetch_table. Споживач може аналізувати
+    оголошення, не чекаючи на останню сторінку; HTML та дерево розбору
+    сторінки звільняються одразу після розбору, тож у пам'яті лишаються
+    лише записи OfferRow.
+
+    Note:
+        Функція парсить до MAX_PAGES сторінок, з яких одночасно
+        завантажується не більше CRAWL_CONCURRENCY. Сторінки віддаються
+        в порядку лістингу. Щойно трапляється сторінка (з відповіддю 200)
+        без таблиці, обхід зупиняється, а вже запущені запити наступних
+        сторінок скасовуються (так само й тоді, коли споживач припиняє
+        ітерацію). Сторінка, яку не вдалося завантажити після PAGE_RETRIES
+        повторів, пропускається і записується в stats.failed.
+        Межі дат лише скорочують обхід: рядки поза вікном не відкидаються,
+        їх фільтрує аналітика. Ціни автоматично конвертуються з гривень
+        у долари за курсом USD_RATE. Запити йдуть через спільну сесію
+        з пулом з'єднань (http_client).
+    """
+    session = http_client.get_session()
+    async with contextlib.AsyncExitStack() as stack:
+        if session is None:
+            # Спільна сесія не запущена (наприклад, виклик поза ботом)
+            session = await stack.enter_async_context(aiohttp.ClientSession())
+        pages = await stack.enter_async_context(
+            contextlib.aclosing(_crawl(session, url, known_keys, date_from, progress,
+                                       stats if stats is not None else CrawlStats())))
+        async for rows in pages:
+            yield rows
+
+
+async def _crawl(session: aiohttp.ClientSession, url: str, known_keys: set[str] | None, date_from: date | None,
+                 progress: Callable[[int, int], None] | None, stats: CrawlStats) -> AsyncIterator[list[OfferRow]]:
+    """Обходить сторінки лістингу вікном до CRAWL_CONCURRENCY запитів."""
+    concurrency = max(1, min(CRAWL_CONCURRENCY, MAX_PAGES))
+    # В інкрементальному режимі зазвичай достатньо першої сторінки,
+    # тому паралельні запити вмикаються лише після сторінки без відомих оголошень
+    window = 1 if known_keys else concurrency
+    tasks: dict[int, asyncio.Task] = {}
+    next_page = 1
+
+    stats.truncated = True  # скидається, якщо обхід зупинився раніше за MAX_PAGES
+    try:
         for page in range(1, MAX_PAGES + 1):
-            # Визначаємо, чи в URL вже є параметри
-            separator = "&" if "?" in url else "?"
-            page_url = f"{url}{separator}Ad_page={page}"
+            # Тримаємо у роботі вікно з window сторінок попереду
+            while next_page <= MAX_PAGES and next_page < page + window:
+                tasks[next_page] = asyncio.create_task(_fetch_page(session, url, next_page))
+                next_page += 1
+
             try:
-                async with session.get(page_url) as resp:
-                    text = await resp.text()
-                    soup = BeautifulSoup(text, 'html.parser')
-                    
-                    # Знаходимо таблицю з оголошеннями (шукаємо tbody з рядками)
-                    tbody = soup.find('tbody')
-                    if not tbody:
-                        continue
-                    
-                    rows = tbody.find_all('tr')
-                    
-                    for r in rows:
-                        try:
-                            cells = r.find_all('td')
-                            if len(cells) < 6:
-                                continue
-                            
-                            # Отримуємо дату (перша колонка)
-                            date_elem = cells[0]
-                            date = date_elem.get_text(strip=True) if date_elem else ''
-                            
-                            # Отримуємо тип оголошення (третя колонка, span)
-                            type_elem = cells[2].find('span') if len(cells) > 2 else None
-                            type_offer = type_elem.get_text(strip=True).lower() if type_elem else ''
-                            
-                            # Отримуємо ціну (шоста колонка)
-                            price_elem = cells[5] if len(cells) > 5 else None
-                            price_text = price_elem.get_text(strip=True) if price_elem else ''
-                            
-                            # Парсимо ціну: прибираємо все, крім цифр, крапки або коми
-                            price_clean = re.sub(r"[^\d.,]", "", price_text).replace(",", ".")
-                            if not price_clean:
-                                continue
-                            
-                            try:
-                                price_value = float(price_clean)
-                                if price_value <= 0:
-                                    continue
-                                
-                                # Конвертація в USD, якщо гривні
-                                if "грн" in price_text.lower():
-                                    price_value = price_value / USD_RATE
-                                
-
-                                price = int(round(price_value))
-                                
-                                if price <= 0:
-                                    continue
-                            except (ValueError, TypeError):
-                                continue
-                            
-                            offers.append({
-                                "date": date,
-                                "type": type_offer,
-                                "price": price
-                            })
-                        except (IndexError, AttributeError, ValueError, TypeError):
-                            continue
-            except Exception:
-                continue  # Пропускаємо сторінку при помилці
-    
-    return offers
+                rows = await tasks.pop(page)
+            except PageError as e:
+                print(f"Пропущено {e} ({url})")
+                stats.failed.append(page)
+                rows = []
+            stats.pages = page
+            if progress is not None:
+                progress(page, MAX_PAGES)
+            if rows is None:
+                stats.truncated = False
+                break  # Лістинг закінчився
+            if date_from is not None and _page_before(rows, date_from):
+                stats.truncated = False
+                break  # Вікно дат вичерпано: далі лише старіші оголошення
+            if rows:
+                yield rows
+            if known_keys and any(r.key in known_keys for r in rows):
+                stats.truncated = False
+                break  # Далі йдуть вже збережені оголошення
+            window = concurrency
+    finally:
+        # Скасовуємо спекулятивні запити сторінок після кінця лістингу
+        for task in tasks.values():
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
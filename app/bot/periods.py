@@ -0,0 +1,91 @@
+"""
+Модуль періодів аналізу.
+
+Період - це рік або довільний проміжок дат, за який будується звіт.
+Він розбирається з аргументу команди (/monitor 2025,
+/monitor 01.03.2025-31.03.2025) і кодується коротким рядком
+у callback_data кнопок (ліміт Telegram - 64 байти).
+"""
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+
+_DATE_FORMAT = "%d.%m.%Y"
+_RANGE_RE = re.compile(r"^\s*(\d{1,2}\.\d{1,2}\.\d{4})\s*[-–—]\s*(\d{1,2}\.\d{1,2}\.\d{4})\s*$")
+_YEAR_RE = re.compile(r"^\s*(\d{4})\s*$")
+
+
+@dataclass(frozen=True)
+class Period:
+    """
+    Період аналізу: дні від start до end включно.
+
+    Attributes:
+        start: Перший день періоду
+        end: Останній день періоду
+        is_year: Чи це календарний рік (впливає лише на підпис та кодування)
+    """
+    start: date
+    end: date
+    is_year: bool = False
+
+    @classmethod
+    def year(cls, year: int) -> "Period":
+        """Календарний рік."""
+        return cls(date(year, 1, 1), date(year, 12, 31), is_year=True)
+
+    @classmethod
+    def parse(cls, text: str) -> "Period":
+        """
+        Розбирає період з тексту команди: "2025" або "01.03.2025-31.03.2025".
+
+        Raises:
+            ValueError: Якщо текст не є роком чи проміжком дат, або початок пізніший за кінець
+        """
+        match = _YEAR_RE.match(text)
+        if match:
+            year = int(match.group(1))
+            if not date.min.year <= year < date.max.year:
+                raise ValueError(f"Невірний рік: {year}")
+            return cls.year(year)
+
+        match = _RANGE_RE.match(text)
+        if not match:
+            raise ValueError("Вкажіть рік (2025) або проміжок дат (01.03.2025-31.03.2025)")
+        try:
+            start, end = (datetime.strptime(part, _DATE_FORMAT).date() for part in match.groups())
+        except ValueError:
+            raise ValueError("Невірна дата в проміжку") from None
+        if start > end:
+            raise ValueError("Початкова дата пізніша за кінцеву")
+        return cls(start, end)
+
+    @classmethod
+    def decode(cls, token: str) -> "Period":
+        """
+        Період з рядка encode().
+
+        Raises:
+            ValueError: Якщо рядок пошкоджений
+        """
+        if "-" not in token:
+            return cls.year(int(token))
+        start, end = (datetime.strptime(part, "%Y%m%d").date() for part in token.split("-", 1))
+        return cls(start, end)
+
+    def encode(self) -> str:
+        """Короткий рядок для callback_data: "2025" або "20250301-20250331"."""
+        if self.is_year:
+            return str(self.start.year)
+        return f"{self.start:%Y%m%d}-{self.end:%Y%m%d}"
+
+    @property
+    def title(self) -> str:
+        """Підпис періоду: "за 2025 рік" або "з 01.03.2025 по 31.03.2025"."""
+        if self.is_year:
+            return f"за {self.start.year} рік"
+        return f"з {self.start:%d.%m.%Y} по {self.end:%d.%m.%Y}"
+
+    def bounds(self) -> tuple[int, int]:
+        """Порядкові номери першого та останнього дня періоду (включно)."""
+        return self.start.toordinal(), self.end.toordinal()
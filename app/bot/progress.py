@@ -0,0 +1,174 @@
+"""
+Модуль відображення прогресу завантаження.
+
+ProgressChannel передає стан обходу сайту (сторінок оброблено з максимуму)
+та оголошення перших сторінок для попереднього звіту всім користувачам,
+що чекають на одне спільне завантаження. LoadingIndicator показує цей стан
+у повідомленні, але редагує його не частіше, ніж дозволяє
+бюджет чату (EDIT_MIN_INTERVAL): проміжні стани об'єднуються, і надсилається
+лише останній. Якщо відповідь береться з кешу, прогресу немає і жодного
+редагування не відбувається.
+"""
+import asyncio
+import time
+from typing import Callable
+from aiogram import types
+from app.config_loader import EDIT_MIN_INTERVAL
+from app.bot import outbound
+from app.bot.records import OfferRow
+
+ProgressListener = Callable[[int, int], None]
+PreviewListener = Callable[[list[OfferRow], int], None]
+
+_last_edit: dict[int, float] = {}  # час останнього редагування індикатора в кожному чаті
+edit_interval = EDIT_MIN_INTERVAL  # інтервал між редагуваннями в чаті для цього процесу, с
+
+
+def share_edit_budget(workers: int):
+    """Ділить бюджет редагувань чату між workers процесами бота (інтервал зростає у workers разів)."""
+    global edit_interval
+    edit_interval = EDIT_MIN_INTERVAL * workers
+
+
+class ProgressChannel:
+    """Розсилає стан одного завантаження всім підписникам."""
+
+    def __init__(self):
+        self._listeners: list[tuple[ProgressListener | None, PreviewListener | None]] = []
+        self.state: tuple[int, int] | None = None
+        self.preview: tuple[list[OfferRow], int] | None = None
+
+    def subscribe(self, listener: ProgressListener | None,
+                  on_preview: PreviewListener | None = None) -> Callable[[], None]:
+        """
+        Підписує listener(оброблено, максимум) на оновлення.
+
+        Новий підписник одразу отримує поточний стан та попередні дані, якщо вони є.
+
+        Args:
+            listener: Отримувач стану завантаження (None - лише попередні дані)
+            on_preview: Отримувач оголошень перших сторінок on_preview(оголошення, сторінок)
+
+        Returns:
+            Функція для відписки
+        """
+        entry = (listener, on_preview)
+        self._listeners.append(entry)
+        if self.state is not None and listener is not None:
+            listener(*self.state)
+        if self.preview is not None and on_preview is not None:
+            on_preview(*self.preview)
+
+        def unsubscribe():
+            if entry in self._listeners:
+                self._listeners.remove(entry)
+        return unsubscribe
+
+    def publish(self, done: int, total: int):
+        """Публікує новий стан завантаження."""
+        self.state = (done, total)
+        for listener, _ in list(self._listeners):
+            if listener is not None:
+                listener(done, total)
+
+    def publish_preview(self, rows: list[OfferRow], pages: int):
+        """Публікує оголошення перших pages сторінок, поки обхід триває."""
+        self.preview = (rows, pages)
+        for _, on_preview in list(self._listeners):
+            if on_preview is not None:
+                on_preview(rows, pages)
+
+
+def _bar(done: int, total: int) -> str:
+    filled = min(10, round(10 * done / total)) if total else 0
+    return f"{'▰' * filled}{'▱' * (10 - filled)}"
+
+
+def format_progress(done: int, total: int) -> str:
+    """Текст індикатора для стану завантаження."""
+    return f"⏳ АНАЛІЗУЮ\n{_bar(done, total)}\nЗавантажено сторінок: {done} (до {total})"
+
+
+def format_summary_progress(done: int, total: int) -> str:
+    """Текст індикатора для зведення по всіх культурах."""
+    return f"⏳ ЗБИРАЮ ЗВЕДЕННЯ\n{_bar(done, total)}\nГотово культур: {done} з {total}"
+
+
+class LoadingIndicator:
+    """
+    Повідомлення з прогресом, що редагується не частіше за бюджет чату.
+
+    Args:
+        message: Повідомлення, яке замінюється індикатором
+        min_interval: Мінімальний інтервал між редагуваннями в одному чаті, с
+            (за замовчуванням - edit_interval)
+        formatter: Текст індикатора для стану (зроблено, всього)
+    """
+
+    def __init__(self, message: types.Message, min_interval: float | None = None,
+                 formatter: Callable[[int, int], str] = format_progress):
+        self.message = message
+        self.min_interval = edit_interval if min_interval is None else min_interval
+        self.formatter = formatter
+        self._chat_id = message.chat.id
+        self._progress: str | None = None
+        self._preview: str | None = None
+        self._pending: str | None = None
+        self._shown: str | None = None
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.edits = 0
+
+    def update(self, done: int, total: int):
+        """Оновлює стан; редагування буде виконано, коли дозволить бюджет."""
+        self._progress = self.formatter(done, total)
+        self._schedule()
+
+    def preview(self, text: str):
+        """Показує попередній звіт над станом завантаження (з тим самим бюджетом редагувань)."""
+        self._preview = text
+        self._schedule()
+
+    def _schedule(self):
+        parts = [text for text in (self._preview, self._progress) if text]
+        self._pending = "\n\n".join(parts)
+        self._wakeup.set()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Зупиняє індикатор. Наступним редагуванням повідомлення буде вже звіт."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            delay = _last_edit.get(self._chat_id, 0.0) + self.min_interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)  # Оновлення за цей час об'єднуються
+
+            text, self._pending = self._pending, None
+            if text is None or text == self._shown:
+                continue
+
+            now = time.monotonic()
+            _last_edit[self._chat_id] = now
+            if len(_last_edit) > 10_000:
+                # Прибираємо чати, бюджет яких уже відновився
+                for chat_id in [c for c, t in _last_edit.items() if now - t > self.min_interval]:
+                    del _last_edit[chat_id]
+            try:
+                await outbound.edit_text(self.message, text, reply_markup=None)
+            except Exception:
+                # Якщо повідомлення вже видалено або змінено, зупиняємо індикатор
+                return
+            self._shown = text
+            self.edits += 1
@@ -0,0 +1,150 @@
+"""
+Модуль записів оголошень.
+
+Парсер розбирає дату, тип та ціну оголошення один раз: дата зберігається
+порядковим номером дня (date.toordinal()), тип - значенням OfferType, ціна -
+цілим числом у USD. На цих полях будується вся аналітика, тож повторні
+аналізи тих самих (кешованих) оголошень нічого не розбирають заново.
+Решта колонок зберігається сирим текстом і розбирається лише тоді,
+коли її запитують.
+"""
+import re
+from datetime import date
+from enum import IntEnum
+from functools import lru_cache
+from typing import Any, Callable
+
+
+class OfferType(IntEnum):
+    """Тип оголошення; значення - індекс у OFFER_TYPES."""
+    BUY = 0
+    SELL = 1
+
+    @property
+    def label(self) -> str:
+        """Назва типу, як на сайті та у звітах ('куплю' / 'продам')."""
+        return OFFER_TYPES[self]
+
+    @classmethod
+    def from_label(cls, text: str) -> "OfferType | None":
+        """Тип за текстом з таблиці (без урахування регістру) або None для невідомого типу."""
+        return _TYPES_BY_LABEL.get(text.strip().lower())
+
+
+OFFER_TYPES = ("куплю", "продам")
+"""Назви типів оголошень у порядку значень OfferType."""
+
+_TYPES_BY_LABEL = {label: OfferType(i) for i, label in enumerate(OFFER_TYPES)}
+
+
+@lru_cache(maxsize=4096)
+def _parse_day_part(date_part: str) -> int | None:
+    try:
+        day, month, year = date_part.split(".")
+        return date(int(year), int(month), int(day)).toordinal()
+    except ValueError:
+        return None
+
+
+def parse_day(date_text: str) -> int | None:
+    """
+    Порядковий номер дня оголошення з тексту комірки ('дд.мм.рррр гг:хх').
+
+    Returns:
+        date.toordinal() дати або None, якщо дату не вдалося розібрати
+    """
+    parts = date_text.split(maxsplit=1)
+    return _parse_day_part(parts[0]) if parts else None
+
+
+def _parse_number(text: str) -> float | None:
+    """Перше число з тексту комірки ('1 200,5 т' -> 1200.5) або None."""
+    match = re.search(r"\d[\d\s]*(?:[.,]\d+)?", text)
+    if not match:
+        return None
+    try:
+        return float(re.sub(r"\s", "", match.group()).replace(",", "."))
+    except ValueError:
+        return None
+
+
+COLUMNS: dict[str, tuple[int, Callable[[str], Any]]] = {
+    "product": (1, str),
+    "volume": (3, _parse_number),
+    "location": (4, str),
+}
+"""Колонки, що розбираються за запитом: назва -> (індекс комірки, функція розбору)."""
+
+
+class OfferRow:
+    """
+    Оголошення з таблиці лістингу.
+
+    Поля day, kind, price та key обчислюються парсером одразу; date - сирий
+    текст дати (для збереження та показу). Решта колонок зберігається сирим
+    текстом у cells і розбирається методом column() при першому зверненні.
+    Для сумісності запис підтримує доступ як до словника: row["price"],
+    row.get("type") (назва типу, 'куплю' / 'продам').
+    """
+    __slots__ = ("day", "kind", "price", "key", "date", "cells", "_decoded")
+
+    def __init__(self, day: int, kind: OfferType, price: int, key: str = "", date: str = "",
+                 cells: tuple[str, ...] = ()):
+        self.day = day
+        self.kind = kind
+        self.price = price
+        self.key = key
+        self.date = date
+        self.cells = cells
+        self._decoded: dict[str, Any] | None = None
+
+    @property
+    def type(self) -> str:
+        """Назва типу оголошення ('куплю' або 'продам')."""
+        return OFFER_TYPES[self.kind]
+
+    def cell(self, index: int) -> str:
+        """Сирий текст комірки за індексом (порожній рядок, якщо комірки немає)."""
+        return self.cells[index] if index < len(self.cells) else ""
+
+    def column(self, name: str) -> Any:
+        """
+        Розібране значення колонки з COLUMNS (обчислюється один раз).
+
+        Raises:
+            KeyError: Якщо колонка невідома
+        """
+        if self._decoded is None:
+            self._decoded = {}
+        elif name in self._decoded:
+            return self._decoded[name]
+
+        index, decode = COLUMNS[name]
+        value = decode(self.cell(index))
+        self._decoded[name] = value
+        return value
+
+    def get(self, name: str, default: Any = None) -> Any:
+        if name in _FIELDS:
+            return getattr(self, name)
+        if name in COLUMNS:
+            return self.column(name)
+        return default
+
+    def __getitem__(self, name: str) -> Any:
+        if name in _FIELDS:
+            return getattr(self, name)
+        return self.column(name)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, OfferRow):
+            return NotImplemented
+        return (self.key, self.day, self.kind, self.price, self.date, self.cells) == (
+            other.key, other.day, other.kind, other.price, other.date, other.cells)
+
+    def __repr__(self) -> str:
+        return (f"OfferRow(date={date.fromordinal(self.day):%d.%m.%Y}, type={self.type!r}, "
+                f"price={self.price!r}, key={self.key!r})")
+
+
+_FIELDS = frozenset(("day", "kind", "type", "price", "key", "date"))
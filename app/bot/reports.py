@@ -0,0 +1,306 @@
+"""
+Модуль побудови звітів по культурі.
+
+Кешування виконується шарами:
+- сирі оголошення - один знімок на культуру (offers.cache);
+- аналітика за весь період - інкрементальний агрегатор (OfferAggregator)
+  на культуру; коли новий знімок лише додає оголошення до попереднього,
+  агрегатор поглинає тільки нові оголошення замість повного перерахунку;
+- аналітика за рік чи проміжок дат - часовий індекс знімка (TimeIndex)
+  на культуру, що відповідає на будь-який період без перегляду оголошень;
+- результат аналітики - за (культура, період, версія даних, поточний день);
+- готові до надсилання частини повідомлень - за тим самим ключем.
+
+Поточний день входить у ключ, бо вікна "сьогодні / 3 дні / 7 днів"
+рахуються від date.today() і мають змінюватися опівночі. Тому повторне
+натискання на популярну культуру - це лише пошук у кеші.
+
+Поки триває обхід сайту, за першими сторінками будується попередній
+звіт (render_preview); він не кешується.
+
+Зведення по всіх культурах (build_summary) збирає знімки культур паралельно
+в межах спільного бюджету обходів SUMMARY_CONCURRENCY, аналізує їх одним
+пакетом і кешується цілим - за періодом, версіями даних усіх культур та
+поточним днем; одночасні запити зведення об'єднуються в одну побудову.
+
+Огляд ринку (build_market_overview) рахується зі спільної для всіх
+користувачів матриці цін market.MarketMatrix.
+"""
+import asyncio
+import html
+import time
+from datetime import date
+from typing import Callable
+from app.config_loader import CACHE_MAX_ENTRIES, SUMMARY_CONCURRENCY
+from app.bot import market, metrics, offers, tracing
+from app.bot.aggregator import OfferAggregator
+from app.bot.analytics import analyze_offers
+from app.bot.cache import OfferCache
+from app.bot.keyboards import CULTURE_URLS
+from app.bot.periods import Period
+from app.bot.progress import ProgressChannel, ProgressListener
+from app.bot.records import OfferRow
+from app.bot.singleflight import SingleFlight
+from app.bot.timeindex import TimeIndex
+from app.utils.formatters import (
+    format_section, format_comparison, format_preview, format_summary, format_market_overview
+)
+
+MESSAGE_CHUNK_SIZE = 4000
+"""Максимальна довжина однієї частини повідомлення (ліміт Telegram - 4096)."""
+
+NO_DATA_TEXT = "❌ На жаль, дані відсутні для обраної культури."
+
+# Похідні результати прив'язані до версії даних, тому їм потрібен лише LRU-ліміт
+_DERIVED_TTL = 24 * 60 * 60
+analysis_cache = OfferCache(ttl=_DERIVED_TTL, stale_ttl=0, max_entries=CACHE_MAX_ENTRIES * 4)
+report_cache = OfferCache(ttl=_DERIVED_TTL, stale_ttl=0, max_entries=CACHE_MAX_ENTRIES * 4)
+aggregators: dict[str, tuple[int, OfferAggregator]] = {}  # {культура: (версія, агрегатор)}
+indexes: dict[str, tuple[int, TimeIndex]] = {}  # {культура: (версія, часовий індекс)}
+summary_cache = OfferCache(ttl=_DERIVED_TTL, stale_ttl=0, max_entries=CACHE_MAX_ENTRIES)
+summaries = SingleFlight()  # спільні побудови зведення: одна на період
+crawl_budget = asyncio.Semaphore(max(1, SUMMARY_CONCURRENCY))  # одночасні обходи сайту для зведень
+_summary_progress: dict[str, ProgressChannel] = {}  # прогрес спільних побудов: {період: channel}
+
+
+def derived_key(culture_name: str, period: Period | None, version: int) -> str:
+    """Ключ похідних результатів: культура, період, версія даних та поточний день."""
+    return f"{culture_name}|{period.encode() if period else ''}|{version}|{date.today().isoformat()}"
+
+
+def _chunks(text: str) -> list[str]:
+    """Екранує текст та ділить його на частини допустимої довжини."""
+    safe_text = html.escape(text)
+    return [safe_text[i:i + MESSAGE_CHUNK_SIZE] for i in range(0, len(safe_text), MESSAGE_CHUNK_SIZE)]
+
+
+def _pack(text: str) -> list[str]:
+    """Екранує текст та ділить його на найменшу кількість частин, не розриваючи рядків."""
+    chunks, lines, size = [], [], 0
+    for line in html.escape(text).split("\n"):
+        if lines and size + len(line) > MESSAGE_CHUNK_SIZE:
+            chunks.append("\n".join(lines))
+            lines, size = [], 0
+        lines.append(line)
+        size += len(line) + 1
+    chunks.append("\n".join(lines))
+    return chunks
+
+
+def render_report(analysis: dict, culture_name: str) -> list[str]:
+    """
+    Формує частини повідомлень звіту: "Куплю", "Продам" та порівняння.
+
+    Returns:
+        Список частин у порядку надсилання. Першою частиною редагується
+        повідомлення-індикатор, решта надсилаються новими повідомленнями.
+    """
+    buy_data = analysis.get("куплю")
+    sell_data = analysis.get("продам")
+
+    chunks = []
+    if buy_data:
+        chunks += _chunks(format_section("куплю", buy_data, culture_name))
+    if sell_data:
+        chunks += _chunks(format_section("продам", sell_data, culture_name))
+    if buy_data and sell_data:
+        chunks += _chunks(format_comparison(buy_data, sell_data, culture_name))
+
+    return chunks or [NO_DATA_TEXT]
+
+
+def render_preview(rows: list[OfferRow], culture_name: str, period: Period | None, pages: int) -> str:
+    """Екранований попередній звіт за оголошеннями перших pages сторінок."""
+    with tracing.span("preview", rows=len(rows), pages=pages):
+        if period is not None:
+            first, last = period.bounds()
+            rows = [r for r in rows if first <= r.day <= last]
+        analysis = analyze_offers(rows)
+        return _chunks(format_preview(analysis, culture_name, pages))[0]
+
+
+def _aggregator(snapshot: offers.Snapshot, culture_name: str) -> OfferAggregator:
+    """Агрегатор, що врахував усі оголошення знімка (оновлений інкрементально, якщо можна)."""
+    key = culture_name
+    version, aggregator = aggregators.get(key, (None, None))
+    if version == snapshot.version:
+        return aggregator
+
+    started = time.perf_counter()
+    if snapshot.base is not None and version == snapshot.base[0]:
+        engine, rows = "incremental", snapshot.rows[:snapshot.base[1]]
+    else:
+        engine, rows = "aggregator", snapshot.rows
+        aggregator = OfferAggregator()
+    with tracing.span("analyze", rows=len(rows), engine=engine):
+        aggregator.prepend(rows)
+    metrics.analyze_seconds.observe(time.perf_counter() - started, engine=engine)
+    metrics.analyze_rows.observe(len(rows))
+    aggregators[key] = (snapshot.version, aggregator)
+    return aggregator
+
+
+def _index(snapshot: offers.Snapshot, culture_name: str) -> TimeIndex:
+    """Часовий індекс знімка (будується один раз на версію даних)."""
+    version, index = indexes.get(culture_name, (None, None))
+    if version == snapshot.version:
+        return index
+
+    started = time.perf_counter()
+    with tracing.span("index", rows=len(snapshot.rows)):
+        index = TimeIndex(snapshot.rows)
+    metrics.analyze_seconds.observe(time.perf_counter() - started, engine="index")
+    metrics.analyze_rows.observe(len(snapshot.rows))
+    indexes[culture_name] = (snapshot.version, index)
+    return index
+
+
+def get_analysis(snapshot: offers.Snapshot, culture_name: str, period: Period | None = None) -> dict:
+    """Аналітика знімка за період у форматі analyze_offers (з кешу, агрегатора або індексу)."""
+    key = derived_key(culture_name, period, snapshot.version)
+    cached = analysis_cache.get(key)
+    if cached is not None:
+        return cached[0]
+
+    if period is None:
+        analysis = _aggregator(snapshot, culture_name).result()
+    else:
+        with tracing.span("query", period=period.encode()):
+            analysis = _index(snapshot, culture_name).query(*period.bounds())
+    analysis_cache.put(key, analysis)
+    return analysis
+
+
+async def build_report(culture_name: str, period: Period | None = None,
+                       on_progress: ProgressListener | None = None,
+                       on_preview: Callable[[str], None] | None = None) -> list[str]:
+    """
+    Повертає готові частини звіту по культурі.
+
+    Args:
+        culture_name: Назва культури з CULTURE_URLS
+        period: Період аналізу (рік або проміжок дат); None - весь доступний період
+        on_progress: Отримувач прогресу обходу сайту (якщо даних немає в кеші)
+        on_preview: Отримувач тексту попереднього звіту за першими PREVIEW_PAGES
+            сторінками (лише якщо користувач чекає на обхід сайту)
+
+    Returns:
+        Список екранованих частин повідомлень
+    """
+    def preview(rows: list[OfferRow], pages: int):
+        try:
+            on_preview(render_preview(rows, culture_name, period, pages))
+        except Exception as e:
+            # Попередній звіт не повинен зупиняти спільний обхід сайту
+            print(f"Помилка попереднього звіту {culture_name}: {e}")
+
+    with tracing.span("snapshot"):
+        snapshot = await offers.get_snapshot(culture_name, period.start if period else None, on_progress,
+                                             preview if on_preview is not None else None)
+    key = derived_key(culture_name, period, snapshot.version)
+
+    cached = report_cache.get(key)
+    if cached is not None:
+        return cached[0]
+
+    analysis = get_analysis(snapshot, culture_name, period)
+    with tracing.span("render"):
+        chunks = render_report(analysis, culture_name)
+    report_cache.put(key, chunks)
+    return chunks
+
+
+async def _build_summary(period: Period | None, channel: ProgressChannel) -> list[str]:
+    """Збирає знімки всіх культур, аналізує їх одним пакетом та формує зведення."""
+    names = list(CULTURE_URLS)
+    date_from = period.start if period else None
+    done = 0
+    waiting = False  # прогрес показується, лише якщо хоч одну культуру обходимо
+
+    def crawling(pages: int, total: int):
+        nonlocal waiting
+        if not waiting:
+            waiting = True
+            channel.publish(done, len(names))
+
+    async def load(culture_name: str) -> offers.Snapshot:
+        nonlocal done
+        try:
+            return await offers.get_snapshot(culture_name, date_from, on_progress=crawling, budget=crawl_budget)
+        finally:
+            done += 1
+            if waiting:
+                channel.publish(done, len(names))
+
+    try:
+        with tracing.span("snapshots", cultures=len(names)):
+            snapshots = await asyncio.gather(*(load(name) for name in names), return_exceptions=True)
+    finally:
+        key = period.encode() if period else ""
+        if _summary_progress.get(key) is channel:
+            del _summary_progress[key]
+
+    failed = [name for name, s in zip(names, snapshots) if isinstance(s, BaseException)]
+    versions = ",".join("-" if isinstance(s, BaseException) else str(s.version) for s in snapshots)
+    key = f"{period.encode() if period else ''}|{versions}|{date.today().isoformat()}"
+    cached = summary_cache.get(key)
+    if cached is not None:
+        return cached[0]
+
+    analyses = []
+    with tracing.span("analyze.batch", cultures=len(names) - len(failed)):
+        for name, snapshot in zip(names, snapshots):
+            if isinstance(snapshot, BaseException):
+                print(f"Помилка завантаження {name} для зведення: {snapshot}")
+                analyses.append((name, None))
+            else:
+                analyses.append((name, get_analysis(snapshot, name, period)))
+    with tracing.span("render"):
+        chunks = _pack(format_summary(analyses, period.title if period else "за весь доступний період"))
+    # Зведення з культурами, що не завантажилися, не кешуємо - наступний запит спробує знову
+    if not failed:
+        summary_cache.put(key, chunks)
+    return chunks
+
+
+async def build_summary(period: Period | None = None, on_progress: ProgressListener | None = None) -> list[str]:
+    """
+    Повертає готові частини зведення по всіх культурах з CULTURE_URLS.
+
+    Args:
+        period: Період аналізу (рік або проміжок дат); None - весь доступний період
+        on_progress: Отримувач стану (готово культур, всього), якщо хоч одну
+            культуру доводиться завантажувати з сайту
+
+    Returns:
+        Список екранованих частин повідомлень (зазвичай одна)
+    """
+    key = period.encode() if period else ""
+    channel = _summary_progress.get(key)
+    if channel is None:
+        channel = _summary_progress[key] = ProgressChannel()
+    unsubscribe = channel.subscribe(on_progress) if on_progress is not None else None
+    try:
+        return await summaries.do(key, lambda: _build_summary(period, channel))
+    finally:
+        if unsubscribe is not None:
+            unsubscribe()
+
+
+async def build_market_overview(offer_type: str = "продам") -> list[str] | None:
+    """
+    Повертає готові частини огляду ринку по всіх культурах.
+
+    Args:
+        offer_type: Тип оголошень ('куплю' або 'продам')
+
+    Returns:
+        Список екранованих частин повідомлень або None, якщо даних ще немає
+        (огляд не обходить сайт, а бере оголошення з кешу чи сховища)
+    """
+    with tracing.span("matrix"):
+        matrix = await market.get_matrix()
+    if matrix is None:
+        return None
+    with tracing.span("render"):
+        return _pack(format_market_overview(matrix.overview(offer_type)))
@@ -0,0 +1,160 @@
+"""
+Модуль фонового прогріву кешу.
+
+Планувальник періодично перезавантажує всі культури з CULTURE_URLS,
+щоб користувачі отримували відповідь з кешу, а не чекали на обхід сайту.
+Популярні культури оновлюються частіше, а запитані користувачами культури
+із застарілим знімком переміщуються на початок черги.
+"""
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from typing import Awaitable, Callable, Iterable
+from app.config_loader import (
+    PREWARM_INTERVAL, PREWARM_HOT_INTERVAL, PREWARM_HOT_CULTURES, PREWARM_JITTER, PREWARM_CONCURRENCY
+)
+
+
+class PrewarmScheduler:
+    """
+    Планувальник оновлень з пріоритетною чергою за часом наступного оновлення.
+
+    Args:
+        refresh: Корутина, що завантажує культуру та кладе її в кеш
+        cultures: Назви культур для прогріву
+        interval: Інтервал оновлення звичайних культур, с
+        hot_interval: Інтервал оновлення популярних та нещодавно запитаних культур, с
+        hot_cultures: Культури, які завжди оновлюються з hot_interval
+        jitter: Частка інтервалу для випадкового зсуву (0.1 = ±10%)
+        concurrency: Максимум одночасних оновлень
+    """
+
+    def __init__(self, refresh: Callable[[str], Awaitable], cultures: Iterable[str],
+                 interval: float = PREWARM_INTERVAL, hot_interval: float = PREWARM_HOT_INTERVAL,
+                 hot_cultures: Iterable[str] = PREWARM_HOT_CULTURES, jitter: float = PREWARM_JITTER,
+                 concurrency: int = PREWARM_CONCURRENCY):
+        self._refresh = refresh
+        self.cultures = list(cultures)
+        self.interval = interval
+        self.hot_interval = hot_interval
+        self.hot_cultures = set(hot_cultures)
+        self.jitter = jitter
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._queue: list[tuple[float, int, str]] = []
+        self._due: dict[str, float] = {}
+        self._requested_at: dict[str, float] = {}
+        self._running: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._loop_task: asyncio.Task | None = None
+        self.refreshes = 0
+        self.failures = 0
+
+    def start(self):
+        """Запускає планувальник. Популярні культури прогріваються першими."""
+        if self._loop_task is not None:
+            return
+        now = time.monotonic()
+        ordered = sorted(self.cultures, key=lambda c: c not in self.hot_cultures)
+        for i, culture in enumerate(ordered):
+            # Розносимо стартові оновлення, щоб не вдарити по сайту одночасно
+            self._schedule(culture, now + i * random.uniform(0.5, 1.5))
+        self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Зупиняє планувальник та поточні оновлення."""
+        tasks = list(self._tasks)
+        if self._loop_task is not None:
+            tasks.append(self._loop_task)
+            self._loop_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    @property
+    def active(self) -> bool:
+        """Чи запущено планувальник."""
+        return self._loop_task is not None
+
+    def mark_requested(self, culture: str, stale: bool = False):
+        """
+        Позначає культуру як запитану користувачем.
+
+        Якщо знімок культури застарів, її оновлення стає на початок черги
+        (виконується, щойно звільниться місце серед PREWARM_CONCURRENCY
+        оновлень); повторні запити до того лише підтверджують цей запис.
+        Інакше наступне оновлення переноситься не пізніше ніж на hot_interval.
+        Надалі культура оновлюється з hot_interval, поки її запитують.
+
+        Args:
+            culture: Назва культури
+            stale: Чи застарів знімок культури в кеші
+        """
+        if self._loop_task is None:
+            return
+        now = time.monotonic()
+        self._requested_at[culture] = now
+        if culture in self._running:
+            return
+        due = self._due.get(culture)
+        target = now if stale else now + self.hot_interval
+        if due is None or due > target:
+            self._schedule(culture, target)
+
+    def _interval_for(self, culture: str) -> float:
+        requested_at = self._requested_at.get(culture)
+        recently_requested = requested_at is not None and time.monotonic() - requested_at < self.interval
+        return self.hot_interval if culture in self.hot_cultures or recently_requested else self.interval
+
+    def _schedule(self, culture: str, due: float):
+        # Старі записи черги для культури не видаляємо - вони ігноруються при виборі
+        self._due[culture] = due
+        heapq.heappush(self._queue, (due, next(self._counter), culture))
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            due, _, culture = self._queue[0]
+            if self._due.get(culture) != due:
+                heapq.heappop(self._queue)  # Застарілий запис черги
+                continue
+
+            delay = due - time.monotonic()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._queue)
+            del self._due[culture]
+            await self._semaphore.acquire()
+            self._running.add(culture)
+            task = asyncio.create_task(self._refresh_one(culture))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _refresh_one(self, culture: str):
+        try:
+            await self._refresh(culture)
+            self.refreshes += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failures += 1
+            print(f"Помилка прогріву кешу для {culture}: {e}")
+        finally:
+            self._semaphore.release()
+            self._running.discard(culture)
+            interval = self._interval_for(culture)
+            self._schedule(culture, time.monotonic() + interval * random.uniform(1 - self.jitter, 1 + self.jitter))
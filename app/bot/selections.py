@@ -0,0 +1,88 @@
+"""
+Модуль вибору культур користувачами (/add_category).
+
+Вибір зберігається між натисканнями кнопок. Без сховища він живе в пам'яті
+процесу, а з відкритим сховищем - у спільній базі SQLite, тому послідовні
+callback одного користувача можуть оброблятися різними процесами бота.
+"""
+import asyncio
+import sqlite3
+import threading
+from app.bot.store import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS selections (
+    user_id INTEGER NOT NULL,
+    crop TEXT NOT NULL,
+    PRIMARY KEY (user_id, crop)
+);
+"""
+
+_memory: dict[int, set[str]] = {}  # вибір без сховища: {user_id: set(crops)}
+_conn: sqlite3.Connection | None = None
+_lock = threading.Lock()
+
+
+def open_store(path: str):
+    """Переносить вибір у спільну базу SQLite. Порожній шлях залишає його в пам'яті."""
+    global _conn
+    if path:
+        _conn = connect(path)
+        _conn.executescript(_SCHEMA)
+
+
+def close_store():
+    """Закриває з'єднання з базою."""
+    global _conn
+    if _conn is not None:
+        with _lock:
+            _conn.close()
+        _conn = None
+
+
+async def get(user_id: int) -> set[str]:
+    """Вибрані користувачем культури."""
+    if _conn is None:
+        return set(_memory.get(user_id, ()))
+    return await asyncio.to_thread(_get, user_id)
+
+
+async def toggle(user_id: int, crop: str) -> set[str]:
+    """
+    Додає культуру до вибору або прибирає її.
+
+    Returns:
+        Вибір після зміни
+    """
+    if _conn is None:
+        selected = _memory.setdefault(user_id, set())
+        selected.symmetric_difference_update({crop})
+        return set(selected)
+    return await asyncio.to_thread(_toggle, user_id, crop)
+
+
+async def pop(user_id: int) -> set[str]:
+    """Повертає та очищає вибір користувача."""
+    if _conn is None:
+        return _memory.pop(user_id, set())
+    return await asyncio.to_thread(_pop, user_id)
+
+
+def _get(user_id: int) -> set[str]:
+    with _lock:
+        return {crop for (crop,) in _conn.execute("SELECT crop FROM selections WHERE user_id = ?", (user_id,))}
+
+
+def _toggle(user_id: int, crop: str) -> set[str]:
+    with _lock, _conn:
+        removed = _conn.execute("DELETE FROM selections WHERE user_id = ? AND crop = ?", (user_id, crop))
+        if removed.rowcount == 0:
+            _conn.execute("INSERT INTO selections (user_id, crop) VALUES (?, ?)", (user_id, crop))
+        return {crop for (crop,) in _conn.execute("SELECT crop FROM selections WHERE user_id = ?", (user_id,))}
+
+
+def _pop(user_id: int) -> set[str]:
+    with _lock, _conn:
+        selected = {crop for (crop,) in _conn.execute("SELECT crop FROM selections WHERE user_id = ?", (user_id,))}
+        _conn.execute("DELETE FROM selections WHERE user_id = ?", (user_id,))
+        return selected
@@ -0,0 +1,57 @@
+"""
+Модуль об'єднання однакових одночасних запитів (single-flight).
+
+Якщо кілька користувачів одночасно запитують ту саму культуру,
+сайт обходиться лише один раз: перший виклик запускає завантаження,
+а решта чекають на той самий результат.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable
+
+
+class SingleFlight:
+    """
+    Дедуплікація одночасних асинхронних операцій за ключем.
+
+    Спільна операція виконується в окремій задачі, а кожен викликач
+    чекає на неї через asyncio.shield. Тому скасування одного викликача
+    (наприклад, користувач пішов) не перериває завантаження для інших.
+    """
+
+    def __init__(self):
+        self._tasks: dict[str, asyncio.Task] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Виконує factory() для ключа або приєднується до вже запущеного виконання.
+
+        Args:
+            key: Ключ дедуплікації (наприклад, URL культури)
+            factory: Функція, що створює корутину операції
+
+        Returns:
+            Результат спільної операції. Виняток операції отримують усі викликачі.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.create_task(factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        """Кількість операцій, що виконуються зараз."""
+        return len(self._tasks)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Забираємо виняток, якщо всі викликачі вже пішли, щоб asyncio не скаржився
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,293 @@
+"""
+Модуль локального сховища оголошень (SQLite).
+
+Зберігає всі побачені оголошення кожної культури, тому повторний обхід
+сайту може зупинитися на першій сторінці з уже відомими оголошеннями,
+а історія для аналітики не обмежується вікном з MAX_PAGES сторінок.
+
+База працює в режимі WAL, тому кілька процесів бота (WORKERS > 1) можуть
+користуватися одним файлом: час останнього обходу кожної культури та
+блокування обходу спільні, і сайт для культури обходить лише один процес.
+Скидання кешу (/cache_clear) збільшує номер епохи культури в базі, і кожен
+процес, побачивши нову епоху, скидає власний кеш цієї культури.
+"""
+import asyncio
+import contextlib
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from app.config_loader import SHARED_LOCK_TTL
+from app.bot.records import OfferRow, OfferType, parse_day
+
+_CELL_SEPARATOR = "\x1f"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS offers (
+    culture TEXT NOT NULL,
+    key TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    day INTEGER NOT NULL DEFAULT 0,
+    type TEXT NOT NULL,
+    price INTEGER NOT NULL,
+    cells TEXT NOT NULL DEFAULT '',
+    seen_at REAL NOT NULL,
+    PRIMARY KEY (culture, key)
+);
+CREATE INDEX IF NOT EXISTS offers_culture_seq ON offers (culture, seq);
+CREATE TABLE IF NOT EXISTS cultures (
+    culture TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    needs_full INTEGER NOT NULL DEFAULT 0,
+    epoch INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS locks (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+_LOCK_POLL_INTERVAL = 0.2
+"""Як часто перевіряти, чи звільнилося блокування, зайняте іншим процесом, с."""
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """
+    Відкриває базу SQLite для спільного використання кількома процесами.
+
+    Створює каталог бази, вмикає WAL (читачі не блокують записувача)
+    та очікування замість помилки "database is locked".
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class OfferStore:
+    """
+    Сховище оголошень у файлі SQLite.
+
+    Оголошення культури зберігаються в порядку лістингу (від нових до старих):
+    кожна нова порція отримує менші значення seq, ніж уже збережені.
+    Звернення до бази виконуються в окремому потоці, щоб не блокувати бота.
+
+    Args:
+        path: Шлях до файлу бази даних
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = connect(path)
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(offers)")}
+        if "cells" not in columns:
+            # База, створена до збереження всіх комірок рядка
+            self._conn.execute("ALTER TABLE offers ADD COLUMN cells TEXT NOT NULL DEFAULT ''")
+        if "day" not in columns:
+            # База, створена до збереження розібраної дати; такі рядки мають day = 0
+            # і розбираються під час завантаження
+            self._conn.execute("ALTER TABLE offers ADD COLUMN day INTEGER NOT NULL DEFAULT 0")
+        culture_columns = {row[1] for row in self._conn.execute("PRAGMA table_info(cultures)")}
+        if "needs_full" not in culture_columns:
+            self._conn.execute("ALTER TABLE cultures ADD COLUMN needs_full INTEGER NOT NULL DEFAULT 0")
+        if "epoch" not in culture_columns:
+            self._conn.execute("ALTER TABLE cultures ADD COLUMN epoch INTEGER NOT NULL DEFAULT 0")
+        self._lock = threading.Lock()
+
+    def close(self):
+        """Закриває з'єднання з базою."""
+        with self._lock:
+            self._conn.close()
+
+    async def fetched_at(self, culture: str) -> float:
+        """Час (time.time()) останнього обходу сайту для культури будь-яким процесом або 0."""
+        return await asyncio.to_thread(self._fetched_at, culture)
+
+    async def mark_fetched(self, culture: str, when: float | None = None):
+        """
+        Записує час обходу культури.
+
+        Args:
+            culture: Назва культури
+            when: Час обходу; 0 позначає дані як застарілі для всіх процесів
+        """
+        await asyncio.to_thread(self._mark_fetched, culture, time.time() if when is None else when)
+
+    async def needs_full_crawl(self, culture: str) -> bool:
+        """Чи має наступний обхід культури бути повним (в історії може бути пропуск)."""
+        return await asyncio.to_thread(self._needs_full_crawl, culture)
+
+    async def set_needs_full_crawl(self, culture: str, needed: bool):
+        """
+        Позначає, чи потрібен культурі повний (не інкрементальний) обхід.
+
+        Інкрементальний обхід зупиняється на першому відомому оголошенні,
+        тож сторінки, пропущені через помилку, він уже не завантажить.
+        """
+        await asyncio.to_thread(self._set_needs_full_crawl, culture, needed)
+
+    async def epochs(self) -> dict[str, int]:
+        """Номери епох кешу всіх культур: {культура: епоха} (культури без запису - епоха 0)."""
+        return await asyncio.to_thread(self._epochs)
+
+    async def invalidate(self, cultures: list[str]) -> dict[str, int]:
+        """
+        Скидає дані культур для всіх процесів.
+
+        Дані позначаються застарілими (наступний запит обійде сайт),
+        а епоха кешу культур збільшується, щоб решта процесів скинули
+        свої знімки.
+
+        Returns:
+            Нові епохи культур: {культура: епоха}
+        """
+        return await asyncio.to_thread(self._invalidate, cultures)
+
+    @contextlib.asynccontextmanager
+    async def lock(self, name: str, ttl: float = SHARED_LOCK_TTL):
+        """
+        Блокування, спільне для всіх процесів, що працюють з базою.
+
+        Якщо процес-власник завершився аварійно, блокування звільняється через ttl секунд.
+
+        Args:
+            name: Назва блокування (наприклад, "crawl:Кукурудза")
+            ttl: Максимальний час утримання блокування, с
+        """
+        owner = f"{os.getpid()}:{uuid.uuid4().hex}"
+        while not await asyncio.to_thread(self._try_lock, name, owner, ttl):
+            await asyncio.sleep(_LOCK_POLL_INTERVAL)
+        try:
+            yield
+        finally:
+            await asyncio.to_thread(self._unlock, name, owner)
+
+    async def known_keys(self, culture: str) -> set[str]:
+        """Ідентифікатори всіх збережених оголошень культури."""
+        return await asyncio.to_thread(self._known_keys, culture)
+
+    async def ingest(self, culture: str, rows: list[OfferRow], reorder: bool = False) -> int:
+        """
+        Додає нові оголошення культури (у порядку лістингу) перед уже збереженими.
+
+        Args:
+            culture: Назва культури
+            rows: Оголошення в порядку лістингу
+            reorder: rows - це повний початок лістингу (повний обхід): уже
+                збережені оголошення з rows переносяться на свої місця в ньому,
+                тож заповнені пропуски стають у правильному порядку
+
+        Returns:
+            Кількість доданих оголошень
+        """
+        return await asyncio.to_thread(self._ingest, culture, rows, reorder)
+
+    async def load(self, culture: str) -> list[OfferRow]:
+        """Усі збережені оголошення культури в порядку лістингу."""
+        return await asyncio.to_thread(self._load, culture)
+
+    def _fetched_at(self, culture: str) -> float:
+        with self._lock:
+            row = self._conn.execute("SELECT fetched_at FROM cultures WHERE culture = ?", (culture,)).fetchone()
+            return row[0] if row else 0.0
+
+    def _mark_fetched(self, culture: str, when: float):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO cultures (culture, fetched_at) VALUES (?, ?) "
+                "ON CONFLICT (culture) DO UPDATE SET fetched_at = excluded.fetched_at",
+                (culture, when),
+            )
+
+    def _needs_full_crawl(self, culture: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT needs_full FROM cultures WHERE culture = ?", (culture,)).fetchone()
+            return bool(row and row[0])
+
+    def _set_needs_full_crawl(self, culture: str, needed: bool):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO cultures (culture, fetched_at, needs_full) VALUES (?, 0, ?) "
+                "ON CONFLICT (culture) DO UPDATE SET needs_full = excluded.needs_full",
+                (culture, int(needed)),
+            )
+
+    def _epochs(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._conn.execute("SELECT culture, epoch FROM cultures"))
+
+    def _invalidate(self, cultures: list[str]) -> dict[str, int]:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO cultures (culture, fetched_at, epoch) VALUES (?, 0, 1) "
+                "ON CONFLICT (culture) DO UPDATE SET fetched_at = 0, epoch = epoch + 1",
+                [(culture,) for culture in cultures],
+            )
+            placeholders = ",".join("?" * len(cultures))
+            return dict(self._conn.execute(
+                f"SELECT culture, epoch FROM cultures WHERE culture IN ({placeholders})", cultures
+            ))
+
+    def _try_lock(self, name: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM locks WHERE name = ? AND expires_at < ?", (name, now))
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO locks (name, owner, expires_at) VALUES (?, ?, ?)", (name, owner, now + ttl)
+            )
+            return cursor.rowcount == 1
+
+    def _unlock(self, name: str, owner: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM locks WHERE name = ? AND owner = ?", (name, owner))
+
+    def _known_keys(self, culture: str) -> set[str]:
+        with self._lock:
+            cursor = self._conn.execute("SELECT key FROM offers WHERE culture = ?", (culture,))
+            return {key for (key,) in cursor}
+
+    def _ingest(self, culture: str, rows: list[OfferRow], reorder: bool) -> int:
+        with self._lock, self._conn:
+            known = 0
+            if reorder:
+                # Видаляємо збережені копії, щоб вставити весь початок лістингу по порядку
+                before = self._conn.total_changes
+                self._conn.executemany("DELETE FROM offers WHERE culture = ? AND key = ?",
+                                       ((culture, r.key) for r in rows))
+                known = self._conn.total_changes - before
+            (min_seq,) = self._conn.execute(
+                "SELECT COALESCE(MIN(seq), 0) FROM offers WHERE culture = ?", (culture,)
+            ).fetchone()
+            start = min_seq - len(rows)
+            now = time.time()
+            before = self._conn.total_changes + known
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO offers (culture, key, seq, date, day, type, price, cells, seen_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (culture, r.key, start + i, r.date, r.day, r.type, r.price, _CELL_SEPARATOR.join(r.cells), now)
+                    for i, r in enumerate(rows)
+                ),
+            )
+            return self._conn.total_changes - before
+
+    def _load(self, culture: str) -> list[OfferRow]:
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT day, type, price, key, date, cells FROM offers WHERE culture = ? ORDER BY seq", (culture,)
+            )
+            rows = []
+            for day, type_offer, price, key, date, cells in cursor:
+                kind = OfferType.from_label(type_offer)
+                day = day or parse_day(date)
+                if kind is None or day is None:
+                    continue
+                rows.append(OfferRow(day, kind, price, key, date, tuple(cells.split(_CELL_SEPARATOR)) if cells else ()))
+            return rows
@@ -0,0 +1,189 @@
+"""
+Модуль часового індексу оголошень.
+
+Індекс будується один раз для знімка культури: оголошення кожного типу
+групуються в денні кошики, упорядковані за датою, а для кошиків рахуються
+префіксні суми кількості, суми та суми квадратів цін і розріджені таблиці
+мінімумів та максимумів. Тому аналітика за будь-який проміжок [від, до]
+(рік, місяць, довільні дати) отримується пошуком меж кошиків за O(log n)
+без перегляду всіх оголошень. Медіана шукається бісекцією за значенням
+ціни по відсортованих цінах кошиків проміжку.
+
+Результат збігається з analytics.analyze_offers для оголошень проміжку.
+"""
+import math
+from bisect import bisect_left, bisect_right
+from datetime import date
+from app.bot.analytics import average, format_day, price_change
+from app.bot.records import OfferRow, OFFER_TYPES
+
+
+class _SparseTable:
+    """Мінімум на відрізку масиву за O(1) після побудови за O(n log n)."""
+
+    def __init__(self, values: list):
+        self._levels = [values]
+        width = 1
+        while 2 * width <= len(values):
+            prev = self._levels[-1]
+            self._levels.append([min(prev[i], prev[i + width]) for i in range(len(prev) - width)])
+            width *= 2
+
+    def query(self, lo: int, hi: int):
+        """Мінімум values[lo:hi] (hi > lo)."""
+        level = (hi - lo).bit_length() - 1
+        row = self._levels[level]
+        return min(row[lo], row[hi - (1 << level)])
+
+
+class TypeIndex:
+    """
+    Часовий індекс оголошень одного типу.
+
+    Args:
+        pairs: (день, ціна) оголошень у порядку лістингу
+    """
+
+    def __init__(self, pairs: list[tuple[int, int]]):
+        buckets: dict[int, list[int]] = {}
+        for day, price in pairs:
+            buckets.setdefault(day, []).append(price)
+
+        self.days = sorted(buckets)
+        count, n, total, squares = [0], [0], [0], [0]
+        self.sums_all: list[int] = []  # сума всіх цін дня (для динаміки по днях)
+        self.counts: list[int] = []
+        self.sorted_prices: list[list[int]] = []  # додатні ціни дня за зростанням
+        self.first_prices: list[int | None] = []  # перша та остання додатна ціна дня
+        self.last_prices: list[int | None] = []   # у порядку, в якому їх бачить аналіз
+        minima, maxima = [], []
+        for day in self.days:
+            prices = buckets[day]
+            positive = [p for p in prices if p > 0]
+            count.append(count[-1] + len(prices))
+            n.append(n[-1] + len(positive))
+            total.append(total[-1] + sum(positive))
+            squares.append(squares[-1] + sum(p * p for p in positive))
+            self.counts.append(len(prices))
+            self.sums_all.append(sum(prices))
+            self.sorted_prices.append(sorted(positive))
+            # Аналіз сортує оголошення за датою стабільно, тож у межах дня зберігається порядок лістингу
+            self.first_prices.append(positive[0] if positive else None)
+            self.last_prices.append(positive[-1] if positive else None)
+            # (ціна, день) - мінімум дає найраніший день мінімальної ціни;
+            # (-ціна, день) - так само для максимальної
+            minima.append((min(positive), day) if positive else (math.inf, day))
+            maxima.append((-max(positive), day) if positive else (math.inf, day))
+
+        self._count, self._n, self._total, self._squares = count, n, total, squares
+        self._minima = _SparseTable(minima) if minima else None
+        self._maxima = _SparseTable(maxima) if maxima else None
+
+    def _span(self, first: int, last: int) -> tuple[int, int]:
+        """Індекси кошиків [lo, hi) для днів від first до last включно."""
+        return bisect_left(self.days, first), bisect_right(self.days, last)
+
+    def _window(self, lo: int, hi: int) -> tuple[int, int, int]:
+        """(оголошень, з ціною, сума додатних цін) кошиків [lo, hi)."""
+        if hi <= lo:
+            return 0, 0, 0
+        return (self._count[hi] - self._count[lo], self._n[hi] - self._n[lo],
+                self._total[hi] - self._total[lo])
+
+    def _kth(self, lo: int, hi: int, k: int, low: int, high: int) -> int:
+        """k-та (з нуля) за зростанням додатна ціна кошиків [lo, hi); low/high - межі цін."""
+        lists = [prices for prices in self.sorted_prices[lo:hi] if prices]
+        while low < high:
+            mid = (low + high) // 2
+            if sum(bisect_right(prices, mid) for prices in lists) > k:
+                high = mid
+            else:
+                low = mid + 1
+        return low
+
+    def query(self, first: int, last: int, today: int) -> dict | None:
+        """
+        Розділ аналітики у форматі analyze_offers для днів від first до last.
+
+        Args:
+            first: Перший день проміжку (порядковий номер)
+            last: Останній день проміжку (включно)
+            today: Поточний день для вікон "сьогодні / 3 дні / 7 днів"
+        """
+        lo, hi = self._span(first, last)
+        count_total, n, total = self._window(lo, hi)
+        if not count_total:
+            return None
+        squares = self._squares[hi] - self._squares[lo]
+
+        median_price = std_dev = 0
+        max_price = min_price = 0
+        max_price_date = min_price_date = None
+        price_change_percent = 0
+        trend = "немає змін"
+        if n:
+            min_price, min_day = self._minima.query(lo, hi)
+            neg_max, max_day = self._maxima.query(lo, hi)
+            max_price = -neg_max
+            min_price_date, max_price_date = format_day(min_day), format_day(max_day)
+            if n % 2:
+                median_price = self._kth(lo, hi, n // 2, min_price, max_price)
+            else:
+                below = self._kth(lo, hi, n // 2 - 1, min_price, max_price)
+                above = self._kth(lo, hi, n // 2, min_price, max_price)
+                median_price = int(round((below + above) / 2))
+        if n > 1:
+            std_dev = int(round(math.sqrt((n * squares - total * total) / (n * (n - 1)))))
+        if n >= 2:
+            first_price = next(p for p in self.first_prices[lo:hi] if p is not None)
+            last_price = next(p for p in reversed(self.last_prices[lo:hi]) if p is not None)
+            price_change_percent, trend = price_change(first_price, last_price)
+
+        today_lo, today_hi = self._span(max(first, today), min(last, today))
+        count_today, n_today, sum_today = self._window(today_lo, today_hi)
+        count_last_3, n_last_3, sum_last_3 = self._window(self._span(max(first, today - 3), last)[0], hi)
+        week_lo = self._span(max(first, today - 7), last)[0]
+        count_last_7, n_last_7, sum_last_7 = self._window(week_lo, hi)
+
+        return {
+            "count_today": count_today,
+            "count_total": count_total,
+            "first_date": format_day(self.days[lo]),
+            "last_date": format_day(self.days[hi - 1]),
+            "avg_price": average(total, n),
+            "median_price": median_price,
+            "std_dev": std_dev,
+            "max_price": max_price,
+            "max_price_date": max_price_date,
+            "min_price": min_price,
+            "min_price_date": min_price_date,
+            "avg_price_today": average(sum_today, n_today),
+            "avg_price_last_3": average(sum_last_3, n_last_3),
+            "avg_price_last_7": average(sum_last_7, n_last_7),
+            "count_last_3": count_last_3,
+            "count_last_7": count_last_7,
+            "price_change_percent": price_change_percent,
+            "trend": trend,
+            "daily_avg": {format_day(self.days[i]): average(self.sums_all[i], self.counts[i])
+                          for i in range(week_lo, hi)},
+        }
+
+
+class TimeIndex:
+    """
+    Часовий індекс оголошень культури (окремо для кожного типу).
+
+    Args:
+        rows: Оголошення знімка в порядку лістингу
+    """
+
+    def __init__(self, rows: list[OfferRow]):
+        pairs = tuple([] for _ in OFFER_TYPES)
+        for r in rows:
+            pairs[r.kind].append((r.day, r.price))
+        self.types = tuple(TypeIndex(p) for p in pairs)
+
+    def query(self, first: int, last: int, today: int | None = None) -> dict:
+        """Аналітика у форматі analyze_offers за дні від first до last включно."""
+        today = date.today().toordinal() if today is None else today
+        return {offer_type: index.query(first, last, today) for offer_type, index in zip(OFFER_TYPES, self.types)}
@@ -0,0 +1,142 @@
+"""
+Модуль трасування запитів та профілювання на вимогу.
+
+Кожне натискання на культуру отримує трасу з власним ідентифікатором.
+Ділянки коду, обгорнуті в span(), записують свою тривалість у поточну
+трасу (через contextvars, тому й у задачах, запущених під час запиту,
+наприклад паралельному завантаженні сторінок). Якщо запит триває довше
+за TRACE_SLOW_MS, повна розбивка за ділянками виводиться в лог.
+
+Адміністратор може увімкнути cProfile для наступних N запитів; профіль
+зберігається у файл у PROFILE_DIR для аналізу (python -m pstats, snakeviz).
+"""
+import contextlib
+import contextvars
+import cProfile
+import os
+import time
+import uuid
+from datetime import datetime
+from app.config_loader import TRACE_SLOW_MS, PROFILE_DIR
+
+
+class Trace:
+    """
+    Траса одного запиту.
+
+    Attributes:
+        trace_id: Короткий ідентифікатор запиту для логів
+        name: Назва запиту (наприклад, "culture:Кукурудза")
+        spans: Записані ділянки: (назва, початок від старту траси, тривалість, глибина, атрибути)
+    """
+
+    def __init__(self, name: str):
+        self.trace_id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.spans: list[tuple[str, float, float, int, dict]] = []
+        self.profiled = False
+        self._token: contextvars.Token | None = None
+
+    def format(self) -> str:
+        """Розбивка траси за ділянками у порядку їх початку."""
+        lines = [f"[{self.trace_id}] {self.name}: {self.duration * 1000:.1f} мс"]
+        for name, offset, duration, depth, attrs in sorted(self.spans, key=lambda s: s[1]):
+            details = " ".join(f"{k}={v}" for k, v in attrs.items())
+            lines.append(f"{'  ' * (depth + 1)}{name:<{max(1, 24 - 2 * depth)}} "
+                         f"+{offset * 1000:8.1f} мс {duration * 1000:8.1f} мс {details}".rstrip())
+        return "\n".join(lines)
+
+
+_trace: contextvars.ContextVar[Trace | None] = contextvars.ContextVar("trace", default=None)
+_depth: contextvars.ContextVar[int] = contextvars.ContextVar("trace_depth", default=0)
+
+_profiler: cProfile.Profile | None = None
+_profile_remaining = 0  # скільки запитів ще профілювати
+_profile_active = 0  # запити, що виконуються під профайлером
+
+
+def current() -> Trace | None:
+    """Траса поточного запиту або None."""
+    return _trace.get()
+
+
+def start(name: str) -> Trace:
+    """Починає трасу запиту (і профілювання, якщо його замовлено)."""
+    global _profiler, _profile_active
+    trace = Trace(name)
+    trace._token = _trace.set(trace)
+    if _profile_remaining > 0 and _profile_active < _profile_remaining:
+        if _profiler is None:
+            _profiler = cProfile.Profile()
+            _profiler.enable()
+        _profile_active += 1
+        trace.profiled = True
+    return trace
+
+
+def finish(trace: Trace) -> str | None:
+    """
+    Завершує трасу; повільні запити виводяться в лог з повною розбивкою.
+
+    Returns:
+        Шлях до файлу профілю, якщо цим запитом профілювання завершилося, інакше None
+    """
+    global _profiler, _profile_remaining, _profile_active
+    trace.duration = time.perf_counter() - trace.started
+    if trace._token is not None:
+        _trace.reset(trace._token)
+        trace._token = None
+
+    if trace.duration * 1000 >= TRACE_SLOW_MS:
+        print(f"🐢 Повільний запит\n{trace.format()}")
+
+    if not trace.profiled:
+        return None
+    _profile_active -= 1
+    _profile_remaining -= 1
+    if _profile_remaining > 0 or _profiler is None:
+        return None
+
+    _profiler.disable()
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"profile-{datetime.now():%Y%m%d-%H%M%S}-{trace.trace_id}.prof")
+    _profiler.dump_stats(path)
+    _profiler = None
+    print(f"📊 Профіль збережено: {path}")
+    return path
+
+
+@contextlib.contextmanager
+def span(name: str, **attrs):
+    """
+    Записує тривалість ділянки коду в поточну трасу.
+
+    Без активної траси (фоновий прогрів, бенчмарки) нічого не робить.
+    Атрибути (наприклад, page=3) потрапляють у розбивку повільного запиту.
+    """
+    trace = _trace.get()
+    if trace is None:
+        yield attrs
+        return
+
+    depth = _depth.get()
+    token = _depth.set(depth + 1)
+    started = time.perf_counter()
+    try:
+        yield attrs
+    finally:
+        _depth.reset(token)
+        trace.spans.append((name, started - trace.started, time.perf_counter() - started, depth, attrs))
+
+
+def profile_next(count: int):
+    """Вмикає cProfile для наступних count запитів."""
+    global _profile_remaining
+    _profile_remaining = max(count, _profile_active)
+
+
+def profiling_pending() -> int:
+    """Скільки запитів ще буде профільовано."""
+    return _profile_remaining
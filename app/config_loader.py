@@ -26,6 +26,143 @@ ADMIN_USER_ID = int(os.getenv("ADMIN_USER_ID"))
 MAX_PAGES = int(os.getenv("MAX_PAGES"))
 """Максимальна кількість сторінок для парсингу. Обов'язкова змінна."""
 
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "4"))
+"""Кількість сторінок, що завантажуються паралельно (1 - послідовний обхід)."""
+
+PAGE_RETRIES = int(os.getenv("PAGE_RETRIES", "2"))
+"""Скільки разів повторювати запит сторінки після помилки мережі чи відповіді не 200."""
+
+PAGE_RETRY_DELAY = float(os.getenv("PAGE_RETRY_DELAY", "0.5"))
+"""Затримка перед першим повтором запиту сторінки, с (далі подвоюється)."""
+
+PARSER_BACKEND = os.getenv("PARSER_BACKEND", "auto")
+"""Бекенд вилучення рядків з HTML: auto, lxml або bs4."""
+
+PREVIEW_PAGES = int(os.getenv("PREVIEW_PAGES", "3"))
+"""Після скількох сторінок обходу показувати попередній звіт (0 - не показувати)."""
+
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "3"))
+"""Скільки культур зведення /monitor_all одночасно завантажує з сайту (спільний бюджет обходів)."""
+
+# Analytics Configuration
+ANALYTICS_ENGINE = os.getenv("ANALYTICS_ENGINE", "python")
+"""Рушій аналітики попереднього звіту: python або numpy (повні звіти рахують агрегатор та часовий індекс)."""
+
+MARKET_DAYS = int(os.getenv("MARKET_DAYS", "30"))
+"""Скільки останніх днів охоплює матриця цін огляду ринку (/market)."""
+
+# Telegram Configuration
+EDIT_MIN_INTERVAL = float(os.getenv("EDIT_MIN_INTERVAL", "1.0"))
+"""Мінімальний інтервал між редагуваннями індикатора прогресу в одному чаті, с."""
+
+TG_GLOBAL_RATE = float(os.getenv("TG_GLOBAL_RATE", "30"))
+"""Максимум вихідних запитів до Telegram за секунду для всього бота."""
+
+TG_GLOBAL_BURST = float(os.getenv("TG_GLOBAL_BURST", "2"))
+"""Скільки запитів бот може надіслати поспіль понад рівномірний темп TG_GLOBAL_RATE."""
+
+TG_CHAT_RATE = float(os.getenv("TG_CHAT_RATE", "1"))
+"""Максимум вихідних запитів за секунду в одному чаті (у середньому)."""
+
+TG_CHAT_BURST = float(os.getenv("TG_CHAT_BURST", "3"))
+"""Скільки запитів поспіль можна надіслати в чат без очікування."""
+
+TG_MAX_RETRIES = int(os.getenv("TG_MAX_RETRIES", "3"))
+"""Скільки разів повторювати запит після відповіді 429 (retry_after)."""
+
+# Serving Configuration
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+"""Режим отримання оновлень: polling або webhook."""
+
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+"""Публічна адреса сервера (https://...), на яку Telegram надсилатиме оновлення."""
+
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+"""Шлях, за яким вебсервер приймає оновлення."""
+
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+"""Секрет для заголовка X-Telegram-Bot-Api-Secret-Token (порожній - без перевірки)."""
+
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+"""Адреса, на якій слухає вбудований вебсервер."""
+
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", os.getenv("PORT", "8080")))
+"""Порт вбудованого вебсервера (за замовчуванням - PORT від хостингу або 8080)."""
+
+WORKERS = int(os.getenv("WORKERS", "1"))
+"""Кількість процесів webhook сервера на спільному порту (потребує сховища OFFER_STORE_PATH)."""
+
+# Metrics Configuration
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+"""Порт HTTP сервера метрик Prometheus (/metrics). 0 - сервер вимкнено."""
+
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+"""Адреса сервера метрик (за замовчуванням доступний лише локально)."""
+
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "3000"))
+"""Запити, довші за цю кількість мілісекунд, виводяться в лог з розбивкою за ділянками."""
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "data/profiles")
+"""Каталог для файлів профілів cProfile (/profile)."""
+
+# Cache Configuration
+CACHE_TTL = float(os.getenv("CACHE_TTL", "600"))
+"""Скільки секунд дані культури в кеші вважаються свіжими."""
+
+CACHE_STALE_TTL = float(os.getenv("CACHE_STALE_TTL", "1800"))
+"""Скільки секунд після CACHE_TTL застарілі дані ще віддаються, поки оновлюються у фоні."""
+
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "64"))
+"""Максимальна кількість записів у кеші."""
+
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+"""Максимальний приблизний обсяг кешу в байтах."""
+
+# Offer Store Configuration
+OFFER_STORE_PATH = os.getenv("OFFER_STORE_PATH", "data/offers.sqlite3")
+"""Шлях до SQLite сховища оголошень. Порожнє значення вимикає сховище."""
+
+SHARED_LOCK_TTL = float(os.getenv("SHARED_LOCK_TTL", "300"))
+"""Через скільки секунд блокування обходу культури звільняється, якщо процес-власник завершився."""
+
+# Prewarm Configuration
+PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "1") == "1"
+"""Чи оновлювати кеш усіх культур у фоні."""
+
+PREWARM_INTERVAL = float(os.getenv("PREWARM_INTERVAL", "900"))
+"""Інтервал фонового оновлення культури в секундах."""
+
+PREWARM_HOT_INTERVAL = float(os.getenv("PREWARM_HOT_INTERVAL", "300"))
+"""Інтервал оновлення популярних та нещодавно запитаних культур в секундах."""
+
+PREWARM_HOT_CULTURES = [
+    c.strip() for c in os.getenv("PREWARM_HOT_CULTURES", "Кукурудза,Пшениця 2 клас,Пшениця 3 клас,Соняшник").split(",")
+    if c.strip()
+]
+"""Популярні культури, що завжди оновлюються з PREWARM_HOT_INTERVAL."""
+
+PREWARM_JITTER = float(os.getenv("PREWARM_JITTER", "0.1"))
+"""Випадковий зсув інтервалу оновлення (частка від інтервалу)."""
+
+PREWARM_CONCURRENCY = int(os.getenv("PREWARM_CONCURRENCY", "2"))
+"""Максимальна кількість культур, що оновлюються одночасно."""
+
+# HTTP Client Configuration
+HTTP_LIMIT_PER_HOST = int(os.getenv("HTTP_LIMIT_PER_HOST", "8"))
+"""Максимальна кількість одночасних з'єднань з одним хостом."""
+
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "20"))
+"""Загальний тайм-аут одного HTTP запиту в секундах."""
+
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+"""Тайм-аут встановлення з'єднання в секундах."""
+
+HTTP_KEEPALIVE = float(os.getenv("HTTP_KEEPALIVE", "60"))
+"""Скільки секунд тримати невикористане з'єднання відкритим."""
+
+HTTP_DNS_TTL = int(os.getenv("HTTP_DNS_TTL", "300"))
+"""Час кешування DNS відповідей в секундах."""
+
 # Optional Configuration
 PARSING_URL = os.getenv("PARSING_URL")
 """URL для парсингу"""
@@ -1,30 +1,97 @@
 """
 Точка входу для Telegram бота Graintrade Monitor.
 
-Запускає бота та налаштовує обробку подій.
+Запускає бота та налаштовує обробку подій. Режим отримання оновлень
+(long polling або webhook) обирається змінною BOT_MODE. У режимі webhook
+можна запустити WORKERS процесів на спільному порту: дані культур, скидання
+кешу, вибір культур та блокування обходу сайту вони ділять через сховище
+OFFER_STORE_PATH, ліміти Telegram діляться між процесами порівну, а кеш
+прогріває лише процес 0.
 """
 import asyncio
+import multiprocessing
+import signal
 from aiogram import Bot, Dispatcher
-from app.config_loader import BOT_TOKEN
+from app.config_loader import (BOT_TOKEN, BOT_MODE, PREWARM_ENABLED, OFFER_STORE_PATH,
+                               WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_SECRET, WORKERS, METRICS_HOST, METRICS_PORT)
 from app.bot.handlers import router
+from app.bot import http_client, metrics, offers, outbound, progress, selections
+from app.webhook import run_webhook
 
 
-async def main():
+async def on_startup(bot: Bot, worker_id: int = 0, workers: int = 1):
+    """Запускає спільні ресурси та реєструє (або знімає) webhook."""
+    if workers > 1:
+        # Ліміти Telegram спільні для бота, а рахує їх кожен процес окремо
+        outbound.share_limits(workers)
+        progress.share_edit_budget(workers)
+
+    # Спільний HTTP клієнт для парсингу
+    await http_client.start_session()
+
+    # Локальне сховище оголошень для інкрементального парсингу
+    offers.open_store(OFFER_STORE_PATH)
+    selections.open_store(OFFER_STORE_PATH)
+
+    # Фоновий прогрів кешу культур; решта процесів беруть прогріті дані зі сховища
+    if PREWARM_ENABLED and worker_id == 0:
+        offers.scheduler.start()
+
+    # Метрики Prometheus; кожен процес слухає власний порт
+    if METRICS_PORT:
+        await metrics.start_server(METRICS_HOST, METRICS_PORT + worker_id)
+
+    if BOT_MODE == "webhook":
+        # Без WEBHOOK_URL вважаємо, що webhook уже зареєстровано (або оновлення надходять локально)
+        if WEBHOOK_URL and worker_id == 0:
+            await bot.set_webhook(WEBHOOK_URL.rstrip("/") + WEBHOOK_PATH, secret_token=WEBHOOK_SECRET or None)
+    else:
+        # Polling не працює, поки в бота зареєстровано webhook
+        await bot.delete_webhook()
+
+
+async def on_shutdown():
+    """Зупиняє фонові задачі та звільняє спільні ресурси."""
+    await offers.scheduler.stop()
+    await metrics.stop_server()
+    await outbound.queue.close()
+    await http_client.close_session()
+    offers.close_store()
+    selections.close_store()
+    print(f"🔌 HTTP клієнт закрито: {http_client.get_stats()}")
+
+
+def create_dispatcher(worker_id: int = 0, workers: int = 1) -> Dispatcher:
+    """Диспетчер з роутером та хуками запуску/зупинки для обох режимів."""
+    dp = Dispatcher(worker_id=worker_id, workers=workers)
+
+    # Підключаємо роутер з обробниками
+    dp.include_router(router)
+    dp.startup.register(on_startup)
+    dp.shutdown.register(on_shutdown)
+    return dp
+
+
+async def main(worker_id: int = 0, workers: int = 1):
     """
     Головна функція для запуску бота.
-    
+
     Створює екземпляри Bot та Dispatcher, підключає роутер
-    та запускає polling для обробки повідомлень.
+    та запускає polling або webhook сервер для обробки повідомлень.
+
+    Args:
+        worker_id: Номер процесу, якщо їх запущено кілька (webhook реєструє процес 0)
+        workers: Скільки процесів бота запущено
     """
     bot = Bot(token=BOT_TOKEN)
-    dp = Dispatcher()
-
-    # Підключаємо роутер з обробниками
-    dp.include_router(router)
+    dp = create_dispatcher(worker_id, workers)
 
     try:
-        print("🤖 Бот Graintrade Monitor запущено...")
-        await dp.start_polling(bot)
+        print(f"🤖 Бот Graintrade Monitor запущено ({BOT_MODE}, процес {worker_id})...")
+        if BOT_MODE == "webhook":
+            await run_webhook(bot, dp, reuse_port=WORKERS > 1)
+        else:
+            await dp.start_polling(bot)
     except KeyboardInterrupt:
         print("\n⚠️ Бот зупинено користувачем")
     except Exception as e:
@@ -34,5 +101,35 @@ async def main():
         print("✅ Сесія бота закрита")
 
 
+def _run_worker(worker_id: int, workers: int):
+    asyncio.run(main(worker_id, workers))
+
+
+def run_workers(count: int):
+    """
+    Запускає count процесів webhook сервера на спільному порту.
+
+    SIGTERM батьківському процесу передається всім процесам,
+    і кожен з них коректно завершує роботу.
+    """
+    processes = [multiprocessing.Process(target=_run_worker, args=(i, count), name=f"worker-{i}")
+                 for i in range(count)]
+    for process in processes:
+        process.start()
+    signal.signal(signal.SIGTERM, lambda *_: [p.terminate() for p in processes if p.is_alive()])
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        # Процеси отримують SIGINT від терміналу самі - чекаємо на їх завершення
+        for process in processes:
+            process.join()
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    if BOT_MODE == "webhook" and WORKERS > 1:
+        if not OFFER_STORE_PATH:
+            print("⚠️ Без OFFER_STORE_PATH процеси не ділять кеш та вибір культур")
+        run_workers(WORKERS)
+    else:
+        asyncio.run(main())
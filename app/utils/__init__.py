@@ -4,7 +4,8 @@
 Містить допоміжні функції для форматування та обробки даних.
 """
 
-from app.utils.formatters import format_section, format_comparison, format_admin_message
+from app.utils.formatters import format_section, format_comparison, format_preview, format_summary, format_market_overview, format_admin_message, format_cache_stats, format_send_stats, format_metrics_summary
 
-__all__ = ['format_section', 'format_comparison', 'format_admin_message']
+__all__ = ['format_section', 'format_comparison', 'format_preview', 'format_summary', 'format_market_overview', 'format_admin_message',
+           'format_cache_stats', 'format_send_stats', 'format_metrics_summary']
 
@@ -190,6 +190,136 @@ def format_comparison(buy_data: dict, sell_data: dict, culture_name: str) -> str
     return '\n'.join(text_parts)
 
 
+def format_preview(analysis: dict, culture_name: str, pages: int) -> str:
+    """
+    Формує короткий попередній звіт за першими сторінками лістингу.
+
+    Args:
+        analysis: Результат analyze_offers для оголошень перших сторінок
+        culture_name: Назва культури для відображення
+        pages: Скільки сторінок уже розібрано
+
+    Returns:
+        Відформатований текст попереднього звіту
+    """
+    text_parts = [
+        f"⚡ ПОПЕРЕДНІЙ ЗВІТ: {culture_name}",
+        f"За першими {pages} сторінками, повний звіт ще завантажується",
+    ]
+    for offer_type in ("куплю", "продам"):
+        data = analysis.get(offer_type)
+        if not data:
+            text_parts.append(f"\n{offer_type.capitalize()}: оголошень поки немає")
+            continue
+        text_parts.append(f"\n{offer_type.capitalize()}: {data['count_total']} оголошень "
+                          f"({data['first_date']} - {data['last_date']})")
+        text_parts.append(f"   • Середня ціна: {data['avg_price']} USD, медіана: {data['median_price']} USD")
+        text_parts.append(f"   • Діапазон: {data['min_price']} - {data['max_price']} USD")
+    return "\n".join(text_parts)
+
+
+def _week_change(data: dict | None) -> float | None:
+    """Зміна середньої ціни від першого до останнього дня денної динаміки (останні 7 днів), %."""
+    if not data:
+        return None
+    days = sorted(data.get('daily_avg', {}).items(), key=lambda x: datetime.strptime(x[0], "%d.%m.%Y"))
+    prices = [price for _, price in days if price > 0]
+    if len(prices) < 2:
+        return None
+    return (prices[-1] - prices[0]) / prices[0] * 100
+
+
+def format_summary(analyses: list[tuple[str, dict | None]], period_title: str) -> str:
+    """
+    Формує зведення по всіх культурах: один рядок таблиці на культуру.
+
+    Args:
+        analyses: (назва культури, результат analyze_offers або None, якщо дані не завантажилися)
+        period_title: Підпис періоду ("за весь період", "за 2025 рік", ...)
+
+    Returns:
+        Відформатований текст зведення
+    """
+    text_parts = [
+        f"📊 ЗВЕДЕННЯ ПО КУЛЬТУРАХ ({period_title})",
+        f"Середні ціни USD/т: куплю / продам | спред (продам - куплю) | зміна за 7 днів",
+        f"{'='*33}",
+    ]
+    for culture_name, analysis in analyses:
+        if analysis is None:
+            text_parts.append(f"❌ {culture_name}: не вдалося завантажити дані")
+            continue
+        buy_data = analysis.get("куплю")
+        sell_data = analysis.get("продам")
+        buy_price = buy_data.get('avg_price', 0) if buy_data else 0
+        sell_price = sell_data.get('avg_price', 0) if sell_data else 0
+        if not buy_price and not sell_price:
+            text_parts.append(f"➖ {culture_name}: оголошень з цінами немає")
+            continue
+
+        spread = f"{sell_price - buy_price:+d}" if buy_price and sell_price else "-"
+        # Зміна - за цінами продавців, а якщо їх немає - покупців
+        change = _week_change(sell_data) if sell_price else None
+        if change is None:
+            change = _week_change(buy_data)
+        if change is None:
+            change_text = "-"
+        else:
+            arrow = "↑" if change > 0 else ("↓" if change < 0 else "→")
+            change_text = f"{change:+.1f}% {arrow}"
+        text_parts.append(f"• {culture_name}: {buy_price or '-'} / {sell_price or '-'} | {spread} | {change_text}")
+
+    text_parts.append(f"\nДетальний звіт по культурі: /monitor")
+    return '\n'.join(text_parts)
+
+
+def format_market_overview(overview: dict) -> str:
+    """
+    Формує огляд ринку по всіх культурах: імпульс, спреди та кореляції цін.
+
+    Args:
+        overview: Словник з MarketMatrix.overview()
+
+    Returns:
+        Відформатований текст огляду
+    """
+    text_parts = [
+        f"🌍 ОГЛЯД РИНКУ: {overview['offer_type'].upper()}",
+        f"{'='*33}",
+        f"Середні денні ціни (USD за 1 тонну) за останні {overview['days']} днів, "
+        f"культур з даними: {overview['cultures']}",
+    ]
+
+    text_parts.append(f"\n🚀 ІМПУЛЬС ЗА 7 ДНІВ:")
+    text_parts.append(f"   ↳ Зміна середньої ціни проти попереднього тижня (та відносно медіани ринку)")
+    for culture_name, change, relative in overview['momentum']:
+        text_parts.append(f"   • {culture_name}: {change:+.1f}% ({relative:+.1f} п.п.)")
+    if not overview['momentum']:
+        text_parts.append(f"   Недостатньо даних за два останні тижні")
+
+    text_parts.append(f"\n↔️ СПРЕДИ СПОРІДНЕНИХ КУЛЬТУР (за 7 днів):")
+    text_parts.append(f"   ↳ На скільки перша культура дорожча за другу в ті самі дні")
+    for a, b, spread, previous, correlation in overview['spreads']:
+        line = f"   • {a} - {b}: {spread:+.0f} USD"
+        if previous is not None:
+            line += f" (тиждень тому {previous:+.0f})"
+        if correlation is not None:
+            line += f", кореляція {correlation:.2f}"
+        text_parts.append(line)
+    if not overview['spreads']:
+        text_parts.append(f"   Немає спільних днів з цінами")
+
+    text_parts.append(f"\n🔗 НАЙСИЛЬНІШІ КОРЕЛЯЦІЇ ДЕННИХ ЦІН:")
+    text_parts.append(f"   ↳ Близько до 1 - ціни рухаються разом, до -1 - у протилежні боки")
+    for a, b, correlation in overview['correlations']:
+        text_parts.append(f"   • {a} / {b}: {correlation:+.2f}")
+    if not overview['correlations']:
+        text_parts.append(f"   Недостатньо спільних днів з цінами")
+
+    text_parts.append(f"\nДетальний звіт по культурі: /monitor, зведення: /monitor_all")
+    return '\n'.join(text_parts)
+
+
 def format_admin_message(full_name: str, username: str, user_id: int, selected_crops: set[str]) -> str:
     """
     Формує повідомлення для адміністратора про запит на додавання культур.
@@ -223,3 +353,66 @@ def format_admin_message(full_name: str, username: str, user_id: int, selected_c
     
     return admin_message
 
+
+def format_cache_stats(stats: dict) -> str:
+    """
+    Формує повідомлення для адміністратора зі статистикою кешу.
+
+    Args:
+        stats: Словник з OfferCache.stats()
+
+    Returns:
+        Відформатоване повідомлення
+    """
+    return (
+        f"🗄 Кеш оголошень\n\n"
+        f"• Записів: {stats['entries']} ({stats['bytes'] / 1024 / 1024:.1f} МБ)\n"
+        f"• Влучання: {stats['hits']} (застарілі: {stats['stale_hits']})\n"
+        f"• Промахи: {stats['misses']}\n"
+        f"• Витіснено: {stats['evictions']}, прострочено: {stats['expirations']}\n"
+        f"• Частка влучань: {stats['hit_ratio'] * 100:.1f}%"
+    )
+
+
+def format_send_stats(stats: dict) -> str:
+    """
+    Формує повідомлення для адміністратора зі станом черги вихідних повідомлень.
+
+    Args:
+        stats: Словник з SendQueue.stats()
+
+    Returns:
+        Відформатоване повідомлення
+    """
+    return (
+        f"📤 Черга повідомлень\n\n"
+        f"• В черзі: {stats['depth']} (активних чатів: {stats['active_chats']})\n"
+        f"• Надіслано: {stats['sent']}, помилок: {stats['failed']}\n"
+        f"• Повторів після 429: {stats['retries_429']}\n"
+        f"• Затримка: середня {stats['latency_avg']:.2f} с, максимальна {stats['latency_max']:.2f} с"
+    )
+
+
+def format_metrics_summary(summary: dict) -> str:
+    """
+    Формує повідомлення для адміністратора зі зведенням метрик.
+
+    Args:
+        summary: Словник з metrics.summary()
+
+    Returns:
+        Відформатоване повідомлення
+    """
+    return (
+        f"📈 Метрики\n\n"
+        f"• Сторінок завантажено: {summary['pages']} (помилок: {summary['page_errors']}), "
+        f"p95 ≤ {summary['page_p95']:g} с\n"
+        f"• Розбір сторінки: {summary['parse_avg'] * 1000:.1f} мс у середньому\n"
+        f"• З'єднання з сайтом: відкрито {summary['http_opened']}, повторно використано {summary['http_reused']}\n"
+        f"• Аналіз: {summary['analyze_count']} разів, {summary['analyze_avg'] * 1000:.1f} мс, "
+        f"{summary['analyze_rows_avg']:.0f} оголошень у середньому\n"
+        f"• Звіти: {summary['report_count']}, p50 ≤ {summary['report_p50']:g} с, p95 ≤ {summary['report_p95']:g} с\n"
+        f"• Кеш: {summary['cache_hit_ratio'] * 100:.1f}% влучань, обходів зараз: {summary['crawls_in_flight']}\n"
+        f"• Telegram: {summary['send_count']} запитів, p95 ≤ {summary['send_p95']:g} с, "
+        f"429: {summary['retry_after']:g}, у черзі: {summary['queue_depth']}"
+    )
@@ -0,0 +1,72 @@
+"""
+Режим webhook для Telegram бота Graintrade Monitor.
+
+Оновлення приймаються вбудованим aiohttp вебсервером замість long polling:
+Telegram (або локальний тестовий клієнт) надсилає POST з оновленням на
+WEBHOOK_PATH, а обробник одразу відповідає 200 і обробляє оновлення у фоні.
+Запуск і зупинка спільних ресурсів виконуються тими самими хуками
+диспетчера, що й у режимі polling.
+"""
+import asyncio
+import signal
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from app.config_loader import WEBHOOK_PATH, WEBHOOK_SECRET, WEBHOOK_HOST, WEBHOOK_PORT
+
+
+async def _health(request: web.Request) -> web.Response:
+    """Перевірка стану для балансувальника навантаження."""
+    return web.Response(text="ok")
+
+
+def create_app(bot: Bot, dp: Dispatcher, path: str = WEBHOOK_PATH,
+               secret: str = WEBHOOK_SECRET) -> web.Application:
+    """
+    Створює aiohttp застосунок, що приймає оновлення Telegram.
+
+    Args:
+        bot: Екземпляр бота
+        dp: Диспетчер з підключеними роутерами та хуками запуску/зупинки
+        path: Шлях для POST запитів з оновленнями
+        secret: Очікуваний X-Telegram-Bot-Api-Secret-Token (порожній - без перевірки)
+
+    Returns:
+        Застосунок з маршрутами path та /healthz
+    """
+    app = web.Application()
+    SimpleRequestHandler(dispatcher=dp, bot=bot, secret_token=secret or None).register(app, path=path)
+    app.router.add_get("/healthz", _health)
+    # Прив'язує dp.startup / dp.shutdown до запуску та зупинки вебсервера
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def run_webhook(bot: Bot, dp: Dispatcher, host: str = WEBHOOK_HOST, port: int = WEBHOOK_PORT,
+                      reuse_port: bool = False):
+    """
+    Запускає вебсервер і працює до SIGINT / SIGTERM.
+
+    Args:
+        bot: Екземпляр бота
+        dp: Диспетчер
+        host: Адреса, на якій слухає сервер
+        port: Порт сервера
+        reuse_port: Дозволити кільком процесам слухати той самий порт (SO_REUSEPORT)
+    """
+    runner = web.AppRunner(create_app(bot, dp))
+    await runner.setup()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows: зупинка через KeyboardInterrupt
+    try:
+        await web.TCPSite(runner, host, port, reuse_port=reuse_port or None).start()
+        print(f"🌐 Webhook сервер слухає {host}:{port}")
+        await stop.wait()
+    finally:
+        # Зупинка сервера викликає dp.shutdown і звільняє спільні ресурси
+        await runner.cleanup()
@@ -0,0 +1,39 @@
+"""
+Порівняння рушіїв аналітики (python та numpy) залежно від кількості оголошень.
+
+Запуск:
+    python -m benchmarks.bench_analytics [максимальний показник степеня 10, за замовчуванням 5]
+"""
+import sys
+import time
+
+import benchmarks  # noqa: F401  (тестові змінні оточення)
+from app.bot.analytics import analyze_offers
+from app.bot.analytics_numpy import HAS_NUMPY
+from benchmarks.synthetic import make_rows
+
+
+def best_of(func, repeat: int) -> float:
+    """Найкращий час виконання func з repeat спроб, с."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(max_power: int = 5):
+    engines = ["python"] + (["numpy"] if HAS_NUMPY else [])
+    print(f"{'рядків':>10}" + "".join(f"{engine:>12}" for engine in engines))
+    for power in range(2, max_power + 1):
+        rows = make_rows(10 ** power)
+        repeat = 5 if power < 5 else 1
+        timings = [best_of(lambda: analyze_offers(rows, engine=engine), repeat) for engine in engines]
+        if len(engines) == 2:
+            assert analyze_offers(rows, engine="python") == analyze_offers(rows, engine="numpy")
+        print(f"{10 ** power:>10}" + "".join(f"{t * 1000:>10.2f}ms" for t in timings))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,219 @@
+"""
+Набір бенчмарків Graintrade Monitor з записом результатів у JSON.
+
+Вимірює:
+- parse: розбір однієї сторінки лістингу кожним бекендом (lxml / bs4);
+- analytics: analyze_offers від 10² до 10^max_power оголошень кожним рушієм,
+  побудова OfferAggregator та поглинання ним 20 нових оголошень;
+- format: format_section та format_comparison;
+- callback: повний шлях обробки натискання на культуру (обхід локального
+  сайту-заглушки, аналіз, форматування, надсилання) - без кешу та з кешем.
+- summary: зведення /monitor_all по всіх культурах (обхід усіх культур
+  сайту-заглушки в межах бюджету обходів, пакетний аналіз) - без кешу та з кешем,
+  а також огляд ринку /market - з побудовою матриці цін та зі спільною матрицею.
+
+Запуск:
+    python -m benchmarks.bench_suite [--max-power 6] [--only parse,format] [--output шлях.json]
+
+За замовчуванням результати пишуться в benchmarks/results/<коміт>.json,
+тож запуски на різних комітах можна порівнювати.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime
+
+import benchmarks  # noqa: F401  (тестові змінні оточення)
+from app.config_loader import MAX_PAGES
+from app.bot import extractors, handlers, http_client, keyboards, market, offers, outbound, parser, reports
+from app.bot.aggregator import OfferAggregator
+from app.bot.analytics import analyze_offers
+from app.bot.analytics_numpy import HAS_NUMPY
+from app.bot.outbound import SendQueue
+from app.utils.formatters import format_section, format_comparison
+from benchmarks.bench_analytics import best_of
+from benchmarks.stubs import StubExchange
+from benchmarks.synthetic import make_cells, make_rows, page_html
+
+SECTIONS = ("parse", "analytics", "format", "callback", "summary")
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+BENCH_CULTURE = "Бенчмарк"
+
+
+def _record(results: list[dict], name: str, seconds: float, **params):
+    results.append({"name": name, "seconds": round(seconds, 6), **params})
+    print(f"{name:<40}{seconds * 1000:>12.3f} ms")
+
+
+def bench_parse(results: list[dict]):
+    for rows in (20, 200):
+        text = page_html(make_cells(rows, days=7))
+        for backend, extract in extractors.BACKENDS.items():
+            parser.extract_rows = extract
+            _record(results, f"parse/{backend}/{rows}", best_of(lambda: parser._parse_page(text), 20), rows=rows)
+    parser.extract_rows = extractors.extract_rows
+
+
+def bench_analytics(results: list[dict], max_power: int):
+    engines = ["python"] + (["numpy"] if HAS_NUMPY else [])
+    for power in range(2, max_power + 1):
+        rows = make_rows(10 ** power)
+        repeat = 5 if power < 5 else 1
+        for engine in engines:
+            seconds = best_of(lambda: analyze_offers(rows, engine=engine), repeat)
+            _record(results, f"analytics/{engine}/1e{power}", seconds, rows=10 ** power)
+        _record(results, f"analytics/aggregator/1e{power}",
+                best_of(lambda: OfferAggregator().prepend(rows), repeat), rows=10 ** power)
+
+        new_rows = make_rows(20, days=2, seed=power)
+
+        def incremental():
+            aggregator = OfferAggregator()
+            aggregator.prepend(rows)
+            start = time.perf_counter()
+            aggregator.prepend(new_rows)
+            aggregator.result()
+            return time.perf_counter() - start
+        _record(results, f"analytics/incremental/1e{power}+20", min(incremental() for _ in range(repeat)),
+                rows=10 ** power)
+
+
+def bench_format(results: list[dict]):
+    analysis = analyze_offers(make_rows(10_000, days=30))
+    buy, sell = analysis["куплю"], analysis["продам"]
+    _record(results, "format/section", best_of(lambda: format_section("куплю", buy, "Кукурудза"), 200))
+    _record(results, "format/comparison", best_of(lambda: format_comparison(buy, sell, "Кукурудза"), 200))
+
+
+class _FakeMessage:
+    """Повідомлення, що лише рахує редагування та відповіді (без Bot API)."""
+
+    def __init__(self, chat_id: int):
+        self.chat = type("Chat", (), {"id": chat_id})()
+        self.sent = 0
+
+    async def edit_text(self, text: str, **kwargs):
+        self.sent += 1
+
+    async def answer(self, text: str, **kwargs):
+        self.sent += 1
+
+
+class _FakeCallback:
+    def __init__(self, data: str, chat_id: int):
+        self.data = data
+        self.message = _FakeMessage(chat_id)
+        self.from_user = type("User", (), {"id": chat_id})()
+
+    async def answer(self, *args, **kwargs):
+        pass
+
+
+async def _bench_callback(results: list[dict]):
+    exchange = StubExchange([BENCH_CULTURE], rows=MAX_PAGES * 20)
+    await exchange.start()
+    keyboards.CULTURE_URLS[BENCH_CULTURE] = exchange.url_for(BENCH_CULTURE)
+    culture_index = list(keyboards.CULTURE_URLS).index(BENCH_CULTURE)
+    # Ліміти Telegram тут не вимірюються - лише робота самого бота
+    outbound.queue = SendQueue(global_rate=1e9, chat_rate=1e9, chat_burst=1e9)
+    await http_client.start_session()
+    try:
+        for mode, repeat in (("cold", 5), ("warm", 50)):
+            best = float("inf")
+            for i in range(repeat):
+                if mode == "cold":
+                    offers.cache.invalidate(BENCH_CULTURE)
+                callback = _FakeCallback(f"report:{culture_index}", chat_id=i)
+                start = time.perf_counter()
+                await handlers.report_selected(callback)
+                best = min(best, time.perf_counter() - start)
+            _record(results, f"callback/{mode}", best, pages=MAX_PAGES)
+    finally:
+        await outbound.queue.close()
+        await http_client.close_session()
+        await exchange.stop()
+        del keyboards.CULTURE_URLS[BENCH_CULTURE]
+
+
+async def _bench_summary(results: list[dict]):
+    names = list(keyboards.CULTURE_URLS)
+    urls = dict(keyboards.CULTURE_URLS)
+    exchange = StubExchange(names, rows=MAX_PAGES * 20)
+    await exchange.start()
+    keyboards.CULTURE_URLS.update({name: exchange.url_for(name) for name in names})
+    await http_client.start_session()
+    try:
+        for mode, repeat in (("cold", 3), ("warm", 50)):
+            best = float("inf")
+            for _ in range(repeat):
+                if mode == "cold":
+                    offers.cache.invalidate()
+                start = time.perf_counter()
+                await reports.build_summary()
+                best = min(best, time.perf_counter() - start)
+            _record(results, f"summary/{mode}", best, cultures=len(names), pages=MAX_PAGES)
+
+        # Огляд ринку бере оголошення вже прогрітого кешу
+        for mode, repeat in (("cold", 5), ("warm", 50)):
+            best = float("inf")
+            for _ in range(repeat):
+                if mode == "cold":
+                    market._matrix = None
+                start = time.perf_counter()
+                await reports.build_market_overview()
+                best = min(best, time.perf_counter() - start)
+            _record(results, f"market/{mode}", best, cultures=len(names))
+    finally:
+        await http_client.close_session()
+        await exchange.stop()
+        keyboards.CULTURE_URLS.update(urls)
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Бенчмарки Graintrade Monitor")
+    arg_parser.add_argument("--max-power", type=int, default=6, help="Найбільша кількість оголошень 10^N для analytics")
+    arg_parser.add_argument("--only", default=",".join(SECTIONS), help="Розділи через кому: " + ", ".join(SECTIONS))
+    arg_parser.add_argument("--output", help="Файл результатів (за замовчуванням benchmarks/results/<коміт>.json)")
+    args = arg_parser.parse_args()
+
+    sections = [s.strip() for s in args.only.split(",") if s.strip()]
+    results: list[dict] = []
+    if "parse" in sections:
+        bench_parse(results)
+    if "analytics" in sections:
+        bench_analytics(results, args.max_power)
+    if "format" in sections:
+        bench_format(results)
+    if "callback" in sections:
+        asyncio.run(_bench_callback(results))
+    if "summary" in sections:
+        asyncio.run(_bench_summary(results))
+
+    commit = _commit()
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "commit": commit,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": HAS_NUMPY,
+            "results": results,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"Результати збережено: {output}")
+
+
+if __name__ == "__main__":
+    main()
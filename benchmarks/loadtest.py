@@ -0,0 +1,259 @@
+"""
+Навантажувальний тест бота без звернень до graintrade.com.ua та Telegram.
+
+Бот запускається з тими самими хуками та обробниками, що й у продакшені,
+але лістинги віддає StubExchange, а Bot API - StubBotAPI з лімітами.
+Кожен симульований користувач надсилає /monitor і натискає кнопку культури
+з отриманої клавіатури (популярні культури обирають частіше).
+
+Оновлення доходять до бота тим самим шляхом, що й у продакшені:
+- polling: бот отримує їх через getUpdates заглушки Bot API (dp.start_polling);
+- webhook: оновлення надсилаються POST запитами на застосунок create_app().
+
+Звіт: p50/p95/p99 затримки від надсилання оновлення з натисканням до
+першої частини звіту (та від /monitor до клавіатури), кількість обходів
+сайту та викликів Bot API на одне натискання.
+
+Запуск:
+    python -m benchmarks.loadtest [--mode polling|webhook] [--users 1000] [--rate 5] [--latency 0.2]
+
+Сховище оголошень та фоновий прогрів за замовчуванням вимкнені
+(OFFER_STORE_PATH="", PREWARM_ENABLED=0); їх можна увімкнути змінними оточення.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+from collections import Counter
+
+import benchmarks  # noqa: F401  (тестові змінні оточення)
+
+os.environ.setdefault("OFFER_STORE_PATH", "")
+os.environ.setdefault("PREWARM_ENABLED", "0")
+
+from aiohttp.test_utils import TestClient, TestServer  # noqa: E402
+from aiogram import Bot  # noqa: E402
+from aiogram.client.session.aiohttp import AiohttpSession  # noqa: E402
+from aiogram.client.telegram import TelegramAPIServer  # noqa: E402
+from app.config_loader import BOT_TOKEN, MAX_PAGES  # noqa: E402
+from app.bot import keyboards, offers  # noqa: E402
+from app.main import create_dispatcher  # noqa: E402
+from app.webhook import create_app  # noqa: E402
+from benchmarks.stubs import StubBotAPI, StubExchange  # noqa: E402
+
+MODES = ("polling", "webhook")
+_REPORT_METHODS = ("editMessageText", "sendMessage")
+_WEBHOOK_PATH = "/webhook"
+_update_ids = iter(range(1, 10 ** 9))
+
+
+def _user(chat_id: int) -> dict:
+    return {"id": chat_id, "is_bot": False, "first_name": f"User {chat_id}"}
+
+
+def _message_update(chat_id: int, text: str) -> dict:
+    return {"update_id": next(_update_ids), "message": {
+        "message_id": 1, "date": int(time.time()), "chat": {"id": chat_id, "type": "private"},
+        "from": _user(chat_id), "text": text,
+    }}
+
+
+def _callback_update(chat_id: int, message_id: int, data: str) -> dict:
+    return {"update_id": next(_update_ids), "callback_query": {
+        "id": str(next(_update_ids)), "chat_instance": str(chat_id), "from": _user(chat_id), "data": data,
+        "message": {"message_id": message_id, "date": int(time.time()),
+                    "chat": {"id": chat_id, "type": "private"}, "text": "Оберіть культуру:"},
+    }}
+
+
+def _percentile(values: list[float], q: int) -> float:
+    """q-й перцентиль у межах вибірки (метод inclusive не виходить за max)."""
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def _latency_summary(values: list[float]) -> dict:
+    return {
+        "p50": round(_percentile(values, 50), 4),
+        "p95": round(_percentile(values, 95), 4),
+        "p99": round(_percentile(values, 99), 4),
+        "max": round(max(values, default=0.0), 4),
+    }
+
+
+async def run(users: int, rate: float, think_time: float, latency: float, error_rate: float,
+              chat_limit: int, global_limit: int, seed: int = 0, mode: str = "polling",
+              timeout: float = 60.0) -> dict:
+    """
+    Проганяє users симульованих користувачів і повертає зведення результатів.
+
+    Args:
+        users: Кількість користувачів (кожен - один /monitor та одне натискання)
+        rate: Скільки нових користувачів приходить за секунду
+        think_time: Середня пауза між /monitor та натисканням, с
+        latency: Середня затримка сторінки на заглушці біржі, с
+        error_rate: Частка помилок 500 на заглушці біржі
+        chat_limit: Ліміт повідомлень за секунду в чаті на заглушці Bot API
+        global_limit: Глобальний ліміт повідомлень за секунду на заглушці Bot API
+        seed: Початкове значення генератора випадкових чисел
+        mode: Як оновлення доходять до бота: "polling" (getUpdates) або "webhook" (POST на create_app)
+        timeout: Скільки чекати на клавіатуру чи звіт, перш ніж зарахувати збій, с
+    """
+    if mode not in MODES:
+        raise ValueError(f"Невідомий режим: {mode}")
+    rng = random.Random(seed)
+    cultures = list(keyboards.CULTURE_URLS)
+    exchange = StubExchange(cultures, rows=MAX_PAGES * 20, latency=latency, error_rate=error_rate, seed=seed)
+    api = StubBotAPI(chat_limit=chat_limit, global_limit=global_limit)
+    await exchange.start()
+    await api.start()
+    original_urls = dict(keyboards.CULTURE_URLS)
+    keyboards.CULTURE_URLS.update({name: exchange.url_for(name) for name in cultures})
+
+    bot = Bot(BOT_TOKEN, session=AiohttpSession(api=TelegramAPIServer.from_base(api.base_url)))
+    dp = create_dispatcher()
+    client: TestClient | None = None
+    polling: asyncio.Task | None = None
+    if mode == "webhook":
+        # Запуск тестового сервера викликає dp.startup, як і run_webhook()
+        client = TestClient(TestServer(create_app(bot, dp, path=_WEBHOOK_PATH, secret="")))
+        await client.start_server()
+    else:
+        polling = asyncio.create_task(dp.start_polling(bot, handle_signals=False, close_bot_session=False,
+                                                       polling_timeout=1))
+        await asyncio.wait([polling, asyncio.create_task(api.polling.wait())],
+                           return_when=asyncio.FIRST_COMPLETED)
+        if polling.done():
+            await polling  # помилка запуску
+
+    latencies: list[float] = []
+    monitor_latencies: list[float] = []
+    clicks: dict[int, float] = {}  # час натискання на культуру в кожному чаті
+    failures = Counter()
+
+    async def deliver(update: dict):
+        if client is None:
+            api.push_update(update)
+            return
+        response = await client.post(_WEBHOOK_PATH, json=update)
+        if response.status != 200:
+            failures[f"webhook_{response.status}"] += 1
+
+    async def simulate(chat_id: int):
+        sent = time.monotonic()
+        await deliver(_message_update(chat_id, "/monitor"))
+        if not await api.wait_for(chat_id, lambda: chat_id in api.keyboards, timeout):
+            failures["no_keyboard"] += 1
+            return
+        monitor_latencies.append(time.monotonic() - sent)
+        message_id, buttons = api.keyboards[chat_id]
+        buttons = [b for b in buttons if b.startswith("report:")]
+        # Розподіл Ципфа: перші культури списку найпопулярніші
+        data = rng.choices(buttons, weights=[1 / (i + 1) for i in range(len(buttons))])[0]
+        await asyncio.sleep(rng.expovariate(1 / think_time) if think_time else 0)
+
+        def reports():
+            return [c for c in api.calls_for(chat_id, clicked)
+                    if c.method in _REPORT_METHODS and c.status == 200 and not c.text.startswith("⏳")]
+
+        clicked = clicks[chat_id] = time.monotonic()
+        await deliver(_callback_update(chat_id, message_id, data))
+        if await api.wait_for(chat_id, lambda: bool(reports()), timeout):
+            latencies.append(reports()[0].at - clicked)
+        else:
+            failures["no_report"] += 1
+
+    started = time.monotonic()
+    tasks = []
+    try:
+        for i in range(users):
+            tasks.append(asyncio.create_task(simulate(100_000 + i)))
+            await asyncio.sleep(rng.expovariate(rate))
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        failures.update(type(o).__name__ for o in outcomes if isinstance(o, Exception))
+    finally:
+        elapsed = time.monotonic() - started
+        if client is not None:
+            await client.close()  # викликає dp.shutdown
+        else:
+            await dp.stop_polling()
+            await polling
+        await bot.session.close()
+        await api.stop()
+        await exchange.stop()
+        keyboards.CULTURE_URLS.update(original_urls)
+
+    methods = Counter(c.method for c in api.calls if c.status == 200)
+    # Виклики у відповідь на натискання: виклики в чаті після нього (без клавіатури /monitor)
+    # та відповіді на callback, які не прив'язані до чату
+    click_calls = sum(1 for chat_id, clicked in clicks.items()
+                      for c in api.calls_for(chat_id, clicked) if c.status == 200)
+    click_calls += methods["answerCallbackQuery"]
+    return {
+        "mode": mode,
+        "users": users,
+        "elapsed": round(elapsed, 2),
+        "latency": _latency_summary(latencies),
+        "monitor_latency": _latency_summary(monitor_latencies),
+        "failures": dict(failures),
+        "scrape": {
+            "crawls": sum(exchange.crawls.values()),
+            "pages": sum(exchange.hits.values()),
+            "errors": exchange.errors,
+            "crawls_by_culture": dict(exchange.crawls.most_common()),
+        },
+        "telegram": {
+            "calls": sum(methods.values()),
+            "calls_per_click": round(click_calls / len(clicks), 2) if clicks else 0.0,
+            "rejected_429": sum(1 for c in api.calls if c.status == 429),
+            "by_method": dict(methods.most_common()),
+        },
+        "cache": offers.cache.stats(),
+    }
+
+
+def _print_report(result: dict):
+    print(f"Користувачів: {result['users']} за {result['elapsed']} с (режим {result['mode']})")
+    for title, key in (("/monitor -> клавіатура", "monitor_latency"), ("Натискання -> перший звіт", "latency")):
+        latency = result[key]
+        print(f"{title}: p50 {latency['p50'] * 1000:.0f} ms, p95 {latency['p95'] * 1000:.0f} ms, "
+              f"p99 {latency['p99'] * 1000:.0f} ms, max {latency['max'] * 1000:.0f} ms")
+    print(f"Обходів сайту: {result['scrape']['crawls']} ({result['scrape']['pages']} сторінок, "
+          f"помилок: {result['scrape']['errors']})")
+    print(f"Викликів Bot API: {result['telegram']['calls']} ({result['telegram']['calls_per_click']} на натискання, "
+          f"відхилено з 429: {result['telegram']['rejected_429']})")
+    print(f"Частка влучань у кеш: {result['cache']['hit_ratio'] * 100:.1f}%")
+    if result["failures"]:
+        print(f"Збої: {result['failures']}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Навантажувальний тест Graintrade Monitor")
+    arg_parser.add_argument("--mode", choices=MODES, default="polling",
+                            help="Як бот отримує оновлення: getUpdates або POST на webhook")
+    arg_parser.add_argument("--users", type=int, default=1000, help="Кількість симульованих користувачів")
+    arg_parser.add_argument("--rate", type=float, default=5, help="Нових користувачів за секунду")
+    arg_parser.add_argument("--think-time", type=float, default=1.0, help="Пауза між /monitor та натисканням, с")
+    arg_parser.add_argument("--latency", type=float, default=0.2, help="Затримка сторінки біржі, с")
+    arg_parser.add_argument("--error-rate", type=float, default=0.0, help="Частка помилок 500 на біржі")
+    arg_parser.add_argument("--chat-limit", type=int, default=3, help="Ліміт повідомлень/с у чаті (Bot API)")
+    arg_parser.add_argument("--global-limit", type=int, default=30, help="Глобальний ліміт повідомлень/с (Bot API)")
+    arg_parser.add_argument("--timeout", type=float, default=60.0, help="Очікування клавіатури чи звіту, с")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--output", help="Записати зведення у JSON файл")
+    args = arg_parser.parse_args()
+
+    result = asyncio.run(run(args.users, args.rate, args.think_time, args.latency, args.error_rate,
+                             args.chat_limit, args.global_limit, args.seed, args.mode, args.timeout))
+    _print_report(result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Локальні заглушки зовнішніх сервісів для бенчмарків та навантажувального тесту.
+
+- StubExchange: сайт-біржа, що віддає сторінки лістингу для кожної культури
+  із заданою затримкою та часткою помилок;
+- StubBotAPI: Bot API Telegram, що записує всі виклики та повертає 429
+  (retry_after) при перевищенні лімітів, як справжній сервер; для режиму
+  polling віддає додані тестом оновлення через getUpdates.
+"""
+import asyncio
+import itertools
+import json
+import math
+import random
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from aiohttp import web
+
+import benchmarks  # noqa: F401  (тестові змінні оточення)
+from benchmarks.synthetic import make_pages, page_html
+
+
+async def _start(app: web.Application) -> tuple[web.AppRunner, str]:
+    """Запускає застосунок на вільному порту та повертає (runner, базова адреса)."""
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    host, port = runner.addresses[0][:2]
+    return runner, f"http://{host}:{port}"
+
+
+class StubExchange:
+    """
+    Заглушка сайту-біржі.
+
+    Кожна культура отримує власний лістинг з rows оголошень; сторінка
+    за межами лістингу не має tbody, як і на справжньому сайті.
+
+    Args:
+        cultures: Назви культур
+        rows: Кількість оголошень у лістингу кожної культури
+        latency: Середня затримка відповіді, с (рівномірно від 0.5x до 1.5x)
+        error_rate: Частка відповідей з кодом 500
+        days: Розкид дат оголошень, днів
+        seed: Початкове значення генератора випадкових чисел
+    """
+
+    def __init__(self, cultures, rows: int = 200, latency: float = 0.0, error_rate: float = 0.0,
+                 days: int = 14, seed: int = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._paths = {name: f"/birzha/{i}" for i, name in enumerate(cultures)}
+        self._pages = {path: make_pages(rows, days=days, seed=seed + i)
+                       for i, path in enumerate(self._paths.values())}
+        self.hits: Counter[str] = Counter()  # завантажені сторінки за культурою
+        self.crawls: Counter[str] = Counter()  # обходи (запити першої сторінки) за культурою
+        self.errors = 0
+        self.base_url = ""
+        self._runner: web.AppRunner | None = None
+        self._names = {path: name for name, path in self._paths.items()}
+
+    def url_for(self, culture: str) -> str:
+        """URL лістингу культури на заглушці."""
+        return self.base_url + self._paths[culture]
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/birzha/{index}", self._listing)
+        self._runner, self.base_url = await _start(app)
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _listing(self, request: web.Request) -> web.Response:
+        name = self._names.get(request.path)
+        if name is None:
+            raise web.HTTPNotFound()
+        page = int(request.query.get("Ad_page", "1"))
+        self.hits[name] += 1
+        if page == 1:
+            self.crawls[name] += 1
+
+        if self.latency:
+            await asyncio.sleep(self.latency * self._rng.uniform(0.5, 1.5))
+        if self._rng.random() < self.error_rate:
+            self.errors += 1
+            raise web.HTTPInternalServerError()
+
+        pages = self._pages[request.path]
+        text = pages[page - 1] if page <= len(pages) else page_html([])
+        return web.Response(text=text, content_type="text/html")
+
+
+@dataclass
+class ApiCall:
+    """Виклик методу Bot API, записаний заглушкою."""
+    at: float
+    method: str
+    chat_id: int | None
+    text: str
+    status: int
+
+
+class StubBotAPI:
+    """
+    Заглушка Bot API з лімітами Telegram.
+
+    Ліміти рахуються ковзним вікном в одну секунду; answerCallbackQuery
+    під ліміти не підпадає. Надісланий текст та клавіатура зберігаються,
+    щоб симульований користувач міг "натиснути" кнопку. Оновлення, додані
+    push_update(), віддаються long polling запитам getUpdates (ці запити,
+    як і getMe, у calls не записуються).
+
+    Args:
+        chat_limit: Максимум повідомлень за секунду в одному чаті
+        global_limit: Максимум повідомлень за секунду для всього бота
+    """
+
+    _UNLIMITED = {"answerCallbackQuery", "deleteWebhook", "setWebhook"}
+
+    def __init__(self, chat_limit: int = 3, global_limit: int = 30):
+        self.chat_limit = chat_limit
+        self.global_limit = global_limit
+        self.calls: list[ApiCall] = []
+        self._calls_by_chat: dict[int, list[ApiCall]] = {}
+        self._chat_events: dict[int, asyncio.Event] = {}  # спрацьовує на кожен виклик у чаті
+        self._updates: list[dict] = []  # ще не підтверджені оновлення для getUpdates
+        self._updates_ready = asyncio.Event()
+        self.polling = asyncio.Event()  # спрацьовує на перший getUpdates
+        self.keyboards: dict[int, tuple[int, list[str]]] = {}  # остання клавіатура чату: (message_id, callback_data)
+        self._chat_window: dict[int, deque[float]] = {}
+        self._global_window: deque[float] = deque()
+        self._message_ids = itertools.count(1000)
+        self.base_url = ""
+        self._runner: web.AppRunner | None = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self._call)
+        self._runner, self.base_url = await _start(app)
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def calls_for(self, chat_id: int, since: float = 0.0) -> list[ApiCall]:
+        return [c for c in self._calls_by_chat.get(chat_id, ()) if c.at >= since]
+
+    async def wait_for(self, chat_id: int, predicate, timeout: float) -> bool:
+        """
+        Чекає, поки після чергового виклику в чаті predicate() стане істинним.
+
+        Returns:
+            False, якщо за timeout секунд цього не сталося
+        """
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            event = self._chat_events.setdefault(chat_id, asyncio.Event())
+            try:
+                await asyncio.wait_for(event.wait(), remaining)
+            except asyncio.TimeoutError:
+                return predicate()
+        return True
+
+    def push_update(self, update: dict):
+        """Додає оновлення, яке бот отримає наступним getUpdates."""
+        self._updates.append(update)
+        self._updates_ready.set()
+
+    def _record(self, call: ApiCall):
+        self.calls.append(call)
+        if call.chat_id is not None:
+            self._calls_by_chat.setdefault(call.chat_id, []).append(call)
+            event = self._chat_events.pop(call.chat_id, None)
+            if event is not None:
+                event.set()
+
+    async def _get_updates(self, params: dict) -> web.Response:
+        """Long polling: віддає оновлення з update_id >= offset або чекає до timeout секунд."""
+        self.polling.set()
+        offset = int(params.get("offset") or 0)
+        self._updates = [u for u in self._updates if u["update_id"] >= offset]
+        if not self._updates:
+            self._updates_ready.clear()
+            try:
+                await asyncio.wait_for(self._updates_ready.wait(), float(params.get("timeout") or 0))
+            except asyncio.TimeoutError:
+                pass
+        return web.json_response({"ok": True, "result": self._updates[:100]})
+
+    def _retry_after(self, window: deque[float], limit: int, now: float) -> int:
+        """Секунди до звільнення місця у вікні або 0, якщо ліміт не перевищено."""
+        while window and now - window[0] >= 1.0:
+            window.popleft()
+        if len(window) < limit:
+            return 0
+        return max(1, math.ceil(1.0 - (now - window[0])))
+
+    async def _call(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = dict(await request.post())
+        if method == "getUpdates":
+            return await self._get_updates(params)
+        if method == "getMe":
+            return web.json_response({"ok": True, "result": {
+                "id": 1, "is_bot": True, "first_name": "Graintrade Monitor", "username": "stub_bot",
+            }})
+        chat_id = int(params["chat_id"]) if "chat_id" in params else None
+        now = time.monotonic()
+
+        if method not in self._UNLIMITED and chat_id is not None:
+            chat_window = self._chat_window.setdefault(chat_id, deque())
+            retry_after = max(self._retry_after(chat_window, self.chat_limit, now),
+                              self._retry_after(self._global_window, self.global_limit, now))
+            if retry_after:
+                self._record(ApiCall(now, method, chat_id, "", 429))
+                return web.json_response({
+                    "ok": False, "error_code": 429,
+                    "description": f"Too Many Requests: retry after {retry_after}",
+                    "parameters": {"retry_after": retry_after},
+                })
+            chat_window.append(now)
+            self._global_window.append(now)
+
+        text = params.get("text", "")
+        if "reply_markup" in params:
+            markup = json.loads(params["reply_markup"])
+            data = [b["callback_data"] for row in markup.get("inline_keyboard", []) for b in row
+                    if "callback_data" in b]
+            if any(len(d.encode()) > 64 for d in data):
+                self._record(ApiCall(now, method, chat_id, text, 400))
+                return web.json_response({"ok": False, "error_code": 400,
+                                          "description": "Bad Request: BUTTON_DATA_INVALID"})
+        else:
+            data = []
+
+        self._record(ApiCall(now, method, chat_id, text, 200))
+        if method in ("answerCallbackQuery", "deleteWebhook", "setWebhook"):
+            return web.json_response({"ok": True, "result": True})
+
+        message_id = int(params.get("message_id") or next(self._message_ids))
+        if data:
+            self.keyboards[chat_id] = (message_id, data)
+        return web.json_response({"ok": True, "result": {
+            "message_id": message_id, "date": int(time.time()),
+            "chat": {"id": chat_id or 0, "type": "private"}, "text": text,
+        }})
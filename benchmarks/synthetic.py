@@ -0,0 +1,99 @@
+"""
+Генератор синтетичних даних Graintrade для бенчмарків.
+
+Сторінки лістингу мають ту саму розмітку, що й сайт (tbody/tr/td):
+td[0] - дата, td[1] - культура, td[2] - span з типом оголошення,
+td[3] - обсяг, td[4] - регіон, td[5] - ціна з валютою, td[6] - контакти.
+Оголошення на сторінках упорядковані від нових до старих.
+"""
+import html
+import random
+from datetime import date, timedelta
+
+import benchmarks  # noqa: F401  (тестові змінні оточення)
+from app.config_loader import USD_RATE
+from app.bot.records import OfferRow, OfferType
+
+REGIONS = ("Київська", "Одеська", "Полтавська", "Вінницька", "Черкаська", "Харківська", "Миколаївська")
+PRODUCTS = ("Кукурудза", "Пшениця 2 клас", "Соняшник", "Ячмінь", "Соя")
+CURRENCIES = ("грн", "USD")
+
+
+def make_cells(count: int, days: int = 30, currencies: tuple[str, ...] = CURRENCIES,
+               start: date | None = None, seed: int = 0) -> list[tuple[str, ...]]:
+    """
+    Тексти комірок синтетичних оголошень у порядку лістингу.
+
+    Args:
+        count: Кількість оголошень
+        days: На скільки днів назад від start розподілені дати
+        currencies: Валюти цін, що чергуються випадково ("грн" та/або "USD")
+        start: Дата найновішого оголошення (за замовчуванням - сьогодні)
+        seed: Початкове значення генератора випадкових чисел
+
+    Returns:
+        Список кортежів з текстами семи комірок рядка
+    """
+    rng = random.Random(seed)
+    start = start or date.today()
+    offsets = sorted(rng.randrange(days) for _ in range(count))
+    rows = []
+    for offset in offsets:
+        day = start - timedelta(days=offset)
+        usd_price = rng.randint(150, 260)
+        currency = rng.choice(currencies)
+        price = f"{usd_price} USD" if currency == "USD" else f"{round(usd_price * USD_RATE)} грн"
+        rows.append((
+            f"{day:%d.%m.%Y} {rng.randrange(8, 20):02d}:{rng.randrange(60):02d}",
+            rng.choice(PRODUCTS),
+            rng.choice(("Куплю", "Продам")),
+            f"{rng.randrange(20, 3000)} т",
+            rng.choice(REGIONS),
+            price,
+            f"+38050{rng.randrange(10 ** 7):07d}",
+        ))
+    return rows
+
+
+def page_html(cells: list[tuple[str, ...]]) -> str:
+    """HTML сторінки лістингу з рядками cells (порожній список - сторінка без tbody)."""
+    if not cells:
+        return "<html><body><p>Оголошень не знайдено</p></body></html>"
+
+    trs = []
+    for row in cells:
+        tds = [html.escape(text) for text in row]
+        tds[2] = f'<span class="badge">{tds[2]}</span>'
+        trs.append("<tr>" + "".join(f"<td>{td}</td>" for td in tds) + "</tr>")
+    return (
+        "<html><head><title>Біржа</title></head><body><table class=\"table\">"
+        "<thead><tr><th>Дата</th><th>Культура</th><th>Тип</th><th>Обсяг</th>"
+        "<th>Регіон</th><th>Ціна</th><th>Контакти</th></tr></thead>"
+        "<tbody>" + "".join(trs) + "</tbody></table></body></html>"
+    )
+
+
+def make_pages(count: int, page_size: int = 20, **kwargs) -> list[str]:
+    """
+    Сторінки лістингу з count оголошеннями по page_size на сторінку.
+
+    Додаткові аргументи передаються в make_cells.
+    """
+    cells = make_cells(count, **kwargs)
+    return [page_html(cells[i:i + page_size]) for i in range(0, len(cells), page_size)]
+
+
+def make_rows(count: int, days: int = 365, seed: int = 0) -> list[OfferRow]:
+    """
+    Розібрані оголошення (день, тип, ціна в USD) для бенчмарків аналітики.
+
+    Записи містять лише поля, потрібні аналітиці (без сирих комірок),
+    тому навіть мільйон оголошень займає помірний обсяг пам'яті.
+    """
+    rng = random.Random(seed)
+    today = date.today().toordinal()
+    types = tuple(OfferType)
+    return [
+        OfferRow(today - rng.randrange(days), types[rng.getrandbits(1)], rng.randint(150, 260))
+        for _ in range(count)
+    ]
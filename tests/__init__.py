@@ -0,0 +1,12 @@
+"""
+Тести Graintrade Monitor.
+
+Запуск: python -m pytest tests
+Обов'язкові змінні оточення бота отримують тестові значення, якщо не задані.
+"""
+import os
+
+os.environ.setdefault("BOT_TOKEN", "0:test")
+os.environ.setdefault("USD_RATE", "42")
+os.environ.setdefault("ADMIN_USER_ID", "0")
+os.environ.setdefault("MAX_PAGES", "10")
@@ -0,0 +1,82 @@
+"""
+Інкрементальний агрегатор: result() має збігатися з analyze_offers
+для тих самих оголошень - і після одного повного завантаження, і після
+кількох порцій нових оголошень, доданих через prepend().
+"""
+from datetime import date
+
+import pytest
+
+import tests  # noqa: F401  (тестові змінні оточення)
+from app.bot.aggregator import OfferAggregator
+from app.bot.analytics import analyze_offers
+from app.bot.records import OfferRow, OfferType
+from benchmarks.synthetic import make_rows
+
+TODAY = date.today().toordinal()
+YEAR = date.today().year
+
+
+def _listing(count: int, days: int, seed: int) -> list[OfferRow]:
+    """Оголошення в порядку лістингу: від нових до старих."""
+    return sorted(make_rows(count, days=days, seed=seed), key=lambda r: -r.day)
+
+
+def _aggregate(chunks: list[list[OfferRow]], year_filter: int | None = None) -> dict:
+    """Результат агрегатора, що отримав chunks по черзі (кожна наступна порція - новіша)."""
+    aggregator = OfferAggregator(year_filter)
+    for chunk in chunks:
+        aggregator.prepend(chunk)
+    return aggregator.result()
+
+
+def _split(rows: list[OfferRow], sizes: list[int]) -> list[list[OfferRow]]:
+    """Ділить лістинг на порції: спершу найстаріша, останньою - перші sizes[0] оголошень."""
+    chunks = []
+    start = 0
+    for size in sizes:
+        chunks.append(rows[start:start + size])
+        start += size
+    chunks.append(rows[start:])
+    return chunks[::-1]
+
+
+@pytest.mark.parametrize("year_filter", [None, YEAR])
+def test_single_full_ingest(year_filter):
+    rows = _listing(5000, days=500, seed=1)
+    assert repr(_aggregate([rows], year_filter)) == repr(analyze_offers(rows, year_filter, engine="python"))
+
+
+@pytest.mark.parametrize("sizes", [[1], [3, 40, 7], [200, 200, 200, 200]])
+def test_prepended_chunks(sizes):
+    rows = _listing(1500, days=60, seed=len(sizes))
+    assert repr(_aggregate(_split(rows, sizes))) == repr(analyze_offers(rows, engine="python"))
+
+
+def test_chunks_in_arbitrary_order():
+    # Повний обхід після пропуску може вставити старі оголошення в будь-яке місце лістингу
+    rows = make_rows(800, days=30, seed=7)
+    assert repr(_aggregate(_split(rows, [50, 10, 300]))) == repr(analyze_offers(rows, engine="python"))
+
+
+@pytest.mark.parametrize("count", [1, 2, 5, 6])
+def test_median_and_stdev_with_even_and_odd_counts(count):
+    rows = [OfferRow(TODAY - i % 9, kind, 150 + (i * 37) % 101) for i in range(count) for kind in OfferType]
+    expected = analyze_offers(rows, engine="python")
+    for chunks in ([rows], [rows[count:], rows[:count]], [[r] for r in reversed(rows)]):
+        result = _aggregate(chunks)
+        for offer_type in expected:
+            assert result[offer_type]["median_price"] == expected[offer_type]["median_price"]
+            assert result[offer_type]["std_dev"] == expected[offer_type]["std_dev"]
+        assert repr(result) == repr(expected)
+
+
+def test_window_edges_and_empty_types():
+    rows = [OfferRow(TODAY - offset, OfferType.BUY, 190 + offset) for offset in (0, 0, 3, 4, 7, 8)]
+    result = _aggregate(_split(rows, [2, 2]))
+    assert result["продам"] is None
+    assert repr(result) == repr(analyze_offers(rows, engine="python"))
+
+
+def test_empty():
+    assert _aggregate([]) == analyze_offers([], engine="python")
@@ -0,0 +1,79 @@
+"""
+Рушії аналітики: numpy має давати той самий словник, що й python.
+
+Порівнюється repr() результатів, а не лише ==, щоб помітити різницю
+в типах значень (int та float, числа NumPy) чи порядку ключів.
+"""
+from datetime import date
+
+import pytest
+
+import tests  # noqa: F401  (тестові змінні оточення)
+from app.bot.analytics import analyze_offers
+from app.bot.analytics_numpy import HAS_NUMPY
+from app.bot.parser import _parse_page
+from app.bot.records import OfferRow, OfferType
+from benchmarks.synthetic import make_cells, make_rows, page_html
+
+pytestmark = pytest.mark.skipif(not HAS_NUMPY, reason="numpy не встановлено")
+
+TODAY = date.today().toordinal()
+YEAR = date.today().year
+
+
+def _assert_same(rows: list[OfferRow], year_filter: int | None = None):
+    python = analyze_offers(rows, year_filter, engine="python")
+    numpy = analyze_offers(rows, year_filter, engine="numpy")
+    assert repr(numpy) == repr(python)
+
+
+def _window_edges() -> list[OfferRow]:
+    """Оголошення рівно на межах вікон "сьогодні / 3 дні / 7 днів" та поруч з ними."""
+    rows = []
+    for i, offset in enumerate((0, 0, 1, 3, 4, 7, 8, 30)):
+        for kind in OfferType:
+            rows.append(OfferRow(TODAY - offset, kind, 180 + 7 * i + kind))
+    return rows
+
+
+def test_empty_input():
+    _assert_same([])
+    _assert_same([], YEAR)
+
+
+def test_single_type_only():
+    rows = [r for r in make_rows(500, days=60, seed=1) if r.kind == OfferType.SELL]
+    _assert_same(rows)
+    assert analyze_offers(rows, engine="numpy")["куплю"] is None
+
+
+@pytest.mark.parametrize("year_filter", [None, YEAR, YEAR - 1, 1990])
+def test_year_filter(year_filter):
+    _assert_same(make_rows(3000, days=800, seed=2), year_filter)
+
+
+@pytest.mark.parametrize("year_filter", [None, YEAR])
+def test_window_edges(year_filter):
+    _assert_same(_window_edges(), year_filter)
+
+
+def test_single_offer_per_type():
+    _assert_same([OfferRow(TODAY - 3, OfferType.BUY, 200), OfferRow(TODAY - 7, OfferType.SELL, 210)])
+
+
+@pytest.mark.parametrize("count", [10, 11])
+def test_even_and_odd_counts(count):
+    _assert_same(make_rows(count, days=10, seed=count))
+
+
+def test_prices_in_hryvnias():
+    # Оголошення розбираються парсером з комірок "... грн", як на сайті
+    cells = make_cells(200, days=14, currencies=("грн",), seed=3)
+    rows = _parse_page(page_html(cells))
+    assert len(rows) == 200
+    _assert_same(rows)
+
+
+def test_mixed_currencies_and_large_history():
+    rows = _parse_page(page_html(make_cells(300, days=20, seed=4))) + make_rows(20_000, days=400, seed=5)
+    _assert_same(rows)
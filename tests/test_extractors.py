@@ -0,0 +1,45 @@
+"""
+Бекенди вилучення рядків на збережених сторінках лістингу.
+
+Сторінки у tests/fixtures повторюють розмітку сайту: посилання та span
+у комірках, script і style всередині комірок, коментарі, рекламний рядок
+з colspan та сторінку за межами лістингу без tbody.
+"""
+from pathlib import Path
+
+import pytest
+
+import tests  # noqa: F401  (тестові змінні оточення)
+from app.bot.extractors import BACKENDS, extract_rows_bs4
+
+FIXTURES = Path(__file__).parent / "fixtures"
+PAGES = sorted(path.name for path in FIXTURES.glob("listing_*.html"))
+
+
+def _page(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("page", PAGES)
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+def test_backends_return_identical_rows(backend, page):
+    text = _page(page)
+    assert BACKENDS[backend](text) == extract_rows_bs4(text)
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+def test_script_and_style_text_is_skipped(backend):
+    rows = BACKENDS[backend](_page("listing_page_1.html"))
+
+    # Рекламний рядок з однією коміркою пропускається
+    assert len(rows) == 5
+    cells, offer_type = rows[0]
+    assert cells[6] == "+38050***"
+    assert rows[1][0][6] == "+380671112233"
+    assert rows[3][0][2] == "Продам"
+    assert offer_type == "Куплю"
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+def test_page_past_listing_end_has_no_rows(backend):
+    assert BACKENDS[backend](_page("listing_end.html")) is None
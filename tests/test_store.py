@@ -0,0 +1,208 @@
+"""
+Сховище оголошень та інкрементальний обхід на тимчасовому файлі SQLite.
+
+Сайт не викликається: сторінки лістингу віддають заглушки _fetch_page
+(для parser) та iter_pages (для offers).
+"""
+import asyncio
+from datetime import date
+
+import pytest
+
+import tests  # noqa: F401  (тестові змінні оточення)
+from app.bot import offers, parser
+from app.bot.cache import OfferCache
+from app.bot.keyboards import CULTURE_URLS
+from app.bot.records import OfferRow, OfferType
+from app.bot.store import OfferStore
+
+CULTURE = next(iter(CULTURE_URLS))
+TODAY = date.today().toordinal()
+
+
+def _row(key: str, age: int = 0) -> OfferRow:
+    day = TODAY - age
+    text = date.fromordinal(day).strftime("%d.%m.%Y 10:00")
+    return OfferRow(day, OfferType.BUY, 200 + age, key, text, (text, CULTURE, "Куплю", "10 т", "Київська", "200 USD", ""))
+
+
+def _keys(rows: list[OfferRow]) -> list[str]:
+    return [r.key for r in rows]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = OfferStore(str(tmp_path / "offers.db"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def shared(monkeypatch, store):
+    """Сховище, підключене до offers, з порожнім кешем процесу."""
+    monkeypatch.setattr(offers, "store", store)
+    monkeypatch.setattr(offers, "cache", OfferCache())
+    monkeypatch.setattr(offers, "_epochs", {})
+    monkeypatch.setattr(offers, "_epochs_checked", 0.0)
+    return store
+
+
+def test_ingest_keeps_listing_order(store):
+    async def scenario():
+        await store.ingest(CULTURE, [_row("b", 1), _row("c", 2)])
+        await store.ingest(CULTURE, [_row("a", 0)])
+        return await store.load(CULTURE)
+
+    assert _keys(asyncio.run(scenario())) == ["a", "b", "c"]
+
+
+def test_known_row_on_later_page_is_not_duplicated(store):
+    async def scenario():
+        await store.ingest(CULTURE, [_row("c", 2), _row("d", 3)])
+        added = await store.ingest(CULTURE, [_row("a", 0), _row("b", 1), _row("c", 2)])
+        return added, await store.load(CULTURE), await store.known_keys(CULTURE)
+
+    added, rows, known = asyncio.run(scenario())
+    assert added == 2
+    assert _keys(rows) == ["a", "b", "c", "d"]
+    assert known == {"a", "b", "c", "d"}
+
+
+def test_reorder_moves_known_rows_into_place(store):
+    async def scenario():
+        # Після пропуску сторінки 2 у сховищі лише a та c
+        await store.ingest(CULTURE, [_row("a", 0), _row("c", 2)])
+        await store.ingest(CULTURE, [_row("a", 0), _row("b", 1), _row("c", 2), _row("d", 3)], reorder=True)
+        return await store.load(CULTURE)
+
+    assert _keys(asyncio.run(scenario())) == ["a", "b", "c", "d"]
+
+
+def test_lock_expires_after_owner_dies(store, tmp_path):
+    other = OfferStore(str(tmp_path / "offers.db"))
+
+    async def scenario():
+        # Власник "завершився аварійно", не звільнивши блокування
+        assert await asyncio.to_thread(store._try_lock, "crawl:x", "dead", 0.3)
+        assert not await asyncio.to_thread(other._try_lock, "crawl:x", "alive", 5)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        async with other.lock("crawl:x"):
+            waited = loop.time() - started
+            assert not await asyncio.to_thread(store._try_lock, "crawl:x", "late", 5)
+        assert await asyncio.to_thread(store._try_lock, "crawl:x", "next", 5)
+        return waited
+
+    try:
+        waited = asyncio.run(asyncio.wait_for(scenario(), 5))
+    finally:
+        other.close()
+    assert 0.1 < waited < 2
+
+
+def test_parser_stops_at_first_page_with_known_row(monkeypatch):
+    pages = {1: [_row("a", 0), _row("b", 0)], 2: [_row("c", 1), _row("d", 1)], 3: [_row("e", 2)], 4: None}
+    requested = []
+
+    async def fake_fetch_page(session, url, page):
+        requested.append(page)
+        return pages.get(page)
+
+    monkeypatch.setattr(parser, "_fetch_page", fake_fetch_page)
+    stats = parser.CrawlStats()
+    rows = asyncio.run(parser.fetch_table("http://stub/listing", known_keys={"d", "e"}, stats=stats))
+
+    # Сторінка з відомим оголошенням ще віддається (сховище пропустить дублікат), далі обхід не йде
+    assert _keys(rows) == ["a", "b", "c", "d"]
+    assert stats.pages == 2
+    assert not stats.truncated
+    assert max(requested) <= 2 + parser.CRAWL_CONCURRENCY
+
+
+def _fake_iter_pages(listing: list[list[OfferRow]], calls: list, failed: list[int] = ()):
+    async def fake(url, known_keys=None, date_from=None, progress=None, stats=None):
+        calls.append(known_keys)
+        for page, rows in enumerate(listing, start=1):
+            if page in failed:
+                stats.failed.append(page)
+                continue
+            yield rows
+            if known_keys and any(r.key in known_keys for r in rows):
+                stats.truncated = False
+                return
+        stats.truncated = False
+    return fake
+
+
+def test_incremental_crawl_adds_only_new_rows(monkeypatch, shared):
+    calls = []
+
+    async def scenario():
+        monkeypatch.setattr(offers, "iter_pages", _fake_iter_pages([[_row("c", 1), _row("d", 2)]], calls))
+        first = await offers._crawl(CULTURE)
+        fetched = await shared.fetched_at(CULTURE)
+
+        await shared.mark_fetched(CULTURE, 0)
+        monkeypatch.setattr(offers, "iter_pages",
+                            _fake_iter_pages([[_row("a", 0), _row("b", 0)], [_row("c", 1), _row("d", 2)]], calls))
+        second = await offers._crawl(CULTURE)
+        return first, fetched, second
+
+    first, fetched, second = asyncio.run(scenario())
+    assert _keys(first) == ["c", "d"]
+    assert fetched > 0
+    assert _keys(second) == ["a", "b", "c", "d"]
+    assert not calls[0]  # перший обхід - повний
+    assert calls[1] == {"c", "d"}
+
+
+def test_gapped_crawl_is_repaired_by_full_crawl(monkeypatch, shared):
+    listing = [[_row("a", 0)], [_row("b", 1)], [_row("c", 2)]]
+    calls = []
+
+    async def scenario():
+        monkeypatch.setattr(offers, "iter_pages", _fake_iter_pages(listing, calls, failed=[2]))
+        gapped = await offers._crawl(CULTURE)
+        state = await shared.fetched_at(CULTURE), await shared.needs_full_crawl(CULTURE)
+
+        monkeypatch.setattr(offers, "iter_pages", _fake_iter_pages(listing, calls))
+        repaired = await offers._crawl(CULTURE)
+        return gapped, state, repaired, await shared.needs_full_crawl(CULTURE)
+
+    gapped, (fetched, needs_full), repaired, still_needed = asyncio.run(scenario())
+    assert _keys(gapped) == ["a", "c"]
+    assert fetched == 0 and needs_full
+    assert calls[1] is None  # після пропуску обхід повний, без відомих ключів
+    assert _keys(repaired) == ["a", "b", "c"]
+    assert not still_needed
+
+
+def test_cache_clear_in_other_process_drops_snapshot(shared, tmp_path):
+    other = OfferStore(str(tmp_path / "offers.db"))
+
+    async def scenario():
+        offers.cache.put(CULTURE, offers.Snapshot([], 1))
+        await offers.sync_invalidations()
+        kept = offers.cache.peek(CULTURE) is not None
+
+        epochs = await other.invalidate([CULTURE])  # /cache_clear в іншому процесі
+        offers._epochs_checked = 0.0
+        await offers.sync_invalidations()
+        dropped = offers.cache.peek(CULTURE) is None
+
+        # Власне скидання не скидає знімок, завантажений уже після нього
+        await offers.invalidate(CULTURE)
+        offers.cache.put(CULTURE, offers.Snapshot([], 2))
+        offers._epochs_checked = 0.0
+        await offers.sync_invalidations()
+        return kept, epochs, dropped, offers.cache.peek(CULTURE) is not None, await other.fetched_at(CULTURE)
+
+    try:
+        kept, epochs, dropped, fresh_kept, fetched = asyncio.run(scenario())
+    finally:
+        other.close()
+    assert kept
+    assert epochs == {CULTURE: 1}
+    assert dropped
+    assert fresh_kept
+    assert fetched == 0
@@ -0,0 +1,70 @@
+"""
+Часовий індекс: query(від, до) має збігатися з analyze_offers
+для оголошень, відфільтрованих до того самого проміжку.
+"""
+from datetime import date
+
+import pytest
+
+import tests  # noqa: F401  (тестові змінні оточення)
+from app.bot.analytics import analyze_offers
+from app.bot.records import OfferRow, OfferType
+from app.bot.timeindex import TimeIndex
+from benchmarks.synthetic import make_rows
+
+TODAY = date.today().toordinal()
+ROWS = make_rows(4000, days=400, seed=11) + [
+    # Межі вікон "сьогодні / 3 дні / 7 днів" та день лише одного типу
+    OfferRow(TODAY, OfferType.BUY, 201), OfferRow(TODAY - 3, OfferType.SELL, 199),
+    OfferRow(TODAY - 7, OfferType.BUY, 250), OfferRow(TODAY - 450, OfferType.SELL, 170),
+]
+FIRST = min(r.day for r in ROWS)
+LAST = max(r.day for r in ROWS)
+INDEX = TimeIndex(ROWS)
+
+
+def _expected(first: int, last: int) -> dict:
+    return analyze_offers([r for r in ROWS if first <= r.day <= last], engine="python")
+
+
+@pytest.mark.parametrize("first, last", [
+    (FIRST, LAST),  # увесь проміжок
+    (FIRST - 1000, LAST + 1000),  # ширше за проіндексовані дні з обох боків
+    (FIRST - 30, FIRST + 10),  # початок до першого дня індексу
+    (LAST - 10, LAST + 30),  # кінець після останнього дня
+    (TODAY - 7, TODAY),  # лише вікно 7 днів
+    (TODAY - 40, TODAY - 8),  # проміжок, що закінчується до вікон
+    (TODAY - 200, TODAY - 100),
+    (TODAY - 3, TODAY - 3),  # один день
+    (TODAY, TODAY),  # лише сьогодні
+    (FIRST, FIRST),  # перший день (є лише "продам")
+])
+def test_query_matches_filtered_analysis(first, last):
+    assert repr(INDEX.query(first, last)) == repr(_expected(first, last))
+
+
+@pytest.mark.parametrize("first, last", [
+    (FIRST - 100, FIRST - 1),  # цілком до першого дня
+    (LAST + 1, LAST + 100),  # цілком після останнього
+    (TODAY - 2, TODAY - 3),  # від пізніше за до
+])
+def test_empty_range(first, last):
+    assert INDEX.query(first, last) == {"куплю": None, "продам": None}
+    assert INDEX.query(first, last) == _expected(first, last)
+
+
+def test_day_without_offers_inside_span():
+    days = {r.day for r in ROWS}
+    gap = next(d for d in range(FIRST, LAST) if d not in days)
+    assert INDEX.query(gap, gap) == _expected(gap, gap) == {"куплю": None, "продам": None}
+
+
+@pytest.mark.parametrize("count", [1, 2, 7, 8])
+def test_median_with_even_and_odd_counts(count):
+    rows = [OfferRow(TODAY - i % 5, OfferType.SELL, 150 + (i * 53) % 97) for i in range(count)]
+    index = TimeIndex(rows)
+    assert repr(index.query(TODAY - 10, TODAY)) == repr(analyze_offers(rows, engine="python"))
+
+
+def test_empty_index():
+    assert TimeIndex([]).query(FIRST, LAST) == {"куплю": None, "продам": None}